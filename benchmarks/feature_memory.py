@@ -0,0 +1,62 @@
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from rnacloud_genome_reference.common.gtf import GTFHandler, GTFModel
+
+# Exon as it was declared before the dataclasses were slotted, with a __dict__ per instance
+@dataclass
+class DictFeature:
+    chromosome: str
+    start: int
+    end: int
+    strand: str
+    sequence: str | None
+
+@dataclass
+class DictExon(DictFeature):
+    exon_no: int
+
+def as_dict_exons(model: GTFModel, rows):
+    return [DictExon(chromosome=exon.chromosome, start=exon.start, end=exon.end, strand=exon.strand,
+                     sequence=None, exon_no=exon.exon_no) for exon in model.to_exon_table(rows)]
+
+def as_slotted_exons(model: GTFModel, rows):
+    return model.to_exon_table(rows).to_exons()
+
+def as_exon_table(model: GTFModel, rows):
+    return model.to_exon_table(rows)
+
+def measure(name: str, model: GTFModel, rows, fn) -> None:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(model, rows)
+    elapsed = time.perf_counter() - start
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = snapshot.statistics('filename')
+    retained = sum(stat.size for stat in stats)
+    allocations = sum(stat.count for stat in stats)
+    print(f"| {name} | {len(result)} | {retained / 2**20:.1f} | {peak / 2**20:.1f} | {allocations:,} | {elapsed:.2f} |")
+    del result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory and allocations of every exon of every MANE Select transcript as objects vs an ExonTable.")
+    parser.add_argument("gtf_file", help="Path to a bgzipped and tabix indexed GTF file e.g. GCF_000001405.40_GRCh38.p14_genomic.sorted.gtf.gz")
+
+    args = parser.parse_args()
+
+    model = GTFHandler(args.gtf_file, in_memory=True).model
+    assert model is not None
+    rows = model.mane_exon_rows()
+
+    print("| Representation | Exons | Retained MiB | Peak MiB | Live allocations | Seconds |")
+    print("|---|---|---|---|---|---|")
+    measure("list of dataclass Exon (before)", model, rows, as_dict_exons)
+    measure("list of slotted Exon", model, rows, as_slotted_exons)
+    measure("ExonTable", model, rows, as_exon_table)
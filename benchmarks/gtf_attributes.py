@@ -0,0 +1,65 @@
+import argparse
+import gzip
+import itertools
+import re
+import time
+
+from rnacloud_genome_reference.common.gtf import GTFAttributes, parse_gtf_attributes
+
+def load_attributes(gtf_file_path: str, limit: int | None) -> list[tuple[str, str]]:
+    with gzip.open(gtf_file_path, 'rt') as f:
+        records = (line.rstrip('\n').split('\t') for line in f if not line.startswith('#'))
+        return [(fields[2], fields[8]) for fields in itertools.islice(records, limit)]
+
+def regex_per_record(records: list[tuple[str, str]], entrez_gene_id: str) -> int:
+    # The pattern GTFHandler and extract_genes used before the shared tokenizer: f-string
+    # regexes with leading `.*` built and matched against column 9 for every record
+    hits = 0
+    for feature, attributes in records:
+        if re.match(f'.*tag \"MANE Select\";.*', attributes) and re.match(f'.*\"GeneID:{entrez_gene_id}\";.*', attributes):
+            hits += 1
+        if re.search(r'.*\"GenBank:(.+?)\";.*', attributes):
+            hits += 1
+        if feature == 'exon' and re.search(r'exon_number \"(\d+)\"', attributes):
+            hits += 1
+        if feature == 'gene' and re.search(r'.*gene_biotype \"(.+?)\";.*', attributes):
+            hits += 1
+    return hits
+
+def tokenizer_per_record(records: list[tuple[str, str]], entrez_gene_id: str, parse) -> int:
+    hits = 0
+    for feature, attributes in records:
+        parsed = parse(attributes)
+        if parsed.has_tag('MANE Select') and parsed.has_xref('GeneID', entrez_gene_id):
+            hits += 1
+        if parsed.xref('GenBank'):
+            hits += 1
+        if feature == 'exon' and parsed.get('exon_number'):
+            hits += 1
+        if feature == 'gene' and parsed.get('gene_biotype'):
+            hits += 1
+    return hits
+
+def measure(name: str, records: list[tuple[str, str]], fn, *args) -> None:
+    start = time.perf_counter()
+    fn(records, *args)
+    elapsed = time.perf_counter() - start
+    print(f"| {name} | {len(records)} | {elapsed:.2f} | {len(records) / elapsed:,.0f} |")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark GTF column 9 parsing: per-record regexes vs the shared tokenizer.")
+    parser.add_argument("gtf_file", help="Path to a (b)gzipped GTF file e.g. GCF_000001405.40_GRCh38.p14_genomic.gtf.gz")
+    parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N records")
+    parser.add_argument("--entrez-gene-id", default="79501", help="Entrez gene ID used in the GeneID match")
+
+    args = parser.parse_args()
+
+    records = load_attributes(args.gtf_file, args.limit)
+
+    print("| Method | Records | Seconds | Records/second |")
+    print("|---|---|---|---|")
+    measure("regex per record (before)", records, regex_per_record, args.entrez_gene_id)
+    measure("GTFAttributes.parse", records, tokenizer_per_record, args.entrez_gene_id, GTFAttributes.parse)
+    parse_gtf_attributes.cache_clear()
+    measure("parse_gtf_attributes, cold cache", records, tokenizer_per_record, args.entrez_gene_id, parse_gtf_attributes)
+    measure("parse_gtf_attributes, warm cache", records, tokenizer_per_record, args.entrez_gene_id, parse_gtf_attributes)
@@ -0,0 +1,32 @@
+import argparse
+import time
+
+import pandas as pd
+
+from rnacloud_genome_reference.grc_fixes.combine_grc_fixes_and_genes import _combine_sqlite, _combine_sweep
+
+def measure(name: str, combine, grc_fixes_df: pd.DataFrame, genes_df: pd.DataFrame, repeat: int) -> pd.DataFrame:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        combined_df = combine(grc_fixes_df, genes_df)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"| {name} | {len(grc_fixes_df):,} | {len(genes_df):,} | {len(combined_df):,} | {elapsed * 1000:.1f} |")
+    return combined_df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the GRC fix to gene interval join: SQLite range join vs sorted sweep.")
+    parser.add_argument("grc_fixes_file", help="Simplified GRC fixes TSV, the input of COMBINE_GRC_FIXES_AND_GENES")
+    parser.add_argument("genes_file", help="Genes TSV written by grc_fixes.extract_genes")
+    parser.add_argument("--repeat", type=int, default=5, help="Average over this many runs of each join")
+
+    args = parser.parse_args()
+
+    grc_fixes_df = pd.read_csv(args.grc_fixes_file, sep='\t')
+    genes_df = pd.read_csv(args.genes_file, sep='\t')
+
+    print("| Engine | GRC fixes | Genes | Rows | Milliseconds |")
+    print("|---|---|---|---|---|")
+    sqlite_df = measure("SQLite", _combine_sqlite, grc_fixes_df, genes_df, args.repeat)
+    sweep_df = measure("Sweep", _combine_sweep, grc_fixes_df, genes_df, args.repeat)
+
+    assert sqlite_df.to_csv(sep='\t', index=False) == sweep_df.to_csv(sep='\t', index=False), "Engines disagree"
@@ -0,0 +1,37 @@
+import argparse
+import time
+
+import pandas as pd
+
+from rnacloud_genome_reference.grc_fixes.comparator import FeatureComparator
+
+def compare(comparator: FeatureComparator, mappings: pd.DataFrame) -> None:
+    for _, x in mappings.iterrows():
+        comparator.compare_features(x['chr_refseq'], x['start'], x['end'],
+                                    x['alt_chr_refseq'], x['alt_scaf_start'], x['alt_scaf_stop'],
+                                    x['entrez_gene_id'])
+
+def measure(name: str, comparator: FeatureComparator, mappings: pd.DataFrame) -> None:
+    start = time.perf_counter()
+    compare(comparator, mappings)
+    elapsed = time.perf_counter() - start
+    print(f"| {name} | {len(mappings)} | {comparator.fasta_fetches:,} | {elapsed:.2f} |")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark FASTA fetches of the feature comparison: one fetch per exon/intron vs one per transcript span.")
+    parser.add_argument("gtf_file", help="Path to the bgzipped, tabix indexed GTF file")
+    parser.add_argument("fasta_file", help="Path to the bgzipped, faidx indexed FASTA file")
+    parser.add_argument("mappings_file", help="Gene to GRC fix contig mappings, e.g. the combined_grc_fixes.tsv input of COMPARE_FEATURES")
+    parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N mappings")
+
+    args = parser.parse_args()
+
+    mappings = pd.read_csv(args.mappings_file, sep="\t", low_memory=False).head(args.limit)
+
+    # Warm the handle pool and transcript model cache so both runs only differ in their FASTA reads
+    compare(FeatureComparator(args.gtf_file, args.fasta_file), mappings)
+
+    print("| Method | Mappings | FASTA fetches | Seconds |")
+    print("|---|---|---|---|")
+    measure("Fetch per feature", FeatureComparator(args.gtf_file, args.fasta_file, coalesce_fetches=False), mappings)
+    measure("Fetch per span", FeatureComparator(args.gtf_file, args.fasta_file, coalesce_fetches=True), mappings)
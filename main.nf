@@ -7,6 +7,7 @@ include { SPLICE_SITE_GNOMAD_FREQ } from './subworkflows/splice_site_gnomad_freq
 include { BUILD_GENOME_REFERENCE } from './subworkflows/genome_build.nf'
 include { BUILD_ANNOTATION_REFERENCE } from './subworkflows/annotation_build.nf'
 include { CALCULATE_MD5_SUMMARY } from './modules/common.nf'
+include { BUILD_GTF_MODEL_INDEX } from './modules/common.nf'
 include { VALIDATE_GENOME_ANNOTATION } from './modules/validate.nf'
 include { GENOME_AND_ANNOTATION_REPORT } from './modules/validate.nf'
 
@@ -17,6 +18,12 @@ workflow {
         DOWNLOAD_GENOME_AND_REFERENCES.out.gtf
     )
 
+    // Built once and memory mapped by every process that looks up genes, transcripts or exons
+    BUILD_GTF_MODEL_INDEX(
+        DOWNLOAD_GENOME_AND_REFERENCES.out.gtf,
+        DOWNLOAD_GENOME_AND_REFERENCES.out.gtf_index
+    )
+
     GRC_FIXES_ASSESSMENT(
         DOWNLOAD_GENOME_AND_REFERENCES.out.grc_fixes,
         DOWNLOAD_GENOME_AND_REFERENCES.out.gtf,
@@ -26,7 +33,8 @@ workflow {
         DOWNLOAD_GENOME_AND_REFERENCES.out.fasta_gzi_index,
         DOWNLOAD_GENOME_AND_REFERENCES.out.assembly_report,
         EXTRACT_GENES.out.genes,
-        DOWNLOAD_GENOME_AND_REFERENCES.out.clinically_relevant
+        DOWNLOAD_GENOME_AND_REFERENCES.out.clinically_relevant,
+        BUILD_GTF_MODEL_INDEX.out.index
     )
 
     SPLICE_SITE_GNOMAD_FREQ(
@@ -34,7 +42,8 @@ workflow {
         DOWNLOAD_GENOME_AND_REFERENCES.out.gtf_index,
         EXTRACT_GENES.out.genes,
         DOWNLOAD_GENOME_AND_REFERENCES.out.clinically_relevant,
-        DOWNLOAD_GENOME_AND_REFERENCES.out.assembly_report
+        DOWNLOAD_GENOME_AND_REFERENCES.out.assembly_report,
+        BUILD_GTF_MODEL_INDEX.out.index
     )
     
     BUILD_GENOME_REFERENCE(
@@ -46,7 +55,9 @@ workflow {
         DOWNLOAD_GENOME_AND_REFERENCES.out.assembly_report,
         GRC_FIXES_ASSESSMENT.out.grc_fixes_assessment,
         DOWNLOAD_GENOME_AND_REFERENCES.out.cen_par_mask_regions,
-        DOWNLOAD_GENOME_AND_REFERENCES.out.ebv_fasta
+        DOWNLOAD_GENOME_AND_REFERENCES.out.ebv_fasta,
+        EXTRACT_GENES.out.redundant_5s_regions_bed,
+        BUILD_GTF_MODEL_INDEX.out.index
     )
 
     BUILD_ANNOTATION_REFERENCE(
@@ -170,8 +170,12 @@ process SUBSET_GTF {
 
 process SORT_GTF {
     tag "SORT_GTF"
+    label "python"
     publishDir "${params.output_dir}", mode: 'copy'
 
+    // Set default CPUs (2), can be overridden in nextflow.config or command line
+    cpus 2
+
     input:
     val final_output_prefix
     path gtf                // Compressed GTF
@@ -189,11 +193,8 @@ process SORT_GTF {
     /app/rnacloud_genome_reference/genome_build/scripts/gtf_sort.sh \
       ${gtf} ${final_output_prefix}.gtf
 
-    echo "Compressing GTF file"
-    bgzip -c ${final_output_prefix}.gtf > ${final_output_prefix}.gtf.gz
-
-    echo "Indexing GTF file"
-    tabix ${final_output_prefix}.gtf.gz
+    echo "Compressing and indexing GTF file"
+    python3 -m rnacloud_genome_reference.common.bgzf ${final_output_prefix}.gtf ${final_output_prefix}.gtf.gz --index tbi --threads ${task.cpus}
     """
 }
 
@@ -23,4 +23,22 @@ process CALCULATE_MD5_SUMMARY {
     # The output is redirected into 'md5checksums.txt'
     md5sum ${files.collect { it.name }.join(' ')} > md5checksums.txt
     """
-}
\ No newline at end of file
+}
+
+process BUILD_GTF_MODEL_INDEX {
+    tag "BUILD_GTF_MODEL_INDEX"
+    label "python"
+
+    input:
+    path gtf
+    path gtf_index
+
+    output:
+    path "${gtf}.model", emit: index
+
+    script:
+    """
+    set -euo pipefail
+    python3 -m rnacloud_genome_reference.common.build_gtf_model_index ${gtf} ${gtf}.model
+    """
+}
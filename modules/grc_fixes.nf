@@ -9,11 +9,12 @@ process EXTRACT_GENES {
 
     output:
     path "genes.tsv", emit: genes
+    path "redundant_5s_regions.bed", emit: redundant_5s_regions_bed
 
     script:
     """
     set -euo pipefail
-    python3 -m rnacloud_genome_reference.grc_fixes.extract_genes ${gtf_file} genes.tsv
+    python3 -m rnacloud_genome_reference.grc_fixes.extract_genes ${gtf_file} genes.tsv --redundant-5s-bed redundant_5s_regions.bed
     """
 }
 
@@ -65,14 +66,21 @@ process COMPARE_FEATURES {
     path gtf_index
     path fasta_fai_index
     path fasta_gzi_index
+    path gtf_model_index
+    path previous_assessment
 
     output:
     path "comparison_results.tsv", emit: comparison_results
 
     script:
+    // Input digests read the GTF and FASTA over every mapped region, so they are only computed to compare against a
+    // previous assessment or when asked for, to make this assessment the previous one of a later run
+    def incremental = previous_assessment ? "--previous-assessment ${previous_assessment}" : (params.grc_fixes_input_digests ? "--input-digests" : "")
+    // Kept outside the task work dir, so that a retry or -resume of a killed task picks up the rows already compared
+    def checkpoint = params.compare_features_checkpoint_dir ? "--checkpoint-dir ${params.compare_features_checkpoint_dir}" : ""
     """
     set -euo pipefail
-    python3 -m rnacloud_genome_reference.grc_fixes.compare_features ${gtf} ${fasta} ${combined_grc_fixes_file} comparison_results.tsv
+    python3 -m rnacloud_genome_reference.grc_fixes.compare_features ${gtf} ${fasta} ${combined_grc_fixes_file} comparison_results.tsv --gtf-model-index ${gtf_model_index} --workers ${task.cpus} ${incremental} ${checkpoint}
     """
 }
 
@@ -30,6 +30,7 @@ process EXTRACT_SJ_POSITIONS_FROM_CLINICALLY_SIGNIFICANT_GENES {
     path clinical_genes_path
     path gtf
     path gtf_index
+    path gtf_model_index
 
     output:
     path "sj_positions_from_clinically_significant_genes.tsv", emit: sj_positions
@@ -39,6 +40,7 @@ process EXTRACT_SJ_POSITIONS_FROM_CLINICALLY_SIGNIFICANT_GENES {
     python -m rnacloud_genome_reference.splice_site_population_freq.extract_sj_pos \
         --clinical_genes_path ${clinical_genes_path} \
         --gtf_file_path ${gtf} \
+        --gtf_model_index_path ${gtf_model_index} \
         --output_path sj_positions_from_clinically_significant_genes.tsv
     """
 }
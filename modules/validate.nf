@@ -21,11 +21,8 @@ process VALIDATE_GENOME_ANNOTATION {
     """
     set -euo pipefail
 
-    echo "Append NCBI assembly masked regions to masked_regions_bed"
-    for bed in ${ncbi_assembly_masked_regions_paths.join(' ')}; do
-      cat \$bed >> combined_ncbi_assembly_masked_regions.bed
-    done
-    bedtools subtract -a ${unmasked_regions_bed} -b combined_ncbi_assembly_masked_regions.bed > updated_unmasked_regions.bed
+    echo "Subtract NCBI assembly masked regions from unmasked_regions_bed"
+    python3 -m rnacloud_genome_reference.genome_build.intervals subtract updated_unmasked_regions.bed ${unmasked_regions_bed} ${ncbi_assembly_masked_regions_paths.join(' ')}
 
     echo "Running validation script"
     /app/rnacloud_genome_reference/validation/scripts/validation.sh \
@@ -78,6 +75,7 @@ process GENOME_AND_ANNOTATION_REPORT {
       --grc-fixes-summary ${grc_fixes_summary} \
       --config ${config_json} \
       --version ${genome_and_annotation_version} \
+      --workers ${task.cpus} \
       --out genome_and_annotation_report.md
     """
 }
\ No newline at end of file
@@ -0,0 +1,288 @@
+import argparse
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import struct
+import sys
+from typing import Literal
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Uncompressed bytes per block, as htslib writes them, so blocks and .gzi entries fall where bgzip's do
+BGZF_BLOCK_SIZE = 0xff00
+BGZF_MAX_BLOCK_SIZE = 0x10000
+BGZF_EOF = bytes.fromhex('1f8b08040000000000ff0600424302001b0003000000000000000000')
+
+# Tabix index layout per preset: format, sequence, begin and end columns (1-based), meta character, lines to skip
+TABIX_PRESETS = {
+    'gff': (0, 1, 4, 5, '#', 0)
+}
+TABIX_MIN_SHIFT = 14
+TABIX_LEVELS = 5
+TABIX_META_BIN = 37450
+# Bins whose chunks span less than this many compressed bytes are folded into their parent, as htslib does
+TABIX_MIN_MARKER_DIST = 0x10000
+
+def compress_block(data: bytes, level: int = 6) -> bytes:
+    """
+    One BGZF block: a gzip member holding data, with the BC extra field giving its compressed size.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    if len(deflated) + 26 > BGZF_MAX_BLOCK_SIZE:
+        # Incompressible data can come out larger than the block allows; store it instead
+        compressor = zlib.compressobj(0, zlib.DEFLATED, -15)
+        deflated = compressor.compress(data) + compressor.flush()
+
+    header = struct.pack('<4BI2BH2BHH', 0x1f, 0x8b, 8, 4, 0, 0, 0xff, 6, ord('B'), ord('C'), 2, len(deflated) + 25)
+    return header + deflated + struct.pack('<II', zlib.crc32(data), len(data))
+
+def reg2bin(beg: int, end: int) -> int:
+    """
+    Smallest bin of the UCSC binning scheme containing the 0-based, half-open interval [beg, end).
+    """
+    end -= 1
+    for level_shift, offset in ((14, 4681), (17, 585), (20, 73), (23, 9), (26, 1)):
+        if beg >> level_shift == end >> level_shift:
+            return offset + (beg >> level_shift)
+    return 0
+
+class TabixIndex:
+    """
+    Tabix index built from the records of a sorted BGZF file as they are written: every record is added with its
+    interval and the uncompressed offsets of its first byte and of the byte after it.
+
+    Blocks hold BGZF_BLOCK_SIZE uncompressed bytes each, so which block an offset falls in is known before the
+    block is compressed: chunks of a bin are merged as they are added when the gap between them lies within one
+    block, as htslib merges them when finishing an index. Offsets become virtual offsets on serialisation.
+    """
+    def __init__(self, preset: str = 'gff'):
+        if preset not in TABIX_PRESETS:
+            raise ValueError(f"Unsupported tabix preset {preset}, expected one of {', '.join(TABIX_PRESETS)}")
+        self.preset = preset
+        self.names: list[str] = []
+        self._bins: list[dict[int, list[list[int]]]] = []
+        self._linear: list[list[int]] = []
+        self._meta: list[list[int]] = []
+        self._last: tuple[int, int] = (-1, -1)
+
+    def add(self, name: str, beg: int, end: int, offset_beg: int, offset_end: int) -> None:
+        if not self.names or self.names[-1] != name:
+            if name in self.names:
+                raise ValueError(f"Records of {name} are not contiguous; the file is not sorted")
+            self.names.append(name)
+            self._bins.append({})
+            self._linear.append([])
+            self._meta.append([offset_beg, offset_end, 0])
+        tid = len(self.names) - 1
+
+        if (tid, beg) < self._last:
+            raise ValueError(f"Record {name}:{beg + 1}-{end} is out of order; the file is not sorted")
+        self._last = (tid, beg)
+
+        end = max(end, beg + 1)
+        chunks = self._bins[tid].setdefault(reg2bin(beg, end), [])
+        if chunks and chunks[-1][1] // BGZF_BLOCK_SIZE == offset_beg // BGZF_BLOCK_SIZE:
+            chunks[-1][1] = offset_end
+        else:
+            chunks.append([offset_beg, offset_end])
+
+        # Each 16 kb window points at the first record overlapping it
+        linear = self._linear[tid]
+        last_window = (end - 1) >> TABIX_MIN_SHIFT
+        if len(linear) <= last_window:
+            linear.extend([-1] * (last_window + 1 - len(linear)))
+        for window in range(beg >> TABIX_MIN_SHIFT, last_window + 1):
+            if linear[window] == -1:
+                linear[window] = offset_beg
+
+        meta = self._meta[tid]
+        meta[1] = offset_end
+        meta[2] += 1
+
+    @staticmethod
+    def _compress_binning(bins: dict[int, list[list[int]]]) -> dict[int, list[list[int]]]:
+        """
+        Fold small bins into their parents and merge chunks starting in the block the one before ends in, as
+        htslib does when finishing an index. Chunks are in virtual offsets.
+        """
+        bins = {bin_number: sorted(chunks) for bin_number, chunks in bins.items()}
+        for level in range(TABIX_LEVELS, 0, -1):
+            first = ((1 << 3 * level) - 1) // 7
+            for bin_number in sorted(bin_number for bin_number in bins if bin_number >= first):
+                chunks = bins[bin_number]
+                parent = (bin_number - 1) >> 3
+                if parent in bins and (chunks[-1][1] >> 16) - (chunks[0][0] >> 16) < TABIX_MIN_MARKER_DIST:
+                    bins[parent] = sorted(bins[parent] + bins.pop(bin_number))
+
+        for bin_number, chunks in bins.items():
+            merged = [chunks[0]]
+            for chunk_beg, chunk_end in chunks[1:]:
+                if merged[-1][1] >> 16 >= chunk_beg >> 16:
+                    merged[-1][1] = max(merged[-1][1], chunk_end)
+                else:
+                    merged.append([chunk_beg, chunk_end])
+            bins[bin_number] = merged
+        return bins
+
+    def serialise(self, virtual_offset: Callable[[int], int]) -> bytes:
+        fmt, col_seq, col_beg, col_end, meta_char, skip = TABIX_PRESETS[self.preset]
+        names = b''.join(name.encode() + b'\0' for name in self.names)
+
+        parts = [b'TBI\1', struct.pack('<8i', len(self.names), fmt, col_seq, col_beg, col_end, ord(meta_char), skip, len(names)), names]
+        for bins, linear, (meta_beg, meta_end, n_records) in zip(self._bins, self._linear, self._meta):
+            bins = self._compress_binning({bin_number: [[virtual_offset(chunk_beg), virtual_offset(chunk_end)] for chunk_beg, chunk_end in chunks]
+                                           for bin_number, chunks in bins.items()})
+            parts.append(struct.pack('<i', len(bins) + 1))
+            for bin_number, chunks in bins.items():
+                parts.append(struct.pack('<Ii', bin_number, len(chunks)))
+                parts.append(b''.join(struct.pack('<QQ', chunk_beg, chunk_end) for chunk_beg, chunk_end in chunks))
+            parts.append(struct.pack('<IiQQQQ', TABIX_META_BIN, 2, virtual_offset(meta_beg), virtual_offset(meta_end), n_records, 0))
+
+            # Windows no record overlaps take the offset of the window before, or before the first record of the
+            # contig that of the record, as htslib fills them
+            filled, previous = [], virtual_offset(meta_beg)
+            for offset in linear:
+                previous = virtual_offset(offset) if offset != -1 else previous
+                filled.append(previous)
+            parts.append(struct.pack(f'<i{len(filled)}Q', len(filled), *filled))
+
+        # Records without coordinates, which lines of a tabix-indexed file always have
+        parts.append(struct.pack('<Q', 0))
+        return b''.join(parts)
+
+class BGZFWriter:
+    """
+    Writes a BGZF file, compressing its blocks on a pool of threads (zlib releases the GIL while it deflates) and
+    writing them out in order.
+
+    Blocks hold a fixed BGZF_BLOCK_SIZE uncompressed bytes, so the virtual offset of any uncompressed position
+    follows from the compressed offsets of the blocks. Those are recorded as blocks are written, and on close the
+    writer emits the index asked for:
+    - 'gzi': the block offsets, as bgzip -i and samtools faidx write them for compressed FASTA files.
+    - 'tbi': a tabix index of the lines written, which must be sorted, in the layout of tabix_preset.
+    """
+    def __init__(self, path: str, threads: int = 1, level: int = 6, index: Literal['gzi', 'tbi'] | None = None, tabix_preset: str = 'gff'):
+        self.path = path
+        self.level = level
+        self.index = index
+        self.bytes_written = 0
+
+        self._output = open(path, 'wb')
+        self._buffer = bytearray()
+        self._block_offsets: list[int] = []
+        self._compressed_offset = 0
+        self._executor = ThreadPoolExecutor(max_workers=max(threads, 1))
+        self._pending: deque[Future] = deque()
+        self._max_pending = max(threads, 1) * 4
+
+        self._tabix = TabixIndex(tabix_preset) if index == 'tbi' else None
+        self._line = bytearray()
+        self._line_offset = 0
+
+    def __enter__(self) -> 'BGZFWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._output.closed
+
+    def write(self, data: bytes) -> None:
+        if self._tabix is not None:
+            self._collect_records(data)
+
+        self._buffer += data
+        self.bytes_written += len(data)
+
+        full = len(self._buffer) - len(self._buffer) % BGZF_BLOCK_SIZE
+        for start in range(0, full, BGZF_BLOCK_SIZE):
+            self._submit(bytes(self._buffer[start:start + BGZF_BLOCK_SIZE]))
+        del self._buffer[:full]
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(self._executor.submit(compress_block, block, self.level))
+        while len(self._pending) > self._max_pending:
+            self._write_block(self._pending.popleft().result())
+
+    def _write_block(self, compressed: bytes) -> None:
+        self._block_offsets.append(self._compressed_offset)
+        self._output.write(compressed)
+        self._compressed_offset += len(compressed)
+
+    def _collect_records(self, data: bytes) -> None:
+        self._line += data
+        lines = self._line.split(b'\n')
+        self._line = bytearray(lines.pop())
+
+        for line in lines:
+            self._add_record(line, self._line_offset, self._line_offset + len(line) + 1)
+            self._line_offset += len(line) + 1
+
+    def _add_record(self, line: bytes, offset_beg: int, offset_end: int) -> None:
+        _, col_seq, col_beg, col_end, meta_char, _ = TABIX_PRESETS[self._tabix.preset]
+        if not line or line.startswith(meta_char.encode()):
+            return
+
+        fields = line.split(b'\t', max(col_seq, col_beg, col_end))
+        self._tabix.add(fields[col_seq - 1].decode(), int(fields[col_beg - 1]) - 1, int(fields[col_end - 1]), offset_beg, offset_end)
+
+    def virtual_offset(self, uncompressed_offset: int) -> int:
+        """
+        Virtual offset of an uncompressed position, once the block holding it is written. The end of the data is
+        the start of the EOF block, as htslib reports it.
+        """
+        if uncompressed_offset == self.bytes_written:
+            return self._compressed_offset << 16
+
+        block, within = divmod(uncompressed_offset, BGZF_BLOCK_SIZE)
+        return self._block_offsets[block] << 16 | within
+
+    def close(self) -> None:
+        if self._output.closed:
+            return
+
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self._write_block(self._pending.popleft().result())
+        self._executor.shutdown()
+
+        self._output.write(BGZF_EOF)
+        self._output.close()
+
+        if self.index == 'gzi':
+            with open(self.path + '.gzi', 'wb') as gzi:
+                entries = [(self._block_offsets[block], block * BGZF_BLOCK_SIZE) for block in range(1, len(self._block_offsets))]
+                gzi.write(struct.pack('<Q', len(entries)))
+                gzi.write(b''.join(struct.pack('<QQ', *entry) for entry in entries))
+
+        elif self.index == 'tbi':
+            if self._line:
+                self._add_record(self._line, self._line_offset, self.bytes_written)
+            with BGZFWriter(self.path + '.tbi', level=self.level) as tbi:
+                tbi.write(self._tabix.serialise(self.virtual_offset))
+
+        logger.debug(f"Wrote {self.bytes_written:,} bytes in {len(self._block_offsets)} blocks to {self.path}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="BGZF-compress a file on several threads and index it in the same pass.")
+    parser.add_argument("input", help="File to compress, or - for standard input.")
+    parser.add_argument("output", help="Output BGZF file.")
+    parser.add_argument("--index", choices=['gzi', 'tbi'], default=None, help="Index to write next to the output: gzi block offsets, or a tabix index of the (sorted) lines.")
+    parser.add_argument("--preset", choices=list(TABIX_PRESETS), default='gff', help="Tabix preset, for --index tbi.")
+    parser.add_argument("--threads", type=int, default=1, help="Threads compressing blocks.")
+
+    args = parser.parse_args()
+
+    with (sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')) as source, \
+            BGZFWriter(args.output, threads=args.threads, index=args.index, tabix_preset=args.preset) as writer:
+        while chunk := source.read(1 << 22):
+            writer.write(chunk)
@@ -0,0 +1,21 @@
+import argparse
+import logging
+
+from rnacloud_genome_reference.common.gtf import GTFHandler, GTFModel
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+def build_gtf_model_index(gtf_file_path: str, index_path: str | None = None) -> str:
+    index_path = index_path or GTFModel.default_index_path(gtf_file_path)
+    GTFHandler(gtf_file_path, model_index_path=index_path)
+    return index_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a persistent GTF model index that GTFHandler can memory map.")
+    parser.add_argument("gtf", help="Path to the bgzipped and tabix indexed GTF file.")
+    parser.add_argument("index", nargs="?", default=None, help="Output index directory. Defaults to <gtf>.model")
+    args = parser.parse_args()
+
+    index_path = build_gtf_model_index(args.gtf, args.index)
+    logger.info(f"GTF model index available at {index_path}")
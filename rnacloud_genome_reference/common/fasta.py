@@ -0,0 +1,70 @@
+import logging
+
+import numpy as np
+
+from rnacloud_genome_reference.common.bgzf import BGZFWriter
+
+logger = logging.getLogger(__name__)
+
+# Rows of a sequence wrapped at a time, bounding the memory used for the newlines on top of the sequence
+WRAP_ROWS = 1 << 20
+
+class IndexedFastaWriter:
+    """
+    Writes a BGZF-compressed FASTA file together with the indexes `samtools faidx` would build for it: the .fai,
+    from the name, length and uncompressed offset of every sequence as it is written, and the .gzi, from the blocks
+    as BGZFWriter writes them, compressed on the given number of threads. No second read of the output is needed.
+
+    Sequences are wrapped at line_width bases per line, as samtools faidx writes them. With compressed=False the
+    FASTA is written plain, with only its .fai.
+    """
+    def __init__(self, path: str, line_width: int = 60, compressed: bool = True, threads: int = 1):
+        self.path = path
+        self.line_width = line_width
+        self.bytes_written = 0
+        self._fai_lines: list[str] = []
+        self._names: set[str] = set()
+        self._output = BGZFWriter(path, threads=threads, index='gzi') if compressed else open(path, 'wb')
+
+    def __enter__(self) -> 'IndexedFastaWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _write(self, data: bytes) -> None:
+        self._output.write(data)
+        self.bytes_written += len(data)
+
+    def write_sequence(self, name: str, sequence: bytes | bytearray) -> None:
+        if name in self._names:
+            raise ValueError(f"Duplicate sequence name {name} in {self.path}")
+        self._names.add(name)
+
+        self._write(f">{name}\n".encode())
+        # Like samtools faidx, line lengths are those of the first line and empty sequences are left out
+        if len(sequence) > 0:
+            line_bases = min(len(sequence), self.line_width)
+            self._fai_lines.append(f"{name}\t{len(sequence)}\t{self.bytes_written}\t{line_bases}\t{line_bases + 1}\n")
+
+        # Wrap whole rows by appending a column of newlines to a view of the sequence as a matrix
+        bases = np.frombuffer(sequence, dtype=np.uint8)
+        full_rows = len(bases) // self.line_width
+        for row in range(0, full_rows, WRAP_ROWS):
+            rows = min(WRAP_ROWS, full_rows - row)
+            lines = np.empty((rows, self.line_width + 1), dtype=np.uint8)
+            lines[:, :self.line_width] = bases[row * self.line_width:(row + rows) * self.line_width].reshape(rows, self.line_width)
+            lines[:, self.line_width] = ord('\n')
+            self._write(lines.tobytes())
+
+        if len(bases) > full_rows * self.line_width:
+            self._write(bytes(bases[full_rows * self.line_width:]) + b'\n')
+
+    def close(self) -> None:
+        if self._output.closed:
+            return
+
+        self._output.close()
+        with open(self.path + '.fai', 'w') as fai:
+            fai.writelines(self._fai_lines)
+        logger.info(f"Wrote {len(self._fai_lines)} sequences ({self.bytes_written:,} bytes uncompressed) to {self.path}")
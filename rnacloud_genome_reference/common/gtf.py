@@ -1,15 +1,27 @@
-from collections import Counter
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import copy
+from functools import lru_cache
+import json
 import logging
+import os
 import re
 import gzip
-from dataclasses import dataclass
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import TypeVar
 from typing_extensions import Literal
 
+import numpy as np
+import pandas as pd
 import pysam
 
+from rnacloud_genome_reference.common.utils import file_digest
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class Feature:
     chromosome: str
     start: int
@@ -18,18 +30,18 @@ class Feature:
     sequence: str | None
 
     def __repr__(self) -> str:
-        sequence_display = self.sequence[:10] + "..." if self.sequence and len(self.sequence) > 10 else self.sequence
+        sequence_display = self.sequence[:10] + "..." if isinstance(self.sequence, str) and len(self.sequence) > 10 else self.sequence
         return f"{self.__class__.__name__} (chromosome={self.chromosome}, start={self.start}, end={self.end}, strand={self.strand}, sequence={sequence_display})"
 
-@dataclass
+@dataclass(slots=True)
 class Exon(Feature):
     exon_no: int
 
-@dataclass
+@dataclass(slots=True)
 class Intron(Feature):
     intron_no: int
 
-@dataclass
+@dataclass(slots=True)
 class SpliceJunctionPosition:
     chrom: str
     transcript: str
@@ -39,15 +51,837 @@ class SpliceJunctionPosition:
     pos: int
     dist_from_exon: Literal[1,2,-1, -2]
 
-@dataclass
+@dataclass(slots=True)
 class ObtainedTranscript:
     transcript_id: str | None = None
     is_mane_select: bool = False
 
+@dataclass(slots=True)
+class TranscriptModel:
+    transcript_id: str
+    exons: list[Exon] = field(default_factory=list)
+    introns: list[Intron] = field(default_factory=list)
+    partial: bool = False
+    is_mane_select: bool = False
+
+    def copy(self) -> 'TranscriptModel':
+        # Features are copied too, as callers fill in their sequences
+        return TranscriptModel(transcript_id=self.transcript_id,
+                               exons=[copy.copy(exon) for exon in self.exons],
+                               introns=[copy.copy(intron) for intron in self.introns],
+                               partial=self.partial,
+                               is_mane_select=self.is_mane_select)
+
+STRANDS = ('+', '-', '.')
+
+GENE_DTYPE = np.dtype([('contig', np.int32), ('start', np.int64), ('end', np.int64), ('strand', np.int8),
+                       ('gene', np.int32)])
+TRANSCRIPT_DTYPE = np.dtype([('contig', np.int32), ('start', np.int64), ('end', np.int64), ('strand', np.int8),
+                             ('gene', np.int32), ('transcript', np.int32), ('mane', np.bool_)])
+EXON_DTYPE = np.dtype([('contig', np.int32), ('start', np.int64), ('end', np.int64), ('strand', np.int8),
+                       ('gene', np.int32), ('transcript', np.int32), ('exon_number', np.int32), ('partial', np.bool_)])
+
+EXON_TABLE_DTYPE = np.dtype([('contig', np.int32), ('start', np.int64), ('end', np.int64), ('strand', np.int8),
+                             ('exon_no', np.int32)])
+SPLICE_JUNCTION_CATEGORIES = ('Donor', 'Acceptor')
+SPLICE_JUNCTION_TABLE_DTYPE = np.dtype([('contig', np.int32), ('transcript', np.int32), ('mane', np.bool_),
+                                        ('exon_no', np.int32), ('category', np.int8), ('pos', np.int64),
+                                        ('dist_from_exon', np.int8)])
+
+class ExonTable:
+    """
+    Struct-of-arrays alternative to list[Exon]: one EXON_TABLE_DTYPE row per exon, with contigs coded
+    against a shared string table. Exon objects are only created when the table is indexed or iterated.
+    Sequences are not held.
+    """
+    __slots__ = ('contigs', 'rows')
+
+    def __init__(self, contigs: list[str], rows: np.ndarray):
+        self.contigs = contigs
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: int) -> Exon:
+        row = self.rows[index]
+        return Exon(chromosome=self.contigs[row['contig']],
+                    start=int(row['start']),
+                    end=int(row['end']),
+                    strand=STRANDS[row['strand']],
+                    sequence=None,
+                    exon_no=int(row['exon_no']))
+
+    def __iter__(self):
+        for index in range(len(self.rows)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__} ({len(self)} exons)"
+
+    def to_exons(self) -> list[Exon]:
+        return list(self)
+
+    @classmethod
+    def from_exons(cls, exons: list[Exon]) -> 'ExonTable':
+        contig_codes: dict[str, int] = {}
+        rows = np.array([(contig_codes.setdefault(exon.chromosome, len(contig_codes)), exon.start, exon.end,
+                          STRANDS.index(exon.strand) if exon.strand in STRANDS else STRANDS.index('.'), exon.exon_no)
+                         for exon in exons], dtype=EXON_TABLE_DTYPE)
+        return cls(contigs=list(contig_codes), rows=rows)
+
+class SpliceJunctionTable:
+    """
+    Struct-of-arrays alternative to list[SpliceJunctionPosition], with contigs and transcripts coded
+    against shared string tables and the category coded against SPLICE_JUNCTION_CATEGORIES.
+    """
+    __slots__ = ('contigs', 'transcripts', 'rows')
+
+    def __init__(self, contigs: list[str], transcripts: list[str], rows: np.ndarray):
+        self.contigs = contigs
+        self.transcripts = transcripts
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: int) -> SpliceJunctionPosition:
+        row = self.rows[index]
+        return SpliceJunctionPosition(chrom=self.contigs[row['contig']],
+                                      transcript=self.transcripts[row['transcript']],
+                                      transcript_is_mane_select=bool(row['mane']),
+                                      exon_no=int(row['exon_no']),
+                                      category=SPLICE_JUNCTION_CATEGORIES[row['category']], # type: ignore
+                                      pos=int(row['pos']),
+                                      dist_from_exon=int(row['dist_from_exon'])) # type: ignore
+
+    def __iter__(self):
+        for index in range(len(self.rows)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__} ({len(self)} positions)"
+
+    def to_positions(self) -> list[SpliceJunctionPosition]:
+        return list(self)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            'chrom': np.array(self.contigs, dtype=object)[self.rows['contig']],
+            'transcript': np.array(self.transcripts, dtype=object)[self.rows['transcript']],
+            'transcript_is_mane_select': self.rows['mane'],
+            'exon_no': self.rows['exon_no'],
+            'category': np.array(SPLICE_JUNCTION_CATEGORIES, dtype=object)[self.rows['category']],
+            'pos': self.rows['pos'],
+            'dist_from_exon': self.rows['dist_from_exon']
+        })
+
+    @classmethod
+    def from_positions(cls, positions: list[SpliceJunctionPosition]) -> 'SpliceJunctionTable':
+        contig_codes: dict[str, int] = {}
+        transcript_codes: dict[str, int] = {}
+        rows = np.array([(contig_codes.setdefault(position.chrom, len(contig_codes)),
+                          transcript_codes.setdefault(position.transcript, len(transcript_codes)),
+                          position.transcript_is_mane_select,
+                          position.exon_no,
+                          SPLICE_JUNCTION_CATEGORIES.index(position.category),
+                          position.pos,
+                          position.dist_from_exon) for position in positions], dtype=SPLICE_JUNCTION_TABLE_DTYPE)
+        return cls(contigs=list(contig_codes), transcripts=list(transcript_codes), rows=rows)
+
+def splice_junction_table(exons: ExonTable, transcript: np.ndarray, transcripts: list[str], mane: np.ndarray) -> SpliceJunctionTable:
+    """
+    The +-1/+-2 donor and acceptor positions of many transcripts at once, in the same order as
+    obtain_sj_positions() produces them one transcript at a time.
+
+    :param exons: Exons in transcript order, as returned for a transcript by get_exons_by_transcript().
+    :param transcript: Per exon, its code in transcripts. Exons are grouped by contig and transcript.
+    :param transcripts: Transcript ID table.
+    :param mane: Per exon, whether its transcript is MANE Select.
+    """
+    rows = exons.rows
+    exon_no = rows['exon_no']
+
+    # Exons per transcript per contig; transcripts with a single exon have no splice junctions
+    group_key = rows['contig'].astype(np.int64) * (len(transcripts) + 1) + transcript
+    _, group, group_sizes = np.unique(group_key, return_inverse=True, return_counts=True)
+    n_exons = group_sizes[group]
+
+    plus = rows['strand'] == STRANDS.index('+')
+    minus = rows['strand'] == STRANDS.index('-')
+    acceptor = (n_exons > 1) & (exon_no != 1)
+    donor = (n_exons > 1) & (exon_no != n_exons)
+
+    # Four slots per exon: start - 2, start - 1, end + 1 and end + 2. On the + strand the first two are
+    # the acceptor of the exon and the last two its donor; on the - strand it is the other way round.
+    upstream = (plus & acceptor) | (minus & donor)
+    downstream = (plus & donor) | (minus & acceptor)
+    emit = np.stack([upstream, upstream, downstream, downstream], axis=1)
+
+    pos = np.stack([rows['start'] - 2, rows['start'] - 1, rows['end'] + 1, rows['end'] + 2], axis=1)
+    donor_slot = np.stack([minus, minus, plus, plus], axis=1)
+    dist_from_exon = np.where(plus[:, np.newaxis], np.array([-2, -1, 1, 2]), np.array([2, 1, -1, -2]))
+    exon_index = np.broadcast_to(np.arange(len(rows))[:, np.newaxis], emit.shape)[emit]
+
+    table = np.empty(len(exon_index), dtype=SPLICE_JUNCTION_TABLE_DTYPE)
+    table['contig'] = rows['contig'][exon_index]
+    table['transcript'] = transcript[exon_index]
+    table['mane'] = mane[exon_index]
+    table['exon_no'] = exon_no[exon_index]
+    table['category'] = np.where(donor_slot[emit], SPLICE_JUNCTION_CATEGORIES.index('Donor'), SPLICE_JUNCTION_CATEGORIES.index('Acceptor'))
+    table['pos'] = pos[emit]
+    table['dist_from_exon'] = dist_from_exon[emit]
+
+    return SpliceJunctionTable(contigs=exons.contigs, transcripts=transcripts, rows=table)
+
+# Column 9 is a list of `key "value";` pairs. Values may contain semicolons, and keys such as db_xref and tag repeat.
+_ATTRIBUTE_PATTERN = re.compile(r'([^\s";]+)\s+(?:"([^"]*)"|([^\s";]+))\s*;?')
+
+ATTRIBUTE_CACHE_SIZE = 65536
+
+class GTFAttributes:
+    """
+    Column 9 of a GTF record split once into key/value pairs.
+
+    Every value of a repeated key (e.g. db_xref, tag) is kept, in the order it appears in the record.
+    """
+    __slots__ = ('_values',)
+
+    def __init__(self, values: dict[str, list[str]]):
+        self._values = values
+
+    @classmethod
+    def parse(cls, attributes: str) -> 'GTFAttributes':
+        # Fast path for the fully quoted `key "value"; ` layout used by NCBI: splitting on quotes leaves
+        # keys at even and values at odd positions, and copes with semicolons inside values
+        values: dict[str, list[str]] = {}
+        parts = attributes.split('"')
+        for i in range(0, len(parts) - 1, 2):
+            key = parts[i].strip('; ')
+            if not key or ' ' in key or ';' in key:
+                return cls._parse_with_pattern(attributes)
+            values.setdefault(key, []).append(parts[i + 1])
+
+        if parts[-1].strip('; \n'):
+            return cls._parse_with_pattern(attributes)
+
+        return cls(values)
+
+    @classmethod
+    def _parse_with_pattern(cls, attributes: str) -> 'GTFAttributes':
+        values: dict[str, list[str]] = {}
+        for key, quoted, unquoted in _ATTRIBUTE_PATTERN.findall(attributes):
+            values.setdefault(key, []).append(quoted or unquoted)
+        return cls(values)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._values})"
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        values = self._values.get(key)
+        return values[0] if values else default
+
+    def get_all(self, key: str) -> tuple[str, ...]:
+        return tuple(self._values.get(key, ()))
+
+    def xrefs(self, db: str) -> tuple[str, ...]:
+        prefix = f'{db}:'
+        return tuple(value[len(prefix):] for value in self._values.get('db_xref', ()) if value.startswith(prefix))
+
+    def xref(self, db: str) -> str | None:
+        xrefs = self.xrefs(db)
+        return xrefs[0] if xrefs else None
+
+    def has_tag(self, tag: str) -> bool:
+        return tag in self._values.get('tag', ())
+
+    def has_xref(self, db: str, value: int | str) -> bool:
+        return f'{db}:{value}' in self._values.get('db_xref', ())
+
+@lru_cache(maxsize=ATTRIBUTE_CACHE_SIZE)
+def parse_gtf_attributes(attributes: str) -> GTFAttributes:
+    """
+    Tokenise column 9 of a GTF record, caching the result per line.
+
+    Use GTFAttributes.parse directly when streaming through a whole file, where lines do not repeat.
+    """
+    return GTFAttributes.parse(attributes)
+
+GTF_MODEL_INDEX_VERSION = 2
+GTF_MODEL_GROUPINGS = ('genes_by_gene', 'transcripts_by_gene', 'exons_by_gene', 'transcripts_by_transcript', 'exons_by_transcript')
+
+class GTFModel:
+    """
+    Columnar in-memory model of the gene, transcript and exon records of a GTF file.
+
+    Each feature type is held as a NumPy structured array in file order. Contigs, Entrez gene IDs
+    (the "GeneID" db_xref) and transcript IDs (the "GenBank" db_xref) are integer coded against
+    string tables, and row indices are grouped by gene and by transcript so that lookups are a
+    dict hit plus a slice rather than a tabix fetch and a regex scan of column 9.
+
+    Coordinates are stored 1-based and inclusive, as they appear in the GTF.
+    """
+    def __init__(self,
+                 contigs: list[str],
+                 gene_ids: list[str],
+                 transcript_ids: list[str],
+                 genes: np.ndarray,
+                 transcripts: np.ndarray,
+                 exons: np.ndarray,
+                 groupings: dict[str, tuple[np.ndarray, np.ndarray]] | None = None):
+        self.contigs = contigs
+        self.gene_ids = gene_ids
+        self.transcript_ids = transcript_ids
+        self.genes = genes
+        self.transcripts = transcripts
+        self.exons = exons
+
+        self._contig_codes = {contig: code for code, contig in enumerate(contigs)}
+        self._gene_codes = {gene_id: code for code, gene_id in enumerate(gene_ids)}
+        self._transcript_codes = {transcript_id: code for code, transcript_id in enumerate(transcript_ids)}
+
+        if groupings is None:
+            groupings = {
+                'genes_by_gene': GTFModel._group_rows(genes['gene'], len(gene_ids)),
+                'transcripts_by_gene': GTFModel._group_rows(transcripts['gene'], len(gene_ids)),
+                'exons_by_gene': GTFModel._group_rows(exons['gene'], len(gene_ids)),
+                'transcripts_by_transcript': GTFModel._group_rows(transcripts['transcript'], len(transcript_ids)),
+                'exons_by_transcript': GTFModel._group_rows(exons['transcript'], len(transcript_ids))
+            }
+        self._groupings = groupings
+
+        self._genes_by_gene = groupings['genes_by_gene']
+        self._transcripts_by_gene = groupings['transcripts_by_gene']
+        self._exons_by_gene = groupings['exons_by_gene']
+        self._transcripts_by_transcript = groupings['transcripts_by_transcript']
+        self._exons_by_transcript = groupings['exons_by_transcript']
+
+    @staticmethod
+    def _group_rows(codes: np.ndarray, n_codes: int) -> tuple[np.ndarray, np.ndarray]:
+        # CSR style grouping: rows for code c are order[offsets[c]:offsets[c + 1]], in file order
+        order = np.argsort(codes, kind='stable')
+        offsets = np.searchsorted(codes[order], np.arange(n_codes + 1), side='left')
+        return order, offsets
+
+    @staticmethod
+    def _rows_for(grouping: tuple[np.ndarray, np.ndarray], code: int | None) -> np.ndarray:
+        order, offsets = grouping
+        if code is None:
+            return order[:0]
+        return order[offsets[code]:offsets[code + 1]]
+
+    @classmethod
+    def from_tabix(cls, tbx: pysam.TabixFile) -> 'GTFModel':
+        contig_codes = {contig: code for code, contig in enumerate(tbx.contigs)}
+        gene_codes: dict[str, int] = {}
+        transcript_codes: dict[str, int] = {}
+        genes, transcripts, exons = [], [], []
+
+        def code_for(codes: dict[str, int], value: str | None) -> int:
+            if value is None:
+                return -1
+            return codes.setdefault(value, len(codes))
+
+        for record in tbx.fetch(multiple_iterators=True, parser=pysam.asTuple()):
+            feature = record[2]
+            if feature not in ('gene', 'transcript', 'exon'):
+                continue
+
+            attributes = GTFAttributes.parse(record[8])
+            contig = code_for(contig_codes, record[0])
+            start = int(record[3])
+            end = int(record[4])
+            strand = STRANDS.index(record[6]) if record[6] in STRANDS else STRANDS.index('.')
+            gene = code_for(gene_codes, attributes.xref('GeneID'))
+
+            if feature == 'gene':
+                genes.append((contig, start, end, strand, gene))
+            elif feature == 'transcript':
+                transcripts.append((contig, start, end, strand, gene,
+                                    code_for(transcript_codes, attributes.xref('GenBank')),
+                                    attributes.has_tag('MANE Select')))
+            else:
+                exon_number = attributes.get('exon_number')
+                exons.append((contig, start, end, strand, gene,
+                              code_for(transcript_codes, attributes.xref('GenBank')),
+                              int(exon_number) if exon_number else 0,
+                              attributes.get('partial') == 'true'))
+
+        logger.info(f"Loaded {len(genes)} genes, {len(transcripts)} transcripts and {len(exons)} exons into memory")
+
+        return cls(contigs=list(contig_codes),
+                   gene_ids=list(gene_codes),
+                   transcript_ids=list(transcript_codes),
+                   genes=np.array(genes, dtype=GENE_DTYPE),
+                   transcripts=np.array(transcripts, dtype=TRANSCRIPT_DTYPE),
+                   exons=np.array(exons, dtype=EXON_DTYPE))
+
+    @staticmethod
+    def default_index_path(gtf_file_path: str) -> str:
+        return f"{gtf_file_path}.model"
+
+    def save(self, index_path: str, gtf_file_path: str) -> None:
+        """
+        Write the model as a directory of .npy files that load() can memory map, keyed on the GTF file it was built from.
+        The directory is written next to index_path and renamed into place, replacing a stale index.
+        """
+        arrays = {
+            'contigs': np.array(self.contigs, dtype=str),
+            'gene_ids': np.array(self.gene_ids, dtype=str),
+            'transcript_ids': np.array(self.transcript_ids, dtype=str),
+            'genes': self.genes,
+            'transcripts': self.transcripts,
+            'exons': self.exons
+        }
+        for name, (order, offsets) in self._groupings.items():
+            arrays[f'{name}_order'] = order
+            arrays[f'{name}_offsets'] = offsets
+
+        index_path = os.path.abspath(index_path)
+        tmp_path = tempfile.mkdtemp(prefix=f"{os.path.basename(index_path)}.", dir=os.path.dirname(index_path))
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+
+            stat = os.stat(gtf_file_path)
+            with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+                json.dump({'version': GTF_MODEL_INDEX_VERSION,
+                           'gtf_size': stat.st_size,
+                           'gtf_mtime_ns': stat.st_mtime_ns,
+                           'gtf_blake2b': file_digest(gtf_file_path)}, f)
+
+            if os.path.isdir(index_path):
+                shutil.rmtree(index_path)
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        logger.info(f"Saved GTF model index for {gtf_file_path} to {index_path}")
+
+    @classmethod
+    def load(cls, index_path: str, gtf_file_path: str) -> 'GTFModel | None':
+        """
+        Memory map an index written by save(), or return None if it is missing or was built from a different GTF file.
+        A changed mtime alone does not make the index stale if the content digest still matches, e.g. after a copy.
+        """
+        meta_path = os.path.join(index_path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        stat = os.stat(gtf_file_path)
+        if meta.get('version') != GTF_MODEL_INDEX_VERSION or meta.get('gtf_size') != stat.st_size or \
+                (meta.get('gtf_mtime_ns') != stat.st_mtime_ns and meta.get('gtf_blake2b') != file_digest(gtf_file_path)):
+            logger.info(f"GTF model index {index_path} is stale for {gtf_file_path}")
+            return None
+
+        def load_array(name: str) -> np.ndarray:
+            return np.load(os.path.join(index_path, f"{name}.npy"), mmap_mode='r')
+
+        logger.info(f"Loading GTF model index {index_path}")
+        return cls(contigs=load_array('contigs').tolist(),
+                   gene_ids=load_array('gene_ids').tolist(),
+                   transcript_ids=load_array('transcript_ids').tolist(),
+                   genes=load_array('genes'),
+                   transcripts=load_array('transcripts'),
+                   exons=load_array('exons'),
+                   groupings={name: (load_array(f'{name}_order'), load_array(f'{name}_offsets'))
+                              for name in GTF_MODEL_GROUPINGS})
+
+    def contig_code(self, chromosome: str) -> int:
+        # Mirror tabix, which refuses to create an iterator for a contig it has no records for
+        if chromosome not in self._contig_codes:
+            raise ValueError(f"could not create iterator for region '{chromosome}'")
+        return self._contig_codes[chromosome]
+
+    @staticmethod
+    def _in_region(table: np.ndarray, rows: np.ndarray, contig: int, start: int | None, end: int | None) -> np.ndarray:
+        # Same region checks and overlap test as a tabix fetch, which takes 0-based half-open coordinates
+        if start is not None and start < 0:
+            raise ValueError(f"start out of range ({start})")
+        if start is not None and end is not None and start > end:
+            raise ValueError(f"start ({start}) >= end ({end})")
+
+        if start is not None and end is not None and start == end:
+            return rows[:0]
+
+        selected = table[rows]
+        mask = selected['contig'] == contig
+        if start is not None:
+            mask &= selected['end'] > start
+        if end is not None:
+            mask &= selected['start'] - 1 < end
+        return rows[mask]
+
+    def gene_rows(self, chromosome: str, entrez_gene_id: int | str) -> np.ndarray:
+        contig = self.contig_code(chromosome)
+        rows = GTFModel._rows_for(self._genes_by_gene, self._gene_codes.get(str(entrez_gene_id)))
+        return GTFModel._in_region(self.genes, rows, contig, None, None)
+
+    def first_gene_rows(self, chromosomes: list[str], entrez_gene_ids: list[int | str]) -> np.ndarray:
+        """
+        Row of the first gene record for each (chromosome, Entrez Gene ID) pair, or -1 if there is none,
+        looked up for all pairs at once. Raises ValueError for a contig without records, as contig_code() does.
+        """
+        n_gene_ids = len(self.gene_ids) + 1
+        gene_keys = self.genes['contig'].astype(np.int64) * n_gene_ids + self.genes['gene']
+        # np.unique reports the first occurrence, i.e. the first record in file order, of every key
+        unique_keys, first_rows = np.unique(gene_keys, return_index=True)
+
+        contigs = np.array([self.contig_code(chromosome) for chromosome in chromosomes], dtype=np.int64)
+        genes = np.array([self._gene_codes.get(str(entrez_gene_id), -1) for entrez_gene_id in entrez_gene_ids], dtype=np.int64)
+        keys = contigs * n_gene_ids + genes
+
+        positions = np.minimum(np.searchsorted(unique_keys, keys), max(len(unique_keys) - 1, 0))
+        found = (genes >= 0) & (len(unique_keys) > 0)
+        found[found] = unique_keys[positions[found]] == keys[found]
+        return np.where(found, first_rows[positions] if len(unique_keys) > 0 else -1, -1)
+
+    def transcript_rows(self, chromosome: str, start: int, end: int, entrez_gene_id: int | str) -> np.ndarray:
+        contig = self.contig_code(chromosome)
+        rows = GTFModel._rows_for(self._transcripts_by_gene, self._gene_codes.get(str(entrez_gene_id)))
+        return GTFModel._in_region(self.transcripts, rows, contig, start, end)
+
+    def exon_rows_by_transcript(self, chromosome: str, start: int, end: int, transcript_id: str) -> np.ndarray:
+        contig = self.contig_code(chromosome)
+        rows = GTFModel._rows_for(self._exons_by_transcript, self._transcript_codes.get(transcript_id))
+        return GTFModel._in_region(self.exons, rows, contig, start, end)
+
+    def exon_rows_by_gene(self, chromosome: str, start: int, end: int, entrez_gene_id: int | str) -> np.ndarray:
+        contig = self.contig_code(chromosome)
+        rows = GTFModel._rows_for(self._exons_by_gene, self._gene_codes.get(str(entrez_gene_id)))
+        return GTFModel._in_region(self.exons, rows, contig, start, end)
+
+    def is_mane_select(self, chromosome: str, start: int, end: int, transcript_id: str) -> bool:
+        contig = self.contig_code(chromosome)
+        rows = GTFModel._rows_for(self._transcripts_by_transcript, self._transcript_codes.get(transcript_id))
+        rows = GTFModel._in_region(self.transcripts, rows, contig, start, end)
+        return bool(self.transcripts['mane'][rows].any())
+
+    def to_exon_table(self, rows: np.ndarray) -> ExonTable:
+        """
+        Same exons as to_exons(), without creating an Exon object per row. Exons without an exon_number have exon_no 0.
+        """
+        table = np.empty(len(rows), dtype=EXON_TABLE_DTYPE)
+        for field in ('contig', 'start', 'end', 'strand'):
+            table[field] = self.exons[field][rows]
+        table['exon_no'] = self.exons['exon_number'][rows]
+        return ExonTable(contigs=self.contigs, rows=table)
+
+    def mane_exon_rows(self) -> np.ndarray:
+        mane = self.transcripts['mane'] & (self.transcripts['transcript'] >= 0)
+        mane_transcripts = np.unique(self.transcripts['transcript'][mane])
+        return np.flatnonzero(np.isin(self.exons['transcript'], mane_transcripts))
+
+    def splice_junction_table(self, mane_only: bool = True) -> SpliceJunctionTable:
+        mane_transcripts = np.unique(self.transcripts['transcript'][self.transcripts['mane'] & (self.transcripts['transcript'] >= 0)])
+        rows = self.mane_exon_rows() if mane_only else np.flatnonzero(self.exons['transcript'] >= 0)
+
+        unnumbered = self.exons['exon_number'][rows] == 0
+        if unnumbered.any():
+            logger.warning(f"Skipping {int(unnumbered.sum())} exons without an exon_number")
+            rows = rows[~unnumbered]
+
+        transcript = self.exons['transcript'][rows]
+        return splice_junction_table(self.to_exon_table(rows),
+                                     transcript=transcript,
+                                     transcripts=self.transcript_ids,
+                                     mane=np.isin(transcript, mane_transcripts))
+
+    def to_exons(self, rows: np.ndarray, exons: list[Exon] | None = None) -> list[Exon]:
+        """
+        Exons of the given rows, appended to exons if given. An exon without an exon_number raises ValueError,
+        and a caller passing its own list keeps the exons before it, as when reading the records with tabix.
+        """
+        exons = [] if exons is None else exons
+        for row in self.exons[rows]:
+            if row['exon_number'] == 0:
+                logger.error(f"No exon_no found for exon at {self.contigs[row['contig']]}:{row['start']}-{row['end']}. Please check")
+                raise ValueError(f"No exon_no found for exon at {self.contigs[row['contig']]}:{row['start']}-{row['end']}")
+
+            exons.append(Exon(chromosome=self.contigs[row['contig']],
+                              start=int(row['start']),
+                              end=int(row['end']),
+                              strand=STRANDS[row['strand']],
+                              exon_no=int(row['exon_number']),
+                              sequence=None))
+        return exons
+
+class GTFRecord:
+    """
+    One GTF line split into its columns. Attributes are parsed the first time they are accessed,
+    so consumers that only look at the fixed columns do not pay for it.
+    """
+    __slots__ = ('chromosome', 'source', 'feature', 'start', 'end', 'score', 'strand', 'frame', 'raw_attributes', '_attributes')
+
+    def __init__(self, line: str):
+        fields = line.rstrip('\r\n').split('\t')
+        self.chromosome = fields[0]
+        self.source = fields[1]
+        self.feature = fields[2]
+        self.start = int(fields[3])
+        self.end = int(fields[4])
+        self.score = fields[5]
+        self.strand = fields[6]
+        self.frame = fields[7]
+        self.raw_attributes = fields[8] if len(fields) > 8 else ''
+        self._attributes: GTFAttributes | None = None
+
+    @property
+    def attributes(self) -> GTFAttributes:
+        if self._attributes is None:
+            self._attributes = GTFAttributes.parse(self.raw_attributes)
+        return self._attributes
+
+class GTFConsumer:
+    """
+    Receives every record of a GTFScanner pass, in file order.
+    """
+    def consume(self, record: GTFRecord) -> None:
+        raise NotImplementedError
+
+    def merge(self, other: 'GTFConsumer') -> None:
+        """
+        Fold in the results of a copy of this consumer that scanned another shard of the file.
+        Only consumers that implement this can be used in a parallel scan.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support parallel scans")
+
+    def close(self) -> None:
+        """
+        Called once the scan has finished, including when it failed.
+        """
+        pass
+
+class FeatureCounter(GTFConsumer):
+    def __init__(self):
+        self.counts = Counter()
+
+    def consume(self, record: GTFRecord) -> None:
+        self.counts[record.feature] += 1
+
+    def merge(self, other: 'FeatureCounter') -> None:
+        self.counts.update(other.counts)
+
+class GeneBiotypeCounter(GTFConsumer):
+    def __init__(self):
+        self.counts = Counter()
+
+    def consume(self, record: GTFRecord) -> None:
+        if record.feature != 'gene':
+            return
+
+        gene_biotype = record.attributes.get('gene_biotype')
+        if not gene_biotype:
+            raise ValueError(f"No gene_biotype found in attributes: {record.raw_attributes}")
+        self.counts[gene_biotype] += 1
+
+    def merge(self, other: 'GeneBiotypeCounter') -> None:
+        self.counts.update(other.counts)
+
+ConsumerT = TypeVar('ConsumerT', bound=GTFConsumer)
+
+_worker_tbx: pysam.TabixFile | None = None
+
+def _open_worker_tabix(gtf_file_path: str) -> None:
+    global _worker_tbx
+    _worker_tbx = pysam.TabixFile(gtf_file_path)
+
+def _scan_contig(contig: str, consumers: list[GTFConsumer]) -> tuple[int, list[GTFConsumer]]:
+    assert _worker_tbx is not None, "Worker tabix handle was not opened"
+
+    records = 0
+    for line in _worker_tbx.fetch(reference=contig):
+        record = GTFRecord(line)
+        for consumer in consumers:
+            consumer.consume(record)
+        records += 1
+    return records, consumers
+
+class GTFScanner:
+    """
+    Streams a GTF file once and hands each record to every registered consumer, so that several
+    counts and extracts can be produced from a single decompression pass.
+
+    With workers > 1 the file is instead sharded by tabix contig over a process pool. Each worker
+    scans with its own copies of the consumers, which are then merged back in contig order.
+    This needs a tabix index and consumers that implement merge().
+    """
+    def __init__(self, gtf_file_path: str, workers: int = 1):
+        self.gtf_file_path = gtf_file_path
+        self.workers = workers
+        self.consumers: list[GTFConsumer] = []
+
+    def register(self, consumer: ConsumerT) -> ConsumerT:
+        self.consumers.append(consumer)
+        return consumer
+
+    def scan(self) -> int:
+        logger.info(f"Scanning {self.gtf_file_path} with {len(self.consumers)} consumers")
+
+        try:
+            if self.workers > 1:
+                records = self._scan_parallel()
+            else:
+                records = self._scan_serial()
+        finally:
+            for consumer in self.consumers:
+                consumer.close()
+
+        logger.info(f"Scanned {records} records from {self.gtf_file_path}")
+        return records
+
+    def _scan_serial(self) -> int:
+        records = 0
+        opener = gzip.open if self.gtf_file_path.endswith('.gz') else open
+        with opener(self.gtf_file_path, 'rt') as f:
+            for line in f:
+                if line.startswith('#') or not line.strip():
+                    continue
+
+                record = GTFRecord(line)
+                for consumer in self.consumers:
+                    consumer.consume(record)
+                records += 1
+        return records
+
+    def _scan_parallel(self) -> int:
+        for consumer in self.consumers:
+            if type(consumer).merge is GTFConsumer.merge:
+                raise ValueError(f"{type(consumer).__name__} does not support parallel scans")
+
+        with pysam.TabixFile(self.gtf_file_path) as tbx:
+            contigs = list(tbx.contigs)
+
+        logger.info(f"Scanning {len(contigs)} contigs with {self.workers} workers")
+
+        # Tasks are pickled lazily, so hand them an untouched copy rather than the consumers being merged into
+        empty_consumers = copy.deepcopy(self.consumers)
+
+        records = 0
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_open_worker_tabix,
+                                 initargs=(self.gtf_file_path,)) as executor:
+            # map() yields in submission order, so merging follows the file's contig order
+            # and the merged results match those of a serial scan
+            results = executor.map(_scan_contig, contigs, [empty_consumers] * len(contigs))
+            for contig_records, contig_consumers in results:
+                for consumer, contig_consumer in zip(self.consumers, contig_consumers):
+                    consumer.merge(contig_consumer)
+                records += contig_records
+        return records
+
+class GeneIndex:
+    """
+    Entrez Gene ID -> gene interval lookup, held per contig so that contigs can be indexed lazily.
+
+    Only the first gene record for an Entrez Gene ID on a contig is kept, matching the first hit
+    of a linear scan. Intervals are the GTF's own 1-based coordinates.
+    """
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self._genes: dict[str, dict[str, tuple[int, int, str]]] = {}
+
+    def __contains__(self, chromosome: str) -> bool:
+        return chromosome in self._genes
+
+    def __len__(self) -> int:
+        return sum(len(genes) for genes in self._genes.values())
+
+    @property
+    def contigs(self) -> list[str]:
+        return list(self._genes)
+
+    def add_contig(self, tbx: pysam.TabixFile, chromosome: str) -> None:
+        genes: dict[str, tuple[int, int, str]] = {}
+        for record in tbx.fetch(reference=chromosome, parser=pysam.asTuple()):
+            if record[2] != 'gene':
+                continue
+            interval = (int(record[3]), int(record[4]), record[6])
+            for gene_id in GTFAttributes.parse(record[8]).xrefs('GeneID'):
+                genes.setdefault(gene_id, interval)
+        self._genes[chromosome] = genes
+
+    @classmethod
+    def from_tabix(cls, tbx: pysam.TabixFile, contigs: list[str] | None = None) -> 'GeneIndex':
+        index = cls()
+        for chromosome in (tbx.contigs if contigs is None else contigs):
+            index.add_contig(tbx, chromosome)
+        return index
+
+    def get(self, chromosome: str, entrez_gene_id: int | str) -> Feature | None:
+        interval = self._genes[chromosome].get(str(entrez_gene_id))
+        if interval is None:
+            return None
+        start, end, strand = interval
+        return Feature(chromosome=chromosome, start=start, end=end, strand=strand, sequence=None)
+
+    @staticmethod
+    def fingerprint(gtf_file_path: str) -> str:
+        stat = os.stat(gtf_file_path)
+        return f"version={GeneIndex.FORMAT_VERSION};size={stat.st_size};mtime_ns={stat.st_mtime_ns}"
+
+    def save(self, path: str, gtf_file_path: str) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(f"#{GeneIndex.fingerprint(gtf_file_path)}\n")
+            f.write("#contig\tentrez_gene_id\tstart\tend\tstrand\n")
+            for chromosome, genes in self._genes.items():
+                # An empty contig is still written so that it is known to have been indexed
+                f.write(f"{chromosome}\t\t\t\t\n")
+                for gene_id, (start, end, strand) in genes.items():
+                    f.write(f"{chromosome}\t{gene_id}\t{start}\t{end}\t{strand}\n")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, gtf_file_path: str) -> 'GeneIndex | None':
+        """
+        Load an index written by save(), or return None if it is missing or was built from a different GTF file.
+        """
+        if not os.path.exists(path):
+            return None
+
+        index = cls()
+        with open(path) as f:
+            if f.readline().rstrip('\n') != f"#{GeneIndex.fingerprint(gtf_file_path)}":
+                logger.info(f"Gene index {path} is stale for {gtf_file_path}")
+                return None
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                chromosome, gene_id, start, end, strand = line.rstrip('\n').split('\t')
+                genes = index._genes.setdefault(chromosome, {})
+                if gene_id:
+                    genes[gene_id] = (int(start), int(end), strand)
+        return index
+
 class GTFHandler:
-    def __init__(self, gtf_file_path: str):
+    def __init__(self, gtf_file_path: str, in_memory: bool = False, gene_index_path: str | None = None,
+                 model_index_path: str | None = None, transcript_model_cache_size: int = 256):
+        """
+        :param gtf_file_path: Path to a bgzipped and tabix indexed GTF file.
+        :param in_memory: Parse the gene, transcript and exon records once into a GTFModel and answer
+                          lookups from it instead of re-fetching and re-parsing records from the GTF.
+        :param gene_index_path: Sidecar file for the Entrez Gene ID index used by get_gene_by_entrez_id.
+                                It is loaded if it matches the GTF file, otherwise built for all contigs and written.
+                                Without it, contigs are indexed the first time they are looked up.
+        :param model_index_path: Directory holding a persistent GTFModel index, see GTFModel.save(). It is memory
+                                 mapped if it matches the GTF file, otherwise built and written. Implies in_memory.
+        :param transcript_model_cache_size: Number of get_transcript_model() results to keep, least recently used first out.
+        """
         self.gtf_file_path = gtf_file_path
         self.tbx: pysam.TabixFile = None # type: ignore
+        self.model: GTFModel | None = None
+        self.gene_index = GeneIndex()
+        self.transcript_model_cache_size = transcript_model_cache_size
+        self._transcript_models: OrderedDict[tuple[str, int, int, str], TranscriptModel] = OrderedDict()
 
         try:
             self.tbx = pysam.TabixFile(gtf_file_path)
@@ -55,26 +889,68 @@ class GTFHandler:
             logger.error(f"Error opening GTF file {gtf_file_path}: {e}")
             raise
 
-    def get_feature_counts(self) -> Counter:
-        feature_counts = Counter()
+        if model_index_path is not None:
+            self.model = GTFModel.load(model_index_path, gtf_file_path)
+            if self.model is None:
+                logger.info(f"Building GTF model index {model_index_path} from {gtf_file_path}")
+                self.model = GTFModel.from_tabix(self.tbx)
+                try:
+                    self.model.save(model_index_path, gtf_file_path)
+                except OSError as e:
+                    logger.warning(f"Could not write GTF model index {model_index_path}: {e}")
+        elif in_memory:
+            logger.info(f"Loading GTF file {gtf_file_path} into memory")
+            self.model = GTFModel.from_tabix(self.tbx)
+
+        if gene_index_path is not None:
+            gene_index = GeneIndex.load(gene_index_path, gtf_file_path)
+            if gene_index is None:
+                self.build_gene_index()
+                try:
+                    self.gene_index.save(gene_index_path, gtf_file_path)
+                except OSError as e:
+                    logger.warning(f"Could not write gene index {gene_index_path}: {e}")
+            else:
+                self.gene_index = gene_index
+
+    def build_gene_index(self, contigs: list[str] | None = None) -> None:
+        """
+        Index the genes of the given contigs, or of every contig in the GTF file, up front.
+        """
+        logger.info(f"Building gene index for {'all' if contigs is None else len(contigs)} contigs of {self.gtf_file_path}")
+        for chromosome in (self.tbx.contigs if contigs is None else contigs):
+            if chromosome not in self.gene_index:
+                self.gene_index.add_contig(self.tbx, chromosome)
 
-        for record in self.tbx.fetch(multiple_iterators=True, parser=pysam.asGTF()):
-            feature_counts[record['feature']] += 1
+    @staticmethod
+    def _exon_from_record(record: pysam.TupleProxy, attributes: GTFAttributes) -> Exon:
+        exon_no = attributes.get('exon_number')
+
+        if exon_no is None:
+            logger.error(f"No exon_no found for {record}. Please check")
+            raise ValueError(f"No exon_no found for {record}")
 
-        return feature_counts
+        return Exon(chromosome=record[0],
+                    # asTuple() leaves the GTF's own 1-based coordinates untouched, unlike asGTF()
+                    start=int(record[3]),
+                    end=int(record[4]),
+                    strand=record[6],
+                    exon_no=int(exon_no),
+                    sequence=None)
 
-    def get_gene_biotype_counts(self) -> Counter:
-        gene_biotype_counts = Counter()
+    def get_feature_counts(self, workers: int = 1) -> Counter:
+        scanner = GTFScanner(self.gtf_file_path, workers=workers)
+        feature_counter = scanner.register(FeatureCounter())
+        scanner.scan()
 
-        for record in self.tbx.fetch(multiple_iterators=True, parser=pysam.asGTF()):
-            if record['feature'] == 'gene':
-                gene_biotype = re.search(r'.*gene_biotype \"(.+?)\";.*', record['attributes'])
-                if gene_biotype:
-                    gene_biotype_counts[gene_biotype.group(1)] += 1
-                else:
-                    raise ValueError(f"No gene_biotype found in attributes: {record['attributes']}")
+        return feature_counter.counts
 
-        return gene_biotype_counts
+    def get_gene_biotype_counts(self, workers: int = 1) -> Counter:
+        scanner = GTFScanner(self.gtf_file_path, workers=workers)
+        gene_biotype_counter = scanner.register(GeneBiotypeCounter())
+        scanner.scan()
+
+        return gene_biotype_counter.counts
 
     def get_transcript_for_gene(self, chromosome: str, start: int, end: int, entrez_gene_id: int, mane: bool = True) -> str | None:
         logger.info(f"Obtaining transcript for Entrez Gene ID: {entrez_gene_id} at location {chromosome}:{start}-{end} (MANE: {mane})")
@@ -82,18 +958,20 @@ class GTFHandler:
         transcript_id = None
         transcripts = []
 
-        for record in self.tbx.fetch(chromosome, start, end, parser=pysam.asGTF()):
-            if mane:
-                if record['feature'] == 'transcript' and re.match(f'.*tag \"MANE Select\";.*', record['attributes']) and re.match(f'.*\"GeneID:{entrez_gene_id}\";.*', record['attributes']):
-                    match = re.search(r'.*\"GenBank:(.+?)\";.*', record['attributes'])
-                    if match:
-                        transcripts.append(match.group(1))
+        if self.model is not None:
+            rows = self.model.transcript_rows(chromosome, start, end, entrez_gene_id)
+            rows = rows[(self.model.transcripts['mane'][rows] == mane) & (self.model.transcripts['transcript'][rows] >= 0)]
+            transcripts = [self.model.transcript_ids[code] for code in self.model.transcripts['transcript'][rows]]
+        else:
+            for record in self.tbx.fetch(chromosome, start, end, parser=pysam.asTuple()):
+                if record[2] != 'transcript':
+                    continue
 
-            else:
-                if record['feature'] == 'transcript' and not re.match(f'.*tag \"MANE Select\";.*', record['attributes']) and re.match(f'.*\"GeneID:{entrez_gene_id}\";.*', record['attributes']):
-                    match = re.search(r'.*\"GenBank:(.+?)\";.*', record['attributes'])
-                    if match:
-                        transcripts.append(match.group(1))
+                attributes = parse_gtf_attributes(record[8])
+                if attributes.has_tag('MANE Select') == mane and attributes.has_xref('GeneID', entrez_gene_id):
+                    transcript = attributes.xref('GenBank')
+                    if transcript:
+                        transcripts.append(transcript)
                 
         if len(transcripts) == 1:
             transcript_id = transcripts[0]
@@ -112,9 +990,18 @@ class GTFHandler:
     def is_transcript_partial(self, chromosome: str, start: int, end: int, transcript_id: str) -> bool:
         logger.info(f"Checking if transcript {transcript_id} is partial at location {chromosome}:{start}-{end}")
 
-        for record in self.tbx.fetch(chromosome, start, end, parser=pysam.asGTF()):
-            if record['feature'] == 'exon' and re.match(f'.*\"GenBank:{transcript_id}\";.*', record['attributes']):
-                if 'partial "true";' in record['attributes']:
+        if self.model is not None:
+            rows = self.model.exon_rows_by_transcript(chromosome, start, end, transcript_id)
+            if self.model.exons['partial'][rows].any():
+                logger.debug(f"Transcript {transcript_id} is partial.")
+                return True
+        else:
+            for record in self.tbx.fetch(chromosome, start, end, parser=pysam.asTuple()):
+                if record[2] != 'exon':
+                    continue
+
+                attributes = parse_gtf_attributes(record[8])
+                if attributes.has_xref('GenBank', transcript_id) and attributes.get('partial') == 'true':
                     logger.debug(f"Transcript {transcript_id} is partial.")
                     return True
                 
@@ -127,23 +1014,16 @@ class GTFHandler:
         exons = []
 
         try:
-            for record in self.tbx.fetch(chromosome, start, end, parser=pysam.asGTF()):
-                if record['feature'] == 'exon' and re.match(f'.*\"GenBank:{transcript_id}\";.*', record['attributes']):
-                    match = re.search(r'exon_number \"(\d+)\"', record['attributes'])
-                    
-                    if match:
-                        exon_no = int(match.group(1))
-                    else:
-                        logger.error("No exon_no found for {record}. Please check")
-                        raise
-
-                    exons.append(Exon(chromosome=record['contig'],
-                                    # Adding 1 to start is necessary because pysam is "pythonic" i.e. treates everything as 0 based (https://pysam.readthedocs.io/en/latest/faq.html#pysam-coordinates-are-wrong)
-                                    start=int(record['start'] + 1),
-                                    end=int(record['end']),
-                                    strand=record['strand'],
-                                    exon_no=exon_no,
-                                    sequence=None))
+            if self.model is not None:
+                self.model.to_exons(self.model.exon_rows_by_transcript(chromosome, start, end, transcript_id), exons)
+            else:
+                for record in self.tbx.fetch(chromosome, start, end, parser=pysam.asTuple()):
+                    if record[2] != 'exon':
+                        continue
+
+                    attributes = parse_gtf_attributes(record[8])
+                    if attributes.has_xref('GenBank', transcript_id):
+                        exons.append(GTFHandler._exon_from_record(record, attributes))
             
             logger.debug(f"Obtained Exons: {exons}")
         except ValueError as e:
@@ -152,28 +1032,91 @@ class GTFHandler:
         finally:
             return exons
     
+    def get_transcript_model(self, chromosome: str, start: int, end: int, transcript_id: str) -> TranscriptModel:
+        """
+        Exons, introns and the partial and MANE Select flags of a transcript in a region, from a single pass
+        over its records. Same results as get_exons_by_transcript(), derive_introns_from_exons() and
+        is_transcript_partial() for the region, except that a contig without records gives an empty model.
+
+        Results are cached per (chromosome, start, end, transcript_id); callers get their own copy.
+        """
+        key = (chromosome, start, end, transcript_id)
+        transcript_model = self._transcript_models.get(key)
+
+        if transcript_model is not None:
+            self._transcript_models.move_to_end(key)
+        else:
+            transcript_model = self._fetch_transcript_model(chromosome, start, end, transcript_id)
+            self._transcript_models[key] = transcript_model
+            if len(self._transcript_models) > self.transcript_model_cache_size:
+                self._transcript_models.popitem(last=False)
+
+        return transcript_model.copy()
+
+    def _fetch_transcript_model(self, chromosome: str, start: int, end: int, transcript_id: str) -> TranscriptModel:
+        logger.info(f"Obtaining transcript model for transcript: {transcript_id} at location {chromosome}:{start}-{end}")
+
+        transcript_model = TranscriptModel(transcript_id=transcript_id)
+
+        try:
+            if self.model is not None:
+                rows = self.model.exon_rows_by_transcript(chromosome, start, end, transcript_id)
+                transcript_model.partial = bool(self.model.exons['partial'][rows].any())
+                transcript_model.is_mane_select = self.model.is_mane_select(chromosome, start, end, transcript_id)
+                self.model.to_exons(rows, transcript_model.exons)
+            else:
+                # An exon without an exon_number ends the exon list, as in get_exons_by_transcript(),
+                # but the rest of the region is still read for the flags
+                exons_complete = True
+
+                for record in self.tbx.fetch(chromosome, start, end, parser=pysam.asTuple()):
+                    if record[2] != 'exon' and record[2] != 'transcript':
+                        continue
+
+                    attributes = parse_gtf_attributes(record[8])
+                    if not attributes.has_xref('GenBank', transcript_id):
+                        continue
+
+                    if record[2] == 'transcript':
+                        transcript_model.is_mane_select |= attributes.has_tag('MANE Select')
+                        continue
+
+                    transcript_model.partial |= attributes.get('partial') == 'true'
+                    if exons_complete:
+                        try:
+                            transcript_model.exons.append(GTFHandler._exon_from_record(record, attributes))
+                        except ValueError:
+                            exons_complete = False
+        except ValueError as e:
+            logger.warning(f"Contig {chromosome} not found while fetching transcript model for region {chromosome}:{start}-{end} and transcript {transcript_id}: {e}")
+
+        transcript_model.introns = GTFHandler.derive_introns_from_exons(transcript_model.exons) if transcript_model.exons else []
+
+        logger.debug(f"Obtained transcript model: {transcript_model}")
+        return transcript_model
+
+    def get_mane_exon_table(self) -> ExonTable:
+        """
+        Every exon of every MANE Select transcript, in file order. Uses the in-memory model, or builds one for the call.
+        """
+        model = self.model if self.model is not None else GTFModel.from_tabix(self.tbx)
+        return model.to_exon_table(model.mane_exon_rows())
+
     def get_exons_by_gene(self, chromosome: str, start: int, end: int, entrez_gene_id: int) -> list[Exon]:
         logger.info(f"Obtaining exons for Entrez Gene ID: {entrez_gene_id} at location {chromosome}:{start}-{end}")
         
         exons = []
 
-        for record in self.tbx.fetch(chromosome, start, end, parser=pysam.asGTF()):
-            if record['feature'] == 'exon' and re.match(f'.*\"GeneID:{entrez_gene_id}\";.*', record['attributes']):
-                match = re.search(r'exon_number \"(\d+)\"', record['attributes'])
-                
-                if match:
-                    exon_no = int(match.group(1))
-                else:
-                    logger.error("No exon_no found for {record}. Please check")
-                    raise
-
-                exons.append(Exon(chromosome=record['contig'],
-                                  # Adding 1 to start is necessary because pysam is "pythonic" i.e. treates everything as 0 based (https://pysam.readthedocs.io/en/latest/faq.html#pysam-coordinates-are-wrong)
-                                  start=int(record['start'] + 1),
-                                  end=int(record['end']),
-                                  strand=record['strand'],
-                                  exon_no=exon_no,
-                                  sequence=None))
+        if self.model is not None:
+            exons = self.model.to_exons(self.model.exon_rows_by_gene(chromosome, start, end, entrez_gene_id))
+        else:
+            for record in self.tbx.fetch(chromosome, start, end, parser=pysam.asTuple()):
+                if record[2] != 'exon':
+                    continue
+
+                attributes = parse_gtf_attributes(record[8])
+                if attributes.has_xref('GeneID', entrez_gene_id):
+                    exons.append(GTFHandler._exon_from_record(record, attributes))
         
         logger.debug(f"Obtained Exons: {exons}")
         return exons
@@ -181,19 +1124,55 @@ class GTFHandler:
     def get_gene_by_entrez_id(self, chromosome: str, entrez_gene_id: int) -> Feature | None:
         logger.info(f"Obtaining gene name for Entrez Gene ID: {entrez_gene_id} in chromosome {chromosome}")
 
-        for record in self.tbx.fetch(reference=chromosome, parser=pysam.asGTF()):
-            if record['feature'] == 'gene' and re.match(f'.*\"GeneID:{entrez_gene_id}\";.*', record['attributes']):
+        if self.model is not None:
+            rows = self.model.gene_rows(chromosome, entrez_gene_id)
+            if len(rows) > 0:
+                gene = self.model.genes[rows[0]]
                 return Feature(
-                    chromosome=record['contig'],
-                    start=int(record['start'] + 1),
-                    end=int(record['end']),
-                    strand=record['strand'],
+                    chromosome=chromosome,
+                    start=int(gene['start']),
+                    end=int(gene['end']),
+                    strand=STRANDS[gene['strand']],
                     sequence=None
                 )
+        else:
+            if chromosome not in self.gene_index:
+                # Raises ValueError for a contig the GTF file has no records for, like a direct fetch
+                self.gene_index.add_contig(self.tbx, chromosome)
+            gene = self.gene_index.get(chromosome, entrez_gene_id)
+            if gene is not None:
+                return gene
 
         logger.warning(f"No gene found for Entrez Gene ID: {entrez_gene_id} in chromosome {chromosome}.")
         return None
     
+    def get_genes_by_entrez_id(self, chromosomes: list[str], entrez_gene_ids: list[int]) -> pd.DataFrame:
+        """
+        get_gene_by_entrez_id() for many genes at once.
+
+        :return: One row per requested gene, in order, with 'found', 'start', 'end' and 'strand' columns.
+                 Genes that are not found have found False, start and end 0 and strand '.'.
+        """
+        if self.model is not None:
+            rows = self.model.first_gene_rows(chromosomes, entrez_gene_ids)
+            genes = self.model.genes[np.maximum(rows, 0)] if len(self.model.genes) > 0 else np.zeros(len(rows), dtype=GENE_DTYPE)
+            found = rows >= 0
+            return pd.DataFrame({'found': found,
+                                 'start': np.where(found, genes['start'], 0),
+                                 'end': np.where(found, genes['end'], 0),
+                                 'strand': np.array(STRANDS)[np.where(found, genes['strand'], STRANDS.index('.'))]})
+
+        for chromosome in dict.fromkeys(chromosomes):
+            if chromosome not in self.gene_index:
+                # Raises ValueError for a contig the GTF file has no records for, like a direct fetch
+                self.gene_index.add_contig(self.tbx, chromosome)
+
+        genes = [self.gene_index.get(chromosome, entrez_gene_id) for chromosome, entrez_gene_id in zip(chromosomes, entrez_gene_ids)]
+        return pd.DataFrame({'found': [gene is not None for gene in genes],
+                             'start': [gene.start if gene is not None else 0 for gene in genes],
+                             'end': [gene.end if gene is not None else 0 for gene in genes],
+                             'strand': [gene.strand if gene is not None else '.' for gene in genes]})
+
     @staticmethod
     def derive_introns_from_exons(exons: list[Exon]) -> list[Intron]:
         if len(exons) == 0:
@@ -263,205 +1242,156 @@ class GTFHandler:
 
     def obtain_sj_positions(self, chrom: str, start: int, end: int, entrez_gene_id: int) -> list[SpliceJunctionPosition]:
         obtained_transcript = self.obtain_transcript(chrom, start, end, entrez_gene_id)
-        
-        splice_junction_positions = []
 
         if obtained_transcript.transcript_id is None:
             logger.warning(f"No transcript found for Entrez Gene ID: {entrez_gene_id} in primary region {chrom}:{start}-{end}.")
-            return splice_junction_positions
+            return []
         else:
             exons = self.get_exons_by_transcript(chromosome=chrom,
                                                         start=start,
                                                         end=end,
                                                         transcript_id=obtained_transcript.transcript_id)
-            if len(exons) == 1:
-                logger.info(f"{obtained_transcript} for Entrez Gene ID: {entrez_gene_id} contains only one exon.")
-                return splice_junction_positions
-            
-            for index, exon in enumerate(exons):
-                if exon.strand == '+':
-                    if exon.exon_no == 1:
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Donor',
-                            pos=exon.end + 1,
-                            dist_from_exon=1
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Donor',
-                            pos=exon.end + 2,
-                            dist_from_exon=2
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                    elif exon.exon_no == len(exons):
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Acceptor',
-                            pos=exon.start - 2,
-                            dist_from_exon=-2
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Acceptor',
-                            pos=exon.start - 1,
-                            dist_from_exon=-1
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                    else:
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Acceptor',
-                            pos=exon.start - 2,
-                            dist_from_exon=-2
-                        )
-
-                        splice_junction_positions.append(sj_pos)
-
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Acceptor',
-                            pos=exon.start - 1,
-                            dist_from_exon=-1
-                        )
-                        splice_junction_positions.append(sj_pos)
- 
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Donor',
-                            pos=exon.end + 1,
-                            dist_from_exon=1
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Donor',
-                            pos=exon.end + 2,
-                            dist_from_exon=2
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                elif exon.strand == '-':
-                    if exon.exon_no == 1:
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Donor',
-                            pos=exon.start - 2,
-                            dist_from_exon=2
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Donor',
-                            pos=exon.start - 1,
-                            dist_from_exon=1
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                    elif exon.exon_no == len(exons):
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Acceptor',
-                            pos=exon.end + 1,
-                            dist_from_exon=-1
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Acceptor',
-                            pos=exon.end + 2,
-                            dist_from_exon=-2
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                    else:
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Donor',
-                            pos=exon.start - 2,
-                            dist_from_exon=2
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Donor',
-                            pos=exon.start - 1,
-                            dist_from_exon=1
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Acceptor',
-                            pos=exon.end + 1,
-                            dist_from_exon=-1
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-                        sj_pos = SpliceJunctionPosition(
-                            chrom=exon.chromosome,
-                            transcript=obtained_transcript.transcript_id,
-                            transcript_is_mane_select=obtained_transcript.is_mane_select,
-                            exon_no=exon.exon_no,
-                            category='Acceptor',
-                            pos=exon.end + 2,
-                            dist_from_exon=-2
-                        )
-                        splice_junction_positions.append(sj_pos)
-
-            return splice_junction_positions
\ No newline at end of file
+            return GTFHandler._sj_positions_for_transcript(obtained_transcript, exons, entrez_gene_id)
+
+    def obtain_transcripts_bulk(self, genes: pd.DataFrame, chrom_column: str = 'chrom') -> list[tuple[ObtainedTranscript, list[Exon]]]:
+        """
+        Resolve the transcript and exons of many genes at once, with the same MANE Select then
+        non-MANE fallback as obtain_transcript() followed by get_exons_by_transcript().
+
+        :param genes: One row per gene, with chrom_column, 'start', 'end' and 'entrez_gene_id' columns.
+                      start and end are passed to tabix as is, as obtain_transcript() does.
+        :return: The obtained transcript and its exons for each row, in the order of the rows.
+        """
+        requests = [(chrom, int(start), int(end), str(entrez_gene_id))
+                    for chrom, start, end, entrez_gene_id
+                    in zip(genes[chrom_column], genes['start'], genes['end'], genes['entrez_gene_id'])]
+
+        if self.model is not None:
+            results = []
+            for chrom, start, end, entrez_gene_id in requests:
+                obtained_transcript = self.obtain_transcript(chrom, start, end, entrez_gene_id)
+                exons = [] if obtained_transcript.transcript_id is None else \
+                    self.get_exons_by_transcript(chrom, start, end, obtained_transcript.transcript_id)
+                results.append((obtained_transcript, exons))
+            return results
+
+        requests_by_contig: dict[str, list[int]] = {}
+        for index, (chrom, start, end, _) in enumerate(requests):
+            # Same region checks as a tabix fetch of the individual gene
+            if start < 0:
+                raise ValueError(f"start out of range ({start})")
+            if start > end:
+                raise ValueError(f"start ({start}) >= end ({end})")
+            requests_by_contig.setdefault(chrom, []).append(index)
+
+        results: list[tuple[ObtainedTranscript, list[Exon]]] = [None] * len(requests) # type: ignore
+        for chrom, indices in requests_by_contig.items():
+            indices.sort(key=lambda index: requests[index][1])
+            contig_results = self._sweep_contig_for_transcripts(chrom, [requests[index] for index in indices])
+            for index, result in zip(indices, contig_results):
+                results[index] = result
+
+        logger.info(f"Obtained transcripts for {len(requests)} genes with {len(requests_by_contig)} fetches")
+        return results
+
+    def _sweep_contig_for_transcripts(self, chrom: str, requests: list[tuple[str, int, int, str]]) -> list[tuple[ObtainedTranscript, list[Exon]]]:
+        # requests are sorted by start; one fetch over their span replaces the MANE, non-MANE and exon fetches per gene
+        requests_by_gene: dict[str, list[int]] = {}
+        for index, (_, start, end, entrez_gene_id) in enumerate(requests):
+            # An empty region overlaps nothing, as with tabix
+            if start < end:
+                requests_by_gene.setdefault(entrez_gene_id, []).append(index)
+
+        mane_transcripts: list[list[str]] = [[] for _ in requests]
+        other_transcripts: list[list[str]] = [[] for _ in requests]
+        exons_by_transcript: dict[str, list[tuple[int, int, str, str | None]]] = {}
+
+        span_start = requests[0][1]
+        span_end = max(end for _, _, end, _ in requests)
+
+        for record in self.tbx.fetch(chrom, span_start, span_end, parser=pysam.asTuple()):
+            feature = record[2]
+            if feature != 'transcript' and feature != 'exon':
+                continue
+
+            record_start = int(record[3])
+            record_end = int(record[4])
+            attributes = GTFAttributes.parse(record[8])
+
+            if feature == 'exon':
+                # Exons are matched on transcript alone, so keep them all until the transcripts are chosen
+                exon = (record_start, record_end, record[6], attributes.get('exon_number'))
+                for transcript in set(attributes.xrefs('GenBank')):
+                    exons_by_transcript.setdefault(transcript, []).append(exon)
+                continue
+
+            transcript = attributes.xref('GenBank')
+            if not transcript:
+                continue
+
+            transcripts = mane_transcripts if attributes.has_tag('MANE Select') else other_transcripts
+            for entrez_gene_id in set(attributes.xrefs('GeneID')):
+                for index in requests_by_gene.get(entrez_gene_id, ()):
+                    _, start, end, _ = requests[index]
+                    if record_start - 1 < end and record_end > start:
+                        transcripts[index].append(transcript)
+
+        results = []
+        for index, (_, start, end, entrez_gene_id) in enumerate(requests):
+            obtained_transcript = ObtainedTranscript()
+            for transcripts, is_mane_select in ((mane_transcripts[index], True), (other_transcripts[index], False)):
+                if len(transcripts) > 0:
+                    if len(transcripts) > 1:
+                        logger.warning(f'Multiple transcripts found for Entrez Gene ID: {entrez_gene_id} at location {chrom}:{start}-{end}. Returning first transcript.')
+                    obtained_transcript.transcript_id = transcripts[0]
+                    obtained_transcript.is_mane_select = is_mane_select
+                    break
+
+            exons = []
+            if obtained_transcript.transcript_id is None:
+                logger.warning(f"Could not find any transcript for Entrez Gene ID: {entrez_gene_id} in region {chrom}:{start}-{end}.")
+            else:
+                for exon_start, exon_end, strand, exon_no in exons_by_transcript.get(obtained_transcript.transcript_id, ()):
+                    if not (exon_start - 1 < end and exon_end > start):
+                        continue
+                    if not exon_no:
+                        # get_exons_by_transcript() stops at an exon without a number and keeps the exons before it
+                        logger.error(f"No exon_no found for exon at {chrom}:{exon_start}-{exon_end}. Please check")
+                        break
+                    exons.append(Exon(chromosome=chrom, start=exon_start, end=exon_end, strand=strand,
+                                      exon_no=int(exon_no), sequence=None))
+
+            results.append((obtained_transcript, exons))
+        return results
+
+    def obtain_sj_positions_bulk(self, genes: pd.DataFrame, chrom_column: str = 'chrom') -> list[list[SpliceJunctionPosition]]:
+        """
+        obtain_sj_positions() for every row of genes, resolved with obtain_transcripts_bulk().
+        """
+        sj_positions = []
+        for (obtained_transcript, exons), entrez_gene_id in zip(self.obtain_transcripts_bulk(genes, chrom_column), genes['entrez_gene_id']):
+            if obtained_transcript.transcript_id is None:
+                sj_positions.append([])
+            else:
+                sj_positions.append(GTFHandler._sj_positions_for_transcript(obtained_transcript, exons, entrez_gene_id))
+        return sj_positions
+
+    @staticmethod
+    def _sj_positions_for_transcript(obtained_transcript: ObtainedTranscript, exons: list[Exon], entrez_gene_id: int) -> list[SpliceJunctionPosition]:
+        if len(exons) == 1:
+            logger.info(f"{obtained_transcript} for Entrez Gene ID: {entrez_gene_id} contains only one exon.")
+            return []
+
+        table = splice_junction_table(ExonTable.from_exons(exons),
+                                      transcript=np.zeros(len(exons), dtype=np.int32),
+                                      transcripts=[obtained_transcript.transcript_id], # type: ignore
+                                      mane=np.full(len(exons), obtained_transcript.is_mane_select))
+        return table.to_positions()
+
+    def get_splice_junction_table(self, mane_only: bool = True) -> SpliceJunctionTable:
+        """
+        Splice junction positions of every MANE Select transcript, or of every transcript, genome-wide.
+        Uses the in-memory model, or builds one for the call.
+        """
+        model = self.model if self.model is not None else GTFModel.from_tabix(self.tbx)
+        return model.splice_junction_table(mane_only=mane_only)
@@ -0,0 +1,70 @@
+from collections.abc import Callable, Hashable
+import logging
+import os
+from typing import TypeVar
+
+import pysam
+
+logger = logging.getLogger(__name__)
+
+HandleT = TypeVar('HandleT')
+
+class HandlePool:
+    """
+    Lazily opened file handles (or objects holding them, such as a GTFHandler), reused for the life of the process.
+
+    Handles are never shared between processes: a pool used after a fork starts empty and opens its own,
+    and a pool pickled to a worker process arrives without handles. Hits and misses are counted per process.
+    """
+    def __init__(self):
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._handles: dict[Hashable, object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __reduce__(self):
+        # The process-wide pool unpickles as the receiving process's own pool, so a worker keeps its
+        # handles across tasks; any other pool unpickles empty
+        if self is handle_pool:
+            return (_process_handle_pool, ())
+        return (HandlePool, ())
+
+    def __len__(self) -> int:
+        return len(self._handles) if self._pid == os.getpid() else 0
+
+    def get(self, key: Hashable, opener: Callable[[], HandleT]) -> HandleT:
+        if self._pid != os.getpid():
+            # Forked: the parent's handles share file offsets with the parent, so they are dropped, not used
+            self._reset()
+
+        if key in self._handles:
+            self.hits += 1
+        else:
+            self.misses += 1
+            logger.debug(f"Opening {key} in process {self._pid}")
+            self._handles[key] = opener()
+
+        return self._handles[key] # type: ignore
+
+    def tabix(self, path: str) -> pysam.TabixFile:
+        return self.get(('TabixFile', path), lambda: pysam.TabixFile(path))
+
+    def fasta(self, path: str) -> pysam.FastaFile:
+        return self.get(('FastaFile', path), lambda: pysam.FastaFile(path))
+
+    def close(self) -> None:
+        if self._pid == os.getpid():
+            for handle in self._handles.values():
+                close = getattr(handle, 'close', None)
+                if close is not None:
+                    close()
+        self._handles.clear()
+
+# Pool shared by everything in the current process
+handle_pool = HandlePool()
+
+def _process_handle_pool() -> HandlePool:
+    return handle_pool
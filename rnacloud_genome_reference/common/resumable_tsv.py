@@ -0,0 +1,95 @@
+from collections.abc import Hashable
+import fcntl
+import logging
+import os
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class ResumableTSVWriter:
+    """
+    Appends rows to a TSV file as they are produced, and records the key of every row written in a checkpoint file
+    next to it (<path>.checkpoint), together with the size of the TSV once the row is in it.
+
+    If a run is killed, the next writer with the same fingerprint truncates the TSV to the last checkpointed size,
+    dropping any half-written rows, and reports the finished keys in `done` so that only the rest is produced.
+    A checkpoint with a different fingerprint, e.g. for other inputs, is discarded and the TSV started afresh.
+    The checkpoint is removed once the writer is closed after a complete run.
+
+    A writer holds an exclusive lock on <path>.lock while open, so a second run on the same path raises
+    RuntimeError rather than writing over the first.
+    """
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.checkpoint_path = path + '.checkpoint'
+        self.lock_path = path + '.lock'
+        self.fingerprint = fingerprint
+        self.done: set[str] = set()
+
+        self.lock = open(self.lock_path, 'w')
+        try:
+            fcntl.flock(self.lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self.lock.close()
+            raise RuntimeError(f"{path} is being written by another run")
+
+        size = self._load_checkpoint()
+        if size > 0:
+            logger.info(f"Resuming {path} after {len(self.done)} rows")
+            self.output = open(path, 'r+', newline='')
+            self.output.truncate(size)
+            self.output.seek(size)
+            self.checkpoint = open(self.checkpoint_path, 'a')
+        else:
+            self.done.clear()
+            self.output = open(path, 'w', newline='')
+            self.checkpoint = open(self.checkpoint_path, 'w')
+            self.checkpoint.write(f"#fingerprint={fingerprint}\n")
+            self.checkpoint.flush()
+
+    def _load_checkpoint(self) -> int:
+        if not os.path.exists(self.path) or not os.path.exists(self.checkpoint_path):
+            return 0
+
+        with open(self.checkpoint_path) as f:
+            # The last line may be cut short if the run was killed while writing it
+            lines = f.read().split('\n')[:-1]
+
+        if len(lines) == 0 or lines[0] != f"#fingerprint={self.fingerprint}":
+            logger.info(f"Ignoring checkpoint {self.checkpoint_path} written for different inputs")
+            return 0
+
+        size = 0
+        for line in lines[1:]:
+            key, size_after = line.split('\t')
+            self.done.add(key)
+            size = int(size_after)
+
+        if size > os.path.getsize(self.path):
+            logger.warning(f"Ignoring checkpoint {self.checkpoint_path}: {self.path} is shorter than checkpointed")
+            return 0
+        return size
+
+    def is_done(self, key: Hashable) -> bool:
+        return str(key) in self.done
+
+    def write(self, rows: pd.DataFrame) -> None:
+        """
+        Append rows, with the header if they are the first, and checkpoint their index labels as keys.
+        """
+        rows.to_csv(self.output, sep="\t", index=False, header=self.output.tell() == 0)
+        self.output.flush()
+
+        size = self.output.tell()
+        self.checkpoint.write(''.join(f"{key}\t{size}\n" for key in rows.index))
+        self.checkpoint.flush()
+        self.done.update(str(key) for key in rows.index)
+
+    def close(self, complete: bool = True) -> None:
+        self.output.close()
+        self.checkpoint.close()
+        if complete:
+            os.remove(self.checkpoint_path)
+            os.remove(self.lock_path)
+        self.lock.close()
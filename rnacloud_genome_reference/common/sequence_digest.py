@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+import hashlib
+import itertools
+import logging
+import os
+import sqlite3
+
+from rnacloud_genome_reference.common.utils import file_digest
+
+logger = logging.getLogger(__name__)
+
+# Bases kept from each end of a sequence: enough for the splice site dinucleotides of an intron
+SEQUENCE_DIGEST_END_LENGTH = 2
+
+# Keys looked up per query, keeping within SQLite's default limit of 999 parameters
+SEQUENCE_DIGEST_CACHE_BATCH_SIZE = 300
+
+@dataclass(frozen=True, slots=True)
+class SequenceDigest:
+    """
+    Stands in for a feature sequence where only its length, equality and ends are needed.
+    Two digests are equal exactly when their sequences are, barring a BLAKE2b collision.
+    """
+    length: int
+    digest: bytes
+    head: str
+    tail: str
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__} (length={self.length}, digest={self.digest.hex()}, head={self.head}, tail={self.tail})"
+
+    @classmethod
+    def of(cls, sequence: str) -> 'SequenceDigest':
+        return cls(length=len(sequence),
+                   digest=hashlib.blake2b(sequence.encode(), digest_size=16).digest(),
+                   head=sequence[:SEQUENCE_DIGEST_END_LENGTH],
+                   tail=sequence[-SEQUENCE_DIGEST_END_LENGTH:])
+
+class SequenceDigestCache:
+    """
+    Persistent SequenceDigest per (contig, start, end) of a FASTA file, in a SQLite database.
+
+    Entries are keyed by the BLAKE2b checksum of the FASTA file, so one database can serve several genomes and
+    a changed FASTA never reuses digests of the old one. The checksum itself is remembered per path, size and
+    mtime, so the FASTA is only read in full when it is new or has changed.
+    """
+    def __init__(self, path: str, fasta_file_path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS fasta (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, checksum TEXT)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS digest (checksum TEXT, contig TEXT, start INTEGER, end INTEGER, "
+                                "length INTEGER, digest BLOB, head TEXT, tail TEXT, PRIMARY KEY (checksum, contig, start, end))")
+        self.connection.commit()
+
+        self.checksum = self._fasta_checksum(fasta_file_path)
+
+    def _fasta_checksum(self, fasta_file_path: str) -> str:
+        path = os.path.abspath(fasta_file_path)
+        stat = os.stat(path)
+
+        row = self.connection.execute("SELECT size, mtime_ns, checksum FROM fasta WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+
+        logger.info(f"Computing checksum of {fasta_file_path} for sequence digest cache {self.path}")
+        checksum = file_digest(path)
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO fasta VALUES (?, ?, ?, ?)", (path, stat.st_size, stat.st_mtime_ns, checksum))
+        return checksum
+
+    def get_many(self, keys: list[tuple[str, int, int]]) -> dict[tuple[str, int, int], SequenceDigest]:
+        digests = {}
+        for batch_start in range(0, len(keys), SEQUENCE_DIGEST_CACHE_BATCH_SIZE):
+            batch = keys[batch_start:batch_start + SEQUENCE_DIGEST_CACHE_BATCH_SIZE]
+            rows = self.connection.execute("SELECT contig, start, end, length, digest, head, tail FROM digest WHERE checksum = ? AND "
+                                           f"(contig, start, end) IN (VALUES {', '.join(['(?, ?, ?)'] * len(batch))})",
+                                           (self.checksum, *itertools.chain.from_iterable(batch)))
+            for contig, start, end, *digest in rows:
+                digests[(contig, start, end)] = SequenceDigest(*digest)
+        return digests
+
+    def put_many(self, digests: dict[tuple[str, int, int], SequenceDigest]) -> None:
+        with self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO digest VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                        [(self.checksum, contig, start, end, digest.length, digest.digest, digest.head, digest.tail)
+                                         for (contig, start, end), digest in digests.items()])
+
+    def close(self) -> None:
+        self.connection.close()
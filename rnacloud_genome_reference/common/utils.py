@@ -1,8 +1,28 @@
+import hashlib
 import logging
+import os
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+def file_digest(path: str) -> str:
+    """
+    BLAKE2b hex digest of a file's contents, read in 1 MiB chunks.
+    """
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_stamp(path: str) -> str:
+    """
+    Size and modification time of a file, following symlinks: a cheap stand-in for file_digest on large inputs that
+    are replaced rather than edited in place.
+    """
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
 class AssemblyReportParser:
     def __init__(self, assembly_report: str):
         self.assembly_report = assembly_report
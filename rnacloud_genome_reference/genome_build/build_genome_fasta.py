@@ -0,0 +1,152 @@
+import argparse
+from contextlib import ExitStack
+import logging
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pysam
+
+from rnacloud_genome_reference.common.fasta import IndexedFastaWriter
+from rnacloud_genome_reference.common.utils import AssemblyReportParser
+from rnacloud_genome_reference.genome_build.intervals import IntervalSet
+
+logger = logging.getLogger(__name__)
+
+# Phases of the build that read or write files; renaming and ordering only look names up in memory
+PHASES = ['subset', 'add_ebv', 'mask', 'compress']
+
+def natural_sort_key(name: str) -> tuple:
+    """
+    Key ordering sequence names as `seqkit sort -N` ordered the assembly.fasta of earlier builds: names compare by
+    the numbers in them, so chr2 comes before chr10, chr1 before chr1_KI270706v1_random and chr22_* before
+    chrUn_*. Names without numbers (chrM, chrX, chrY, chrEBV) come last, in the order they are given in.
+    """
+    numbers = tuple(int(number) for number in re.findall(r'\d+', name))
+    return (0, numbers) if numbers else (1, ())
+
+def mask_sequence(sequence: bytearray, starts: np.ndarray, ends: np.ndarray, mask_char: bytes = b'N') -> int:
+    """
+    Replace the bases in the half-open intervals [starts[i], ends[i]) with mask_char, in place. Intervals are clipped
+    to the sequence, as `bedtools maskfasta` does. Returns the number of bases masked.
+    """
+    starts, ends = np.clip(starts, 0, len(sequence)), np.clip(ends, 0, len(sequence))
+
+    masked = 0
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if end > start:
+            sequence[start:end] = mask_char * (end - start)
+            masked += end - start
+    return masked
+
+def _sequence_bytes(fai: pd.DataFrame, names: list[str]) -> int:
+    """
+    Uncompressed size of the sequence lines of the given sequences, from a .fai.
+    """
+    entries = fai.loc[names]
+    lines = -(-entries['length'] // entries['line_bases'])
+    return int((entries['length'] + lines * (entries['line_width'] - entries['line_bases'])).sum())
+
+def build_genome_fasta(fasta: str,
+                       assembly_report: str,
+                       target_contigs: list[str],
+                       ebv_fasta: str,
+                       mask_beds: list[str],
+                       output_fasta: str,
+                       uncompressed_output_fasta: str | None = None,
+                       line_width: int = 60,
+                       threads: int = 1,
+                       masked_regions_bed: str | None = None) -> dict[str, dict[str, int]]:
+    """
+    Build the genome reference FASTA in one pass over its inputs, in place of a chain of whole-genome rewrites:
+    rename the RefSeq sequences of the source to their UCSC names, subset them to the target contigs, add the EBV
+    sequence, hard-mask the regions of the mask BEDs, order the sequences naturally by name and write them BGZF
+    compressed on the given number of threads with .fai and .gzi indexes (and optionally uncompressed too, with
+    a .fai). The merged union of the mask BEDs is optionally written to masked_regions_bed.
+
+    The final order is known up front, so every target is fetched once from the bgzipped source through its
+    .fai/.gzi, masked in memory and written straight out; no intermediate FASTA is written.
+
+    Returns the bytes read and written by each phase of PHASES. Source FASTA reads are counted uncompressed.
+    """
+    stats = {phase: {'read': 0, 'written': 0} for phase in PHASES}
+
+    assembly_report_parser = AssemblyReportParser(assembly_report)
+    refseq_names = {contig: assembly_report_parser.ucsc_to_refseq(contig) for contig in target_contigs}
+
+    with pysam.FastxFile(ebv_fasta) as records:
+        ebv_sequences = {record.name: record.sequence for record in records}
+    stats['add_ebv']['read'] = os.path.getsize(ebv_fasta)
+
+    duplicates = set(ebv_sequences) & set(target_contigs)
+    if duplicates:
+        raise ValueError(f"Sequences {', '.join(sorted(duplicates))} of {ebv_fasta} are also target contigs")
+
+    mask = IntervalSet.from_bed(*mask_beds)
+    stats['mask']['read'] = sum(os.path.getsize(bed) for bed in mask_beds)
+    if masked_regions_bed is not None:
+        mask.to_bed(masked_regions_bed)
+        stats['mask']['written'] = os.path.getsize(masked_regions_bed)
+
+    # As the sequences of earlier builds were ordered: target contigs by name, then the EBV sequence
+    names = sorted(sorted(target_contigs) + list(ebv_sequences), key=natural_sort_key)
+
+    fai = pd.read_csv(fasta + '.fai', sep='\t', header=None, usecols=[0, 1, 2, 3, 4], names=['name', 'length', 'offset', 'line_bases', 'line_width'], dtype={'name': str}).set_index('name')
+    missing = [contig for contig, refseq in refseq_names.items() if refseq not in fai.index]
+    if missing:
+        raise ValueError(f"Target contigs {', '.join(missing)} are not in {fasta}")
+    stats['subset']['read'] = _sequence_bytes(fai, list(refseq_names.values()))
+
+    masked_bases = 0
+    with ExitStack() as stack:
+        source = stack.enter_context(pysam.FastaFile(fasta))
+        writers = [stack.enter_context(IndexedFastaWriter(output_fasta, line_width=line_width, threads=threads))]
+        if uncompressed_output_fasta is not None:
+            writers.append(stack.enter_context(IndexedFastaWriter(uncompressed_output_fasta, line_width=line_width, compressed=False)))
+
+        for name in names:
+            if name in ebv_sequences:
+                sequence = bytearray(ebv_sequences[name].encode())
+            else:
+                sequence = bytearray(source.fetch(refseq_names[name]).encode())
+
+            starts, ends = mask.intervals(name)
+            if len(ends) > 0 and ends[-1] > len(sequence):
+                logger.warning(f"Mask intervals of {name} past its end at {len(sequence):,} were clipped")
+            masked_bases += mask_sequence(sequence, starts, ends)
+
+            for writer in writers:
+                writer.write_sequence(name, sequence)
+
+    stats['compress']['written'] = sum(os.path.getsize(writer.path) for writer in writers)
+
+    ignored = [contig for contig in mask.contigs if contig not in names]
+    if ignored:
+        logger.warning(f"Mask intervals on {len(ignored)} contigs not in the output were ignored: {', '.join(ignored)}")
+
+    logger.info(f"Wrote {len(names)} sequences with {masked_bases:,} bases masked to {output_fasta}")
+    for phase in PHASES:
+        logger.info(f"{phase}: read {stats[phase]['read']:,} bytes, wrote {stats[phase]['written']:,} bytes")
+
+    return stats
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Build the renamed, subset, masked, ordered and indexed genome reference FASTA in one pass.")
+    parser.add_argument("fasta", help="Path to the bgzipped source FASTA with RefSeq names, indexed (.fai, .gzi).")
+    parser.add_argument("assembly_report", help="Path to the assembly report file.")
+    parser.add_argument("ebv_fasta", help="Path to the EBV FASTA file.")
+    parser.add_argument("output_fasta", help="Output BGZF-compressed FASTA file.")
+    parser.add_argument("--target-contigs", nargs='+', required=True, help="UCSC names of the contigs to keep, see genome_build.get_target_contigs.")
+    parser.add_argument("--mask-beds", nargs='*', default=[], help="BED files with the regions to mask.")
+    parser.add_argument("--uncompressed-output-fasta", default=None, help="Also write the FASTA uncompressed, with its .fai, to this path.")
+    parser.add_argument("--line-width", type=int, default=60, help="Bases per line of the output FASTA.")
+    parser.add_argument("--threads", type=int, default=1, help="Threads compressing the output.")
+    parser.add_argument("--masked-regions-bed", default=None, help="Also write the merged regions of the mask BEDs to this BED file.")
+
+    args = parser.parse_args()
+
+    build_genome_fasta(args.fasta, args.assembly_report, args.target_contigs, args.ebv_fasta, args.mask_beds,
+                       args.output_fasta, args.uncompressed_output_fasta, args.line_width, args.threads, args.masked_regions_bed)
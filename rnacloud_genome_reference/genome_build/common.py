@@ -1,4 +1,13 @@
+from collections.abc import Iterable
 from dataclasses import dataclass
+import logging
+
+import pandas as pd
+
+from rnacloud_genome_reference.common.gtf import GTFHandler
+from rnacloud_genome_reference.genome_build.intervals import IntervalSet
+
+logger = logging.getLogger(__name__)
 
 GRC_FIXES_QUERY = '''
     (comparison_status == 'Different - Exons or introns sequences differ') or \
@@ -28,6 +37,28 @@ class Region:
                 f"end={self.end}, name={self.name}, score={self.score}, "
                 f"strand={self.strand})")
     
+def load_grc_fixes(grc_fixes_assessment: str, query: str) -> pd.DataFrame:
+    logger.info(f'Loading GRC fixes assessment from {grc_fixes_assessment}')
+    grc = pd.read_csv(grc_fixes_assessment, sep='\t', low_memory=False)
+
+    logger.info('Filtering GRC fixes assessment for clinically relevant genes with specific comparison statuses')
+    grc_filtered = grc.query(query)
+    logger.info(f'Found {len(grc)} clinically relevant genes with discrepancies')
+
+    return grc_filtered
+
+def get_fix_genes(grc_filtered: pd.DataFrame, gtf_handler: GTFHandler) -> pd.DataFrame:
+    """
+    The gene of every GRC fix found on its fix contig, looked up for all of them at once: the assessment rows
+    (index included) with 'fix_start', 'fix_end' and 'fix_strand' columns, in order. Rows whose gene is not
+    annotated on the fix contig are left out.
+    """
+    genes = gtf_handler.get_genes_by_entrez_id(grc_filtered['alt_chr_refseq'].tolist(), grc_filtered['entrez_gene_id'].tolist())
+    fix_genes = grc_filtered.assign(fix_start=genes['start'].to_numpy(),
+                                    fix_end=genes['end'].to_numpy(),
+                                    fix_strand=genes['strand'].to_numpy())
+    return fix_genes[genes['found'].to_numpy()]
+
 def subtract_ranges(contig: tuple[int, int], genes: list[tuple[int, int]]) -> list[tuple[int, int]]:
     start, end = contig
 
@@ -35,25 +66,22 @@ def subtract_ranges(contig: tuple[int, int], genes: list[tuple[int, int]]) -> li
         if g_start < start or g_end > end:
             raise ValueError(f"Gene range ({g_start}, {g_end}) is out of contig bounds ({start}, {end})")
 
-    genes.sort()
-    merged_genes = []
-    for gene in genes:
-        if not merged_genes or merged_genes[-1][1] < gene[0] - 1:
-            merged_genes.append(gene)
-        else:
-            merged_genes[-1] = (merged_genes[-1][0], max(merged_genes[-1][1], gene[1]))
-
-    result = []
-    current = start
-    for gene_start, gene_end in merged_genes:
-        if current < gene_start:
-            result.append((current, gene_start - 1))
-        current = max(current, gene_end + 1)
-
-    if current <= end:
-        result.append((current, end))
-
-    return result
+    # 1-based closed ranges are the half-open intervals [start - 1, end)
+    remaining = IntervalSet.from_arrays(['contig'], [start - 1], [end]).subtract(
+        IntervalSet.from_arrays(['contig'] * len(genes), [gene[0] - 1 for gene in genes], [gene[1] for gene in genes]))
+    return [(range_start + 1, range_end) for _, range_start, range_end in remaining]
+
+def from_regions(regions: Iterable[Region]) -> IntervalSet:
+    """
+    IntervalSet of the given 1-based, closed regions.
+    """
+    regions = list(regions)
+    return IntervalSet.from_arrays([region.chrom for region in regions],
+                                   [region.start - 1 for region in regions],
+                                   [region.end for region in regions])
+
+def to_regions(interval_set: IntervalSet, name: str = '') -> list[Region]:
+    return [Region(chrom=contig, start=start + 1, end=end, name=name) for contig, start, end in interval_set]
 
 def write_bed_file(*region_lists: list[Region], output_file: str):
     with open(output_file, 'w') as bed_file:
@@ -0,0 +1,46 @@
+import argparse
+import logging
+
+from rnacloud_genome_reference.common.gtf import GTFHandler
+from rnacloud_genome_reference.common.utils import AssemblyReportParser
+from rnacloud_genome_reference.genome_build.common import GRC_FIXES_QUERY, Region, get_fix_genes, load_grc_fixes, write_bed_file
+from rnacloud_genome_reference.genome_build.generate_mask_bed import get_cen_par_regions, grc_mask_regions
+from rnacloud_genome_reference.genome_build.generate_unmask_bed import fix_unmasked_regions
+
+logger = logging.getLogger(__name__)
+
+def get_grc_mask_and_unmask_regions(assembly_report: str,
+                                    grc_fixes_assessment: str,
+                                    gtf: str,
+                                    query: str,
+                                    gtf_model_index: str | None = None) -> tuple[list[Region], list[Region]]:
+    """
+    The regions of generate_mask_bed.get_grc_mask_regions and generate_unmask_bed.get_fix_unmasked_regions
+    together, from a single read of the assessment and a single lookup of the fix genes in the GTF. The genes
+    kept on each fix contig are then exactly those left out of its mask.
+    """
+    grc_filtered = load_grc_fixes(grc_fixes_assessment, query)
+    fix_genes = get_fix_genes(grc_filtered, GTFHandler(gtf, model_index_path=gtf_model_index))
+
+    mask_regions = grc_mask_regions(grc_filtered, fix_genes, AssemblyReportParser(assembly_report))
+    unmask_regions = fix_unmasked_regions(fix_genes)
+
+    return mask_regions, unmask_regions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the GRC mask and unmask regions from GRC fixes assessment and GTF file in one pass.")
+    parser.add_argument("assembly_report", help="Path to the assembly report file.")
+    parser.add_argument("grc_fixes_assessment", help="Path to the GRC fixes assessment TSV file.")
+    parser.add_argument("gtf", help="Path to the GTF file.")
+    parser.add_argument("cen_par_regions", help="Path to the centromere and PAR regions file.")
+    parser.add_argument("mask_output_bed", default="mask_regions.bed", help="Output BED file containing regions that should be masked.")
+    parser.add_argument("unmask_output_bed", default="unmask_regions.bed", help="Output BED file containing regions that should be unmasked.")
+    parser.add_argument("--gtf-model-index", default=None, help="Path to a persistent GTF model index directory, see common.build_gtf_model_index.")
+
+    args = parser.parse_args()
+
+    grc_fix_mask_regions, grc_fix_unmasked_regions = get_grc_mask_and_unmask_regions(args.assembly_report, args.grc_fixes_assessment, args.gtf, GRC_FIXES_QUERY, args.gtf_model_index)
+    cen_par_mask_regions = get_cen_par_regions(args.cen_par_regions)
+
+    write_bed_file(grc_fix_mask_regions, cen_par_mask_regions, output_file=args.mask_output_bed)
+    write_bed_file(grc_fix_unmasked_regions, output_file=args.unmask_output_bed)
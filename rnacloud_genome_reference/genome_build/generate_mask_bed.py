@@ -6,7 +6,8 @@ import pandas as pd
 
 from rnacloud_genome_reference.common.gtf import GTFHandler
 from rnacloud_genome_reference.common.utils import AssemblyReportParser
-from rnacloud_genome_reference.genome_build.common import GRC_FIXES_QUERY, Region, subtract_ranges, write_bed_file
+from rnacloud_genome_reference.genome_build.common import GRC_FIXES_QUERY, Region, get_fix_genes, load_grc_fixes, subtract_ranges, write_bed_file
+from rnacloud_genome_reference.genome_build.intervals import IntervalSet
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +31,7 @@ def range_diff(start1: int, end1: int, start2: int, end2: int) -> list[tuple[int
     is_int = all(isinstance(v, int) for v in (start1, end1, start2, end2))
 
     if is_int:
-        left_end = overlap_start - 1
-        if left_end >= start1:
-            diffs.append((start1, left_end))
-        right_start = overlap_end + 1
-        if right_start <= end1:
-            diffs.append((right_start, end1))
+        diffs.extend(subtract_ranges((start1, end1), [(overlap_start, overlap_end)]))
     else:
         if start1 < overlap_start:
             diffs.append((start1, overlap_start))
@@ -44,70 +40,47 @@ def range_diff(start1: int, end1: int, start2: int, end2: int) -> list[tuple[int
 
     return diffs
 
-def get_grc_mask_regions(assembly_report: str,
-                         grc_fixes_assessment: str,
-                         gtf: str,
-                         query: str) -> list[Region]:
-    mask_regions = []
-
-    logger.info(f'Loading GRC fixes assessment from {grc_fixes_assessment}')
-    grc = pd.read_csv(grc_fixes_assessment, sep='\t', low_memory=False)
-
-    logger.info('Filtering GRC fixes assessment for clinically relevant genes with specific comparison statuses')
-    grc_filtered = grc.query(query)
-    logger.info(f'Found {len(grc)} clinically relevant genes with discrepancies')
+def grc_mask_regions(grc_filtered: pd.DataFrame, fix_genes: pd.DataFrame, assembly_report_parser: AssemblyReportParser) -> list[Region]:
+    """
+    Mask the primary contig region of every GRC fix, and each fix contig apart from the genes being fixed on it.
 
+    :param grc_filtered: GRC fixes assessment rows to mask, see load_grc_fixes.
+    :param fix_genes: Their genes on the fix contigs, see get_fix_genes.
+    """
     logger.info(f"Retrieving primary contig regions that are to be masked")
-    for _, row in grc_filtered.iterrows():
-        region = Region(
-            chrom=row['chr_ucsc'],
-            start=row['start'],
-            end=row['end'],
-            name=f"{row['gene_name']}-PRIMARY",
-            strand=row['strand']
-        )
-        mask_regions.append(region)
-
-    gtf_handler = GTFHandler(gtf)
-    assembly_report_parser = AssemblyReportParser(assembly_report)
-
-    for _, contig in grc_filtered[['alt_chr_ucsc']].drop_duplicates().iterrows():
-        fix_contig_range = assembly_report_parser.get_contig_range(contig['alt_chr_ucsc'])
-        logger.debug(f"Fix contig {contig['alt_chr_ucsc']} {fix_contig_range}")
+    mask_regions = [Region(chrom=chrom, start=start, end=end, name=f"{gene_name}-PRIMARY", strand=strand)
+                    for chrom, start, end, gene_name, strand
+                    in zip(grc_filtered['chr_ucsc'], grc_filtered['start'], grc_filtered['end'], grc_filtered['gene_name'], grc_filtered['strand'])]
 
-        grc_fixes_for_contig = grc_filtered.query(f'alt_chr_ucsc == "{contig["alt_chr_ucsc"]}"')
+    fix_contigs = grc_filtered.groupby('alt_chr_ucsc', sort=False)['gene_name'].agg(lambda gene_names: '-'.join(gene_names.astype(str)))
+    fix_contig_lengths = {contig: assembly_report_parser.get_contig_range(contig)[1] for contig in fix_contigs.index}
 
-        fix_genes_ranges = []
+    contig_lengths = fix_genes['alt_chr_ucsc'].map(fix_contig_lengths)
+    out_of_bounds = fix_genes[(fix_genes['fix_start'] < 1) | (fix_genes['fix_end'] > contig_lengths)]
+    if len(out_of_bounds) > 0:
+        fixed_gene = out_of_bounds.iloc[0]
+        fix_contig_range = (1, fix_contig_lengths[fixed_gene['alt_chr_ucsc']])
+        logger.error(f"Could not compute mask ranges for {fixed_gene['alt_chr_ucsc']}: gene range ({fixed_gene['fix_start']}, {fixed_gene['fix_end']}) is out of contig bounds {fix_contig_range}")
+        raise ValueError(f"Failed to compute mask ranges for {fixed_gene['alt_chr_refseq']} {fix_contig_range} and gene range ({fixed_gene['fix_start']}, {fixed_gene['fix_end']})")
 
-        for _, row in grc_fixes_for_contig.iterrows():
-            fix_contig_ucsc = row['alt_chr_ucsc']
-            fix_contig_refseq = row['alt_chr_refseq']
-            entrez_gene_id = row['entrez_gene_id']
+    fix_masks = IntervalSet.from_contig_lengths(fix_contig_lengths).subtract(
+        IntervalSet.from_arrays(fix_genes['alt_chr_ucsc'], fix_genes['fix_start'] - 1, fix_genes['fix_end']))
 
-            fixed_gene = gtf_handler.get_gene_by_entrez_id(fix_contig_refseq, entrez_gene_id)
-
-            if fixed_gene is not None:
-                logger.debug(f"Entrez gene id {entrez_gene_id} / {row['gene_name']} {fixed_gene}")
-                fix_genes_ranges.append((fixed_gene.start, fixed_gene.end))
-
-        try:
-            mask_ranges = subtract_ranges(fix_contig_range, fix_genes_ranges)
-        except ValueError as e:
-            logger.error(f"Could not compute mask ranges for {contig['alt_chr_ucsc']}: {e}")
-            raise ValueError(f"Failed to compute mask ranges for {fix_contig_refseq} {fix_contig_range} and {fixed_gene}") from e
-
-        gene_names = '-'.join(grc_fixes_for_contig['gene_name'].to_list())
-
-        for gene_range in mask_ranges:
-            mask_regions.append(Region(
-                chrom=contig['alt_chr_ucsc'],
-                start=gene_range[0],
-                end=gene_range[1],
-                name=f"{gene_names}-FIX"
-            ))
+    for contig, gene_names in fix_contigs.items():
+        starts, ends = fix_masks.intervals(contig)
+        mask_regions.extend(Region(chrom=contig, start=start + 1, end=end, name=f"{gene_names}-FIX") for start, end in zip(starts.tolist(), ends.tolist()))
 
     return mask_regions
 
+def get_grc_mask_regions(assembly_report: str,
+                         grc_fixes_assessment: str,
+                         gtf: str,
+                         query: str,
+                         gtf_model_index: str | None = None) -> list[Region]:
+    grc_filtered = load_grc_fixes(grc_fixes_assessment, query)
+    fix_genes = get_fix_genes(grc_filtered, GTFHandler(gtf, model_index_path=gtf_model_index))
+    return grc_mask_regions(grc_filtered, fix_genes, AssemblyReportParser(assembly_report))
+
 def get_cen_par_regions(cen_par_regions: str) -> list[Region]:
     logger.info(f'Loading centromere and PAR regions from {cen_par_regions}')
     df = pd.read_csv(cen_par_regions, sep='\t', low_memory=False)
@@ -131,10 +104,11 @@ if __name__ == "__main__":
     parser.add_argument("gtf", help="Path to the GTF file.")
     parser.add_argument("cen_par_regions", help="Path to the centromere and PAR regions file.")
     parser.add_argument("output_bed", default="mask_regions.bed", help="Output BED file containing regions that should be masked.")
+    parser.add_argument("--gtf-model-index", default=None, help="Path to a persistent GTF model index directory, see common.build_gtf_model_index.")
 
     args = parser.parse_args()
 
-    grc_fix_mask_regions = get_grc_mask_regions(args.assembly_report, args.grc_fixes_assessment, args.gtf, GRC_FIXES_QUERY)
+    grc_fix_mask_regions = get_grc_mask_regions(args.assembly_report, args.grc_fixes_assessment, args.gtf, GRC_FIXES_QUERY, args.gtf_model_index)
     cen_par_mask_regions = get_cen_par_regions(args.cen_par_regions)
 
     write_bed_file(grc_fix_mask_regions, cen_par_mask_regions, output_file=args.output_bed)
\ No newline at end of file
@@ -0,0 +1,178 @@
+import argparse
+from collections.abc import Iterable, Iterator
+import os
+
+import numpy as np
+import pandas as pd
+
+def _merge(starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sorted, disjoint, non-adjacent half-open intervals covering the same positions as the given ones.
+    """
+    non_empty = starts < ends
+    starts, ends = starts[non_empty], ends[non_empty]
+    if len(starts) == 0:
+        return starts, ends
+
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+
+    # An interval starts a new run when it begins after every earlier interval has ended
+    reach = np.maximum.accumulate(ends)
+    first = np.empty(len(starts), dtype=bool)
+    first[0] = True
+    first[1:] = starts[1:] > reach[:-1]
+
+    run_starts = starts[first]
+    run_ends = reach[np.append(np.flatnonzero(first)[1:] - 1, len(starts) - 1)]
+    return run_starts, run_ends
+
+def _intersect(starts1: np.ndarray, ends1: np.ndarray, starts2: np.ndarray, ends2: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Intersection of two merged interval lists; the result is merged too.
+    """
+    # For each interval of the first list, the run of intervals of the second list overlapping it
+    first = np.searchsorted(ends2, starts1, side='right')
+    last = np.searchsorted(starts2, ends1, side='left')
+    counts = np.maximum(last - first, 0)
+
+    pairs1 = np.repeat(np.arange(len(starts1)), counts)
+    pairs2 = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+    return np.maximum(starts1[pairs1], starts2[pairs2]), np.minimum(ends1[pairs1], ends2[pairs2])
+
+def _gaps(starts: np.ndarray, ends: np.ndarray, lower: int, upper: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Complement of a merged interval list within [lower, upper).
+    """
+    gap_starts = np.concatenate(([lower], ends))
+    gap_ends = np.concatenate((starts, [upper]))
+    non_empty = gap_starts < gap_ends
+    return gap_starts[non_empty], gap_ends[non_empty]
+
+class IntervalSet:
+    """
+    Set of positions on named contigs, kept per contig as NumPy arrays of sorted, disjoint, non-adjacent
+    half-open intervals in 0-based (BED) coordinates.
+
+    Every operation works on whole arrays per contig: union, intersection and subtraction in O((n+m) log(n+m)),
+    complement against contig lengths (e.g. AssemblyReportParser.contig_lengths) and coverage in O(n).
+    Regions, which are 1-based and closed, convert with genome_build.common.from_regions and to_regions.
+    """
+    def __init__(self, intervals: dict[str, tuple[np.ndarray, np.ndarray]] | None = None):
+        self._intervals: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for contig, (starts, ends) in (intervals or {}).items():
+            starts, ends = _merge(np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64))
+            if len(starts) > 0:
+                self._intervals[contig] = (starts, ends)
+
+    @classmethod
+    def from_arrays(cls, contigs: Iterable[str] | np.ndarray, starts: Iterable[int] | np.ndarray, ends: Iterable[int] | np.ndarray) -> 'IntervalSet':
+        """
+        Set of the half-open intervals [starts[i], ends[i]) on contigs[i], in any order, overlapping or not.
+        """
+        frame = pd.DataFrame({'contig': contigs, 'start': starts, 'end': ends})
+        starts_array, ends_array = frame['start'].to_numpy(dtype=np.int64), frame['end'].to_numpy(dtype=np.int64)
+        return cls({contig: (starts_array[rows], ends_array[rows]) for contig, rows in frame.groupby('contig', sort=False).indices.items()})
+
+    @classmethod
+    def from_bed(cls, *bed_file_paths: str) -> 'IntervalSet':
+        beds = [pd.read_csv(path, sep='\t', header=None, usecols=[0, 1, 2], names=['contig', 'start', 'end'], dtype={'contig': str}, comment='#')
+                for path in bed_file_paths if os.path.getsize(path) > 0]
+        bed = pd.concat(beds, ignore_index=True) if beds else pd.DataFrame(columns=['contig', 'start', 'end'])
+        return cls.from_arrays(bed['contig'], bed['start'], bed['end'])
+
+    @classmethod
+    def from_contig_lengths(cls, contig_lengths: dict[str, int]) -> 'IntervalSet':
+        """
+        Set of every position of the given contigs.
+        """
+        return cls({contig: (np.array([0]), np.array([length])) for contig, length in contig_lengths.items()})
+
+    @property
+    def contigs(self) -> list[str]:
+        return list(self._intervals)
+
+    def intervals(self, contig: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Starts and ends of the intervals on a contig, empty if it has none.
+        """
+        return self._intervals.get(contig, (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)))
+
+    def __iter__(self) -> Iterator[tuple[str, int, int]]:
+        for contig, (starts, ends) in self._intervals.items():
+            yield from zip([contig] * len(starts), starts.tolist(), ends.tolist())
+
+    def __len__(self) -> int:
+        return sum(len(starts) for starts, _ in self._intervals.values())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return (self._intervals.keys() == other._intervals.keys() and
+                all(np.array_equal(self._intervals[contig][0], other._intervals[contig][0]) and
+                    np.array_equal(self._intervals[contig][1], other._intervals[contig][1]) for contig in self._intervals))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__} (contigs={len(self._intervals)}, intervals={len(self)}, bases={sum(self.coverage().values())})"
+
+    def union(self, other: 'IntervalSet') -> 'IntervalSet':
+        contigs = list(self._intervals) + [contig for contig in other._intervals if contig not in self._intervals]
+        return IntervalSet({contig: (np.concatenate((self.intervals(contig)[0], other.intervals(contig)[0])),
+                                     np.concatenate((self.intervals(contig)[1], other.intervals(contig)[1]))) for contig in contigs})
+
+    def intersect(self, other: 'IntervalSet') -> 'IntervalSet':
+        return IntervalSet({contig: _intersect(*self._intervals[contig], *other._intervals[contig])
+                            for contig in self._intervals if contig in other._intervals})
+
+    def subtract(self, other: 'IntervalSet') -> 'IntervalSet':
+        result = {}
+        for contig, (starts, ends) in self._intervals.items():
+            if contig in other._intervals:
+                # Everything on the contig not in other, bounded by the intervals subtracted from
+                starts, ends = _intersect(starts, ends, *_gaps(*other._intervals[contig], int(starts[0]), int(ends[-1])))
+            result[contig] = (starts, ends)
+        return IntervalSet(result)
+
+    def complement(self, contig_lengths: dict[str, int]) -> 'IntervalSet':
+        """
+        Positions of the given contigs not in this set. Raises ValueError for intervals on contigs missing from
+        contig_lengths or extending past a contig's end, which mean the set and the lengths disagree.
+        """
+        for contig, (starts, ends) in self._intervals.items():
+            if contig not in contig_lengths:
+                raise ValueError(f"Contig {contig} has no length")
+            if ends[-1] > contig_lengths[contig] or starts[0] < 0:
+                raise ValueError(f"Interval [{starts[0]}, {ends[-1]}) on {contig} is out of contig bounds [0, {contig_lengths[contig]})")
+
+        return IntervalSet({contig: _gaps(*self.intervals(contig), 0, length) for contig, length in contig_lengths.items()})
+
+    def coverage(self) -> dict[str, int]:
+        """
+        Number of positions in the set, per contig.
+        """
+        return {contig: int((ends - starts).sum()) for contig, (starts, ends) in self._intervals.items()}
+
+    def to_bed(self, path: str) -> None:
+        """
+        Write the intervals as a three-column BED file, contigs in name order.
+        """
+        with open(path, 'w') as bed:
+            for contig in sorted(self._intervals):
+                starts, ends = self._intervals[contig]
+                bed.writelines(f"{contig}\t{start}\t{end}\n" for start, end in zip(starts.tolist(), ends.tolist()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Union or subtract the regions of BED files, writing the merged result as a BED file.")
+    parser.add_argument("operation", choices=['union', 'subtract'], help="union: regions in any of the BED files. subtract: regions of the first BED file in none of the others.")
+    parser.add_argument("output_bed", help="Output BED file.")
+    parser.add_argument("bed", help="First BED file.")
+    parser.add_argument("other_beds", nargs='*', help="Further BED files.")
+
+    args = parser.parse_args()
+
+    if args.operation == 'union':
+        result = IntervalSet.from_bed(args.bed, *args.other_beds)
+    else:
+        result = IntervalSet.from_bed(args.bed).subtract(IntervalSet.from_bed(*args.other_beds))
+    result.to_bed(args.output_bed)
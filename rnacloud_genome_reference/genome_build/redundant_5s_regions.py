@@ -0,0 +1,52 @@
+import argparse
+import logging
+import re
+
+from rnacloud_genome_reference.common.gtf import GTFConsumer, GTFRecord, GTFScanner
+from rnacloud_genome_reference.genome_build.common import Region, write_bed_file
+
+logger = logging.getLogger(__name__)
+
+# RNA5S1 is kept; the other copies of the 5S rDNA array on chr1 are redundant and get masked
+REDUNDANT_5S_CONTIG_REFSEQ = 'NC_000001.11'
+REDUNDANT_5S_CONTIG_UCSC = 'chr1'
+REDUNDANT_5S_GENE_ID = re.compile(r'RNA5S([2-9]|1[0-7])')
+
+class Redundant5SRegionCollector(GTFConsumer):
+    def __init__(self):
+        self.regions: list[Region] = []
+
+    def consume(self, record: GTFRecord) -> None:
+        if record.feature != 'gene' or record.chromosome != REDUNDANT_5S_CONTIG_REFSEQ:
+            return
+
+        gene_id = record.attributes.get('gene_id')
+        if gene_id is not None and REDUNDANT_5S_GENE_ID.fullmatch(gene_id):
+            self.regions.append(
+                Region(
+                    chrom=REDUNDANT_5S_CONTIG_UCSC,
+                    start=record.start,
+                    end=record.end,
+                    name=f"{gene_id}-Redundant5S",
+                    score=0,
+                    strand='.'
+                )
+            )
+
+def get_redundant_5s_regions(gtf: str) -> list[Region]:
+    scanner = GTFScanner(gtf)
+    collector = scanner.register(Redundant5SRegionCollector())
+    scanner.scan()
+
+    logger.info(f"Found {len(collector.regions)} redundant 5S regions")
+    return collector.regions
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Generate a BED file of the redundant 5S rRNA genes on chr1.")
+    parser.add_argument("gtf", help="Path to the GTF file.")
+    parser.add_argument("output_bed", default="redundant_5s_regions.bed", help="Output BED file containing redundant 5S regions.")
+    args = parser.parse_args()
+
+    write_bed_file(get_redundant_5s_regions(args.gtf), output_file=args.output_bed)
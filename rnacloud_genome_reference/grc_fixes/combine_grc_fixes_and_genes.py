@@ -1,16 +1,32 @@
 import logging
 import sqlite3
+from typing import Literal
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-def combine_grc_fixes_and_genes(grc_fixes_file: str, genes_file: str, output_file: str) -> None:
-    # Read GRC fixes and genes files
-    grc_fixes_df = pd.read_csv(grc_fixes_file, sep='\t')
-    genes_df = pd.read_csv(genes_file, sep='\t')
+# Output columns, with the table each is taken from
+COMBINED_COLUMNS = [('grc_fixes', 'chr_refseq'),
+                    ('grc_fixes', 'chr_ucsc'),
+                    ('genes', 'start'),
+                    ('genes', 'end'),
+                    ('genes', 'strand'),
+                    ('genes', 'gene_name'),
+                    ('genes', 'entrez_gene_id'),
+                    ('genes', 'gene_biotype'),
+                    ('grc_fixes', 'issue_id'),
+                    ('grc_fixes', 'type'),
+                    ('grc_fixes', 'summary'),
+                    ('grc_fixes', 'description'),
+                    ('grc_fixes', 'alt_chr_refseq'),
+                    ('grc_fixes', 'alt_chr_ucsc'),
+                    ('grc_fixes', 'alt_scaf_start'),
+                    ('grc_fixes', 'alt_scaf_stop')]
 
+def _combine_sqlite(grc_fixes_df: pd.DataFrame, genes_df: pd.DataFrame) -> pd.DataFrame:
     # Write both to sqlite database
     conn = sqlite3.connect(":memory:")
     grc_fixes_df.to_sql('grc_fixes', conn, if_exists='replace', index=False)
@@ -41,11 +57,83 @@ def combine_grc_fixes_and_genes(grc_fixes_file: str, genes_file: str, output_fil
     """
 
     combined_df = pd.read_sql_query(sql, conn)
+    conn.close()
+    return combined_df
+
+def overlap_join(genes_df: pd.DataFrame, grc_fixes_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Row positions of every (gene, GRC fix) pair on the same chromosome whose closed intervals overlap, ordered by
+    fix and then gene.
+
+    Per chromosome, genes are sorted by start. A gene overlapping a fix starts no later than parent_stop and, being
+    no longer than the longest gene on the chromosome, no earlier than parent_start minus that length; searchsorted
+    finds that window for every fix at once and only the gene ends within it are checked.
+    """
+    gene_starts, gene_ends = genes_df['start'].to_numpy(), genes_df['end'].to_numpy()
+    parent_starts, parent_stops = grc_fixes_df['parent_start'].to_numpy(), grc_fixes_df['parent_stop'].to_numpy()
+    fixes_by_chromosome = grc_fixes_df.groupby('chr_refseq', sort=False).indices
+
+    gene_positions, fix_positions = [np.empty(0, dtype=np.intp)], [np.empty(0, dtype=np.intp)]
+    for chromosome, genes in genes_df.groupby('chr', sort=False).indices.items():
+        fixes = fixes_by_chromosome.get(chromosome)
+        if fixes is None:
+            continue
+
+        genes = genes[np.argsort(gene_starts[genes], kind='stable')]
+        starts, ends = gene_starts[genes], gene_ends[genes]
+        longest = (ends - starts).max()
+
+        window_start = np.searchsorted(starts, parent_starts[fixes] - longest, side='left')
+        window_end = np.searchsorted(starts, parent_stops[fixes], side='right')
+        window_size = np.maximum(window_end - window_start, 0)
+
+        # Every (fix, gene in its window) pair, as positions into the sorted genes
+        candidate_fixes = np.repeat(fixes, window_size)
+        candidates = np.repeat(window_start - np.cumsum(window_size) + window_size, window_size) + np.arange(window_size.sum())
+        overlapping = ends[candidates] >= parent_starts[candidate_fixes]
+
+        gene_positions.append(genes[candidates[overlapping]])
+        fix_positions.append(candidate_fixes[overlapping])
+
+    gene_positions, fix_positions = np.concatenate(gene_positions), np.concatenate(fix_positions)
+    order = np.lexsort((gene_positions, fix_positions))
+    return gene_positions[order], fix_positions[order]
+
+def _combine_sweep(grc_fixes_df: pd.DataFrame, genes_df: pd.DataFrame) -> pd.DataFrame:
+    gene_positions, fix_positions = overlap_join(genes_df, grc_fixes_df)
+
+    # SQLite looks genes up through an automatic index over all their columns, so returns those of a fix
+    # ordered by the gene columns in turn rather than by row; order them the same way
+    gene_order = genes_df.reset_index(drop=True).sort_values(list(genes_df.columns), kind='stable', na_position='first').index.to_numpy()
+    gene_rank = np.empty(len(genes_df), dtype=np.intp)
+    gene_rank[gene_order] = np.arange(len(genes_df))
+
+    order = np.lexsort((gene_rank[gene_positions], fix_positions))
+    gene_positions, fix_positions = gene_positions[order], fix_positions[order]
+
+    tables = {'genes': genes_df.iloc[gene_positions].reset_index(drop=True),
+              'grc_fixes': grc_fixes_df.iloc[fix_positions].reset_index(drop=True)}
+    return pd.DataFrame({column: tables[table][column] for table, column in COMBINED_COLUMNS})
+
+def combine_grc_fixes_and_genes(grc_fixes_file: str, genes_file: str, output_file: str, engine: Literal['sweep', 'sqlite'] = 'sweep') -> None:
+    """
+    Pair every GRC fix with the genes overlapping its region of the primary assembly.
+
+    :param engine: 'sweep' joins with a sorted sweep per chromosome, see overlap_join. 'sqlite' runs the equivalent
+                   range join in an in-memory SQLite database. Both write identical rows in the same order.
+    """
+    # Read GRC fixes and genes files
+    grc_fixes_df = pd.read_csv(grc_fixes_file, sep='\t')
+    genes_df = pd.read_csv(genes_file, sep='\t')
+
+    if engine == 'sqlite':
+        combined_df = _combine_sqlite(grc_fixes_df, genes_df)
+    else:
+        combined_df = _combine_sweep(grc_fixes_df, genes_df)
+
     combined_df.to_csv(output_file, sep='\t', index=False, header=True)
     logger.info(f"Combined GRC fixes and protein coding genes saved to {output_file}")
 
-    conn.close()
-
 if __name__ == "__main__":
     import argparse
 
@@ -54,5 +142,7 @@ if __name__ == "__main__":
     parser.add_argument("protein_coding_genes_file", help="Path to the protein coding genes TSV file.")
     parser.add_argument("output_file", help="Path to save the combined output TSV file.")
 
+    parser.add_argument("--engine", choices=['sweep', 'sqlite'], default='sweep', help="Interval join implementation: a sorted sweep per chromosome, or a range join in SQLite.")
+
     args = parser.parse_args()
-    combine_grc_fixes_and_genes(args.grc_fixes_file, args.protein_coding_genes_file, args.output_file)
\ No newline at end of file
+    combine_grc_fixes_and_genes(args.grc_fixes_file, args.protein_coding_genes_file, args.output_file, args.engine)
\ No newline at end of file
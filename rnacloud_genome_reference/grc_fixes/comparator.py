@@ -1,15 +1,23 @@
 from dataclasses import dataclass, field
 import dataclasses
+import hashlib
 from typing import Literal
 
 import pysam
 
+from rnacloud_genome_reference.common import handles
 from rnacloud_genome_reference.common.gtf import Feature, Exon, Intron, GTFHandler, ObtainedTranscript
+from rnacloud_genome_reference.common.handles import HandlePool
+from rnacloud_genome_reference.common.sequence_digest import SequenceDigest, SequenceDigestCache
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Version of the comparison logic, part of every input digest. Bump it with any change to FeatureComparator or
+# FeatureComparisonResult that can change a result, so that results of earlier releases are not carried forward.
+COMPARISON_VERSION = 1
+
 @dataclass
 class FeatureComparisonResult:
     primary_contig_transcript: str | None
@@ -24,9 +32,9 @@ class FeatureComparisonResult:
     fix_contig_n_introns: int
     n_exons_equal: bool
     n_introns_equal: bool
-    sequences_unequal_n_exons: int
-    sequences_unequal_n_introns: int
-    splice_sites_unequal_n: int
+    sequences_unequal_n_exons: int | None
+    sequences_unequal_n_introns: int | None
+    splice_sites_unequal_n: int | None
     primary_exon_lengths: str | None = field(default=None, repr=False)
     primary_intron_lengths: str | None = field(default=None, repr=False)
     fix_exon_lengths: str | None = field(default=None, repr=False)
@@ -76,23 +84,99 @@ class FeatureComparisonResult:
 
         
 class FeatureSequenceHelper:
-    def __init__(self, fasta: str):
-        self.fasta = pysam.FastaFile(fasta)
+    def __init__(self, fasta: str, handle_pool: HandlePool | None = None, coalesce: bool = False, max_gap: int = 100_000,
+                 digests: bool = False, digest_cache: SequenceDigestCache | None = None):
+        """
+        :param fasta: Path to a (bgzipped) and faidx indexed FASTA file.
+        :param handle_pool: Pool to take the FASTA handle from, rather than opening it.
+        :param coalesce: Fetch the span covering a run of features on a chromosome once and slice each feature's
+                         sequence from it, rather than fetching every feature. Features further apart than
+                         max_gap start a new span.
+        :param digests: Set feature sequences to a SequenceDigest rather than the sequence itself.
+        :param digest_cache: Persistent digests to look features up in before fetching them. Implies digests.
+        """
+        # A pooled handle saves reopening the FASTA and reloading its .fai/.gzi for every helper
+        self.fasta = handle_pool.fasta(fasta) if handle_pool is not None else pysam.FastaFile(fasta)
+        self.coalesce = coalesce
+        self.max_gap = max_gap
+        self.digests = digests or digest_cache is not None
+        self.digest_cache = digest_cache
+        self.fetches = 0
+
+    def _fetch(self, chromosome: str, start: int, end: int) -> str:
+        self.fetches += 1
+        return self.fasta.fetch(chromosome, start, end).upper()
 
     def get_seq_for_feature(self, features: list[Feature]) -> list[Feature]:
+        if not self.digests:
+            return self._get_sequences(features)
+
+        pending = [feature for feature in features if feature.sequence is None]
+
+        if self.digest_cache is not None:
+            cached = self.digest_cache.get_many([(feature.chromosome, feature.start, feature.end) for feature in pending])
+            for feature in pending:
+                feature.sequence = cached.get((feature.chromosome, feature.start, feature.end)) # type: ignore
+            pending = [feature for feature in pending if feature.sequence is None]
+
+        self._get_sequences(pending)
+
+        digests = {}
+        for feature in pending:
+            feature.sequence = digests.setdefault((feature.chromosome, feature.start, feature.end), SequenceDigest.of(feature.sequence)) # type: ignore
+        if self.digest_cache is not None and digests:
+            self.digest_cache.put_many(digests)
+
+        return features
+
+    def _get_sequences(self, features: list[Feature]) -> list[Feature]:
+        if self.coalesce and self._coalescable(features):
+            self._get_seq_for_spans(features)
+            return features
+
         for feature in features:
             if feature.sequence is None:
                 try:
-                    feature.sequence = self.fasta.fetch(
+                    feature.sequence = self._fetch(
                         feature.chromosome, 
                         feature.start - 1,  # pysam is 0-based
                         feature.end
-                    ).upper()
+                    )
                 except ValueError as e:
                     logger.error(f"Error fetching sequence for {feature.chromosome}:{feature.start}-{feature.end}: {e}")
                     raise
         return features
-    
+
+    def _coalescable(self, features: list[Feature]) -> bool:
+        # Features a direct fetch would reject are left to it, so the same feature fails in the same way
+        return all(feature.sequence is not None or
+                   (feature.chromosome in self.fasta and 0 <= feature.start - 1 <= feature.end)
+                   for feature in features)
+
+    def _get_seq_for_spans(self, features: list[Feature]) -> None:
+        pending = sorted((feature for feature in features if feature.sequence is None),
+                         key=lambda feature: (feature.chromosome, feature.start))
+
+        span: list[Feature] = []
+        span_end = 0
+        for feature in pending:
+            if span and (feature.chromosome != span[0].chromosome or feature.start - 1 > span_end + self.max_gap):
+                self._slice_span(span)
+                span = []
+            span.append(feature)
+            span_end = max(span_end, feature.end) if len(span) > 1 else feature.end
+        if span:
+            self._slice_span(span)
+
+    def _slice_span(self, features: list[Feature]) -> None:
+        span_start = min(feature.start for feature in features) - 1
+        span_end = max(feature.end for feature in features)
+        sequence = self._fetch(features[0].chromosome, span_start, span_end)
+
+        # Past the end of the contig the span is cut short exactly as a direct fetch would be
+        for feature in features:
+            feature.sequence = sequence[feature.start - 1 - span_start:feature.end - span_start]
+
     @staticmethod
     def get_feature_seq_lengths(features: list[Feature]) -> str | None:
         """
@@ -110,10 +194,189 @@ class FeatureSequenceHelper:
         else:
             return ";".join(str(len(feature.sequence)) for feature in features) # type: ignore
 
+class StreamingSequenceComparator:
+    """
+    Compares features in fixed-size chunks read straight from the FASTA, for features such as long introns that
+    are not worth holding as strings. A pair of features is only read until their first differing chunk, and
+    lengths and splice site motifs come from the coordinates and the two bases at each end. Peak memory is bounded
+    by the chunk size. Results match FeatureComparator on sequences from FeatureSequenceHelper.
+    """
+    def __init__(self, fasta: str, handle_pool: HandlePool | None = None, chunk_size: int = 1 << 16):
+        self.fasta = handle_pool.fasta(fasta) if handle_pool is not None else pysam.FastaFile(fasta)
+        self.chunk_size = chunk_size
+        self.fetches = 0
+
+    def _fetch(self, chromosome: str, start: int, end: int) -> str:
+        self.fetches += 1
+        return self.fasta.fetch(chromosome, start, end).upper()
+
+    def _span(self, feature: Feature) -> tuple[int, int]:
+        """
+        0-based half-open span a fetch of the feature returns, cut short at the end of the contig.
+        """
+        if feature.chromosome not in self.fasta or not 0 <= feature.start - 1 <= feature.end:
+            # Let the fetch raise, exactly as FeatureSequenceHelper would
+            try:
+                self.fasta.fetch(feature.chromosome, feature.start - 1, feature.end)
+            except ValueError as e:
+                logger.error(f"Error fetching sequence for {feature.chromosome}:{feature.start}-{feature.end}: {e}")
+                raise
+
+        start = feature.start - 1
+        end = min(feature.end, self.fasta.get_reference_length(feature.chromosome))
+        return start, max(start, end)
+
+    def get_feature_seq_lengths(self, features: list[Feature]) -> str | None:
+        if len(features) == 0:
+            logger.warning("No features provided. Cannot compute lengths.")
+            return None
+
+        return ";".join(str(end - start) for start, end in map(self._span, features))
+
+    def sequences_equal(self, primary_feature: Feature, fix_feature: Feature) -> bool:
+        primary_start, primary_end = self._span(primary_feature)
+        fix_start, fix_end = self._span(fix_feature)
+
+        if primary_end - primary_start != fix_end - fix_start:
+            return False
+
+        for offset in range(0, primary_end - primary_start, self.chunk_size):
+            length = min(self.chunk_size, primary_end - primary_start - offset)
+            if self._fetch(primary_feature.chromosome, primary_start + offset, primary_start + offset + length) != \
+                    self._fetch(fix_feature.chromosome, fix_start + offset, fix_start + offset + length):
+                return False
+
+        return True
+
+    def compare_sequences(self, primary_features: list[Feature], fix_features: list[Feature]) -> int:
+        """
+        Same as FeatureComparator.compare_sequences().
+        """
+        if len(primary_features) != len(fix_features):
+            return -1
+
+        features_unequal = 0
+
+        for primary_feature, fix_feature in zip(primary_features, fix_features):
+            if not self.sequences_equal(primary_feature, fix_feature):
+                logger.debug(f"    ‼️ Sequences are unequal. Primary: {primary_feature}, Fix: {fix_feature}")
+                features_unequal += 1
+
+        return features_unequal
+
+    def splice_site_motifs(self, feature: Feature) -> tuple[str, str]:
+        start, end = self._span(feature)
+        if start == end:
+            return '', ''
+
+        return self._fetch(feature.chromosome, start, min(start + 2, end)), self._fetch(feature.chromosome, max(start, end - 2), end)
+
+    def compare_splice_site_motifs(self, primary_features: list[Intron], fix_features: list[Intron]) -> int:
+        """
+        Same as FeatureComparator.compare_splice_site_motifs().
+        """
+        if len(primary_features) != len(fix_features):
+            return -1
+
+        splice_sites_unequal = 0
+
+        for primary_feature, fix_feature in zip(primary_features, fix_features):
+            primary_donor, primary_acceptor = self.splice_site_motifs(primary_feature)
+            fix_donor, fix_acceptor = self.splice_site_motifs(fix_feature)
+
+            if primary_donor != fix_donor:
+                logger.debug(f"    ‼️ Splice site motif is unequal. Primary: {primary_donor}, Fix: {fix_donor}")
+                splice_sites_unequal += 1
+
+            if primary_acceptor != fix_acceptor:
+                logger.debug(f"    ‼️ Splice site motif is unequal. Primary: {primary_acceptor}, Fix: {fix_acceptor}")
+                splice_sites_unequal += 1
+
+        return splice_sites_unequal
+
 class FeatureComparator:
-    def __init__(self, gtf_file_path: str, fasta_file_path: str):
+    def __init__(self, gtf_file_path: str, fasta_file_path: str, gtf_model_index_path: str | None = None,
+                 handle_pool: HandlePool | None = None, coalesce_fetches: bool = True,
+                 sequence_digests: bool = False, digest_cache_path: str | None = None, intron_chunk_size: int | None = None,
+                 full_detail: bool = True):
+        """
+        :param full_detail: Compute every length and sequence column, as the GRC fixes assessment needs. Otherwise
+                            comparison stages stop once comparison_status is decided, and the columns of stages that
+                            did not run are None. The pipeline does not use this staged mode, and it does not take
+                            fewer FASTA fetches: splice site motifs are then read apart from the sequences.
+        :param sequence_digests: Compare exons and introns by SequenceDigest rather than holding their sequences.
+        :param digest_cache_path: SQLite database of digests to reuse across runs, see SequenceDigestCache. Implies sequence_digests.
+        :param intron_chunk_size: Compare introns in chunks of this many bases with a StreamingSequenceComparator rather
+                                  than holding their sequences. Exon spans are then also broken at gaps over this size.
+        """
         self.gtf_file_path = gtf_file_path
         self.fasta_file_path = fasta_file_path
+        self.gtf_model_index_path = gtf_model_index_path
+        self.handle_pool = handle_pool if handle_pool is not None else handles.handle_pool
+        self.coalesce_fetches = coalesce_fetches
+        self.sequence_digests = sequence_digests or digest_cache_path is not None
+        self.digest_cache_path = digest_cache_path
+        self.intron_chunk_size = intron_chunk_size
+        self.full_detail = full_detail
+        self.fasta_fetches = 0
+        self._region_digests: dict[tuple[str, int, int], bytes] = {}
+
+    def _get_gtf_handler(self) -> GTFHandler:
+        # The handler, with its transcript model cache and any memory mapped model, is shared by all comparisons in the process
+        return self.handle_pool.get(('GTFHandler', self.gtf_file_path, self.gtf_model_index_path),
+                                    lambda: GTFHandler(self.gtf_file_path, model_index_path=self.gtf_model_index_path))
+
+    def _get_digest_cache(self) -> SequenceDigestCache | None:
+        if self.digest_cache_path is None:
+            return None
+        return self.handle_pool.get(('SequenceDigestCache', self.digest_cache_path, self.fasta_file_path),
+                                    lambda: SequenceDigestCache(self.digest_cache_path, self.fasta_file_path)) # type: ignore
+
+    def _region_digest(self, chromosome: str, start: int, end: int) -> bytes:
+        """
+        Digest of the GTF records overlapping a region and of the (upper-cased) FASTA sequence under them.
+        The sequence covers every record, so features running past the region are included.
+        """
+        key = (chromosome, start, end)
+        if key in self._region_digests:
+            return self._region_digests[key]
+
+        digest = hashlib.blake2b(f"{chromosome}:{start}-{end}\n".encode(), digest_size=16)
+        span_start, span_end = start, end
+
+        gtf = self.handle_pool.tabix(self.gtf_file_path)
+        if chromosome in gtf.contigs:
+            for line in gtf.fetch(chromosome, start - 1, end):
+                digest.update(line.encode() + b'\n')
+                fields = line.split('\t')
+                span_start, span_end = min(span_start, int(fields[3])), max(span_end, int(fields[4]))
+
+        fasta = self.handle_pool.fasta(self.fasta_file_path)
+        if chromosome in fasta:
+            span_end = min(span_end, fasta.get_reference_length(chromosome))
+            for chunk_start in range(max(span_start - 1, 0), span_end, 1 << 20):
+                digest.update(fasta.fetch(chromosome, chunk_start, min(chunk_start + (1 << 20), span_end)).upper().encode())
+
+        self._region_digests[key] = digest.digest()
+        return self._region_digests[key]
+
+    def input_digest(self,
+                     primary_chromosome: str,
+                     primary_start: int,
+                     primary_end: int,
+                     fix_chromosome: str,
+                     fix_start: int,
+                     fix_end: int,
+                     entrez_gene_id: int) -> str:
+        """
+        Digest of everything compare_features reads for the same arguments: both regions of the GTF and FASTA, the gene,
+        the settings that change the result and COMPARISON_VERSION. An unchanged digest means compare_features would
+        return the same result.
+        """
+        digest = hashlib.blake2b(f"{entrez_gene_id};version={COMPARISON_VERSION};full_detail={self.full_detail}\n".encode(), digest_size=16)
+        digest.update(self._region_digest(primary_chromosome, primary_start, primary_end))
+        digest.update(self._region_digest(fix_chromosome, fix_start, fix_end))
+        return digest.hexdigest()
 
     @staticmethod
     def flag_discordant_exon_numbering(primary_features: list[Exon], fix_features: list[Exon]) -> bool | None:
@@ -155,6 +418,12 @@ class FeatureComparator:
 
         return features_unequal
     
+    @staticmethod
+    def _splice_site_motifs(sequence: str | SequenceDigest) -> tuple[str, str]:
+        if isinstance(sequence, SequenceDigest):
+            return sequence.head, sequence.tail
+        return sequence[0:2], sequence[-2:]
+
     @staticmethod
     def compare_splice_site_motifs(primary_features: list[Intron], fix_features: list[Intron]) -> int:
         splice_sites_unequal = 0
@@ -167,12 +436,15 @@ class FeatureComparator:
             logger.debug(f"  Primary Feature: {primary_feature}")
             logger.debug(f"  Fix Feature:     {fix_feature}")
             if primary_feature.sequence is not None and fix_feature.sequence is not None:
-                if primary_feature.sequence[0:2] != fix_feature.sequence[0:2]:
-                    logger.debug(f"    ‼️ Splice site motif is unequal. Primary: {primary_feature.sequence[0:2]}, Fix: {fix_feature.sequence[0:2]}")
+                primary_donor, primary_acceptor = FeatureComparator._splice_site_motifs(primary_feature.sequence)
+                fix_donor, fix_acceptor = FeatureComparator._splice_site_motifs(fix_feature.sequence)
+
+                if primary_donor != fix_donor:
+                    logger.debug(f"    ‼️ Splice site motif is unequal. Primary: {primary_donor}, Fix: {fix_donor}")
                     splice_sites_unequal += 1
 
-                if primary_feature.sequence[-2:] != fix_feature.sequence[-2:]:
-                    logger.debug(f"    ‼️ Splice site motif is unequal. Primary: {primary_feature.sequence[-2:]}, Fix: {fix_feature.sequence[-2:]}")
+                if primary_acceptor != fix_acceptor:
+                    logger.debug(f"    ‼️ Splice site motif is unequal. Primary: {primary_acceptor}, Fix: {fix_acceptor}")
                     splice_sites_unequal += 1
         
         return splice_sites_unequal
@@ -185,7 +457,7 @@ class FeatureComparator:
                          fix_start: int, 
                          fix_end: int, 
                          entrez_gene_id: int) -> dict[str, str | int | bool | None]:
-        gtf_handler = GTFHandler(self.gtf_file_path)
+        gtf_handler = self._get_gtf_handler()
         logger.info(f"Comparing regions: Primary {primary_chromosome}:{primary_start}-{primary_end} with Fix {fix_chromosome}:{fix_start}-{fix_end} for Gene ID: {entrez_gene_id}")
 
         primary_transcript = gtf_handler.obtain_transcript(primary_chromosome, primary_start, primary_end, entrez_gene_id)
@@ -193,28 +465,25 @@ class FeatureComparator:
         if primary_transcript.transcript_id is not None:
             logger.debug(f"Primary transcript found: {primary_transcript.transcript_id}")
 
-            primary_transcript_partial = gtf_handler.is_transcript_partial(
-                chromosome=primary_chromosome,
-                start=primary_start,
-                end=primary_end,
-                transcript_id=primary_transcript.transcript_id
-            )
-
-            primary_exons = gtf_handler.get_exons_by_transcript(
+            # Exons, introns and the partial flag come from one pass over each region
+            primary_transcript_model = gtf_handler.get_transcript_model(
                 chromosome=primary_chromosome,
                 start=primary_start,
                 end=primary_end,
                 transcript_id=primary_transcript.transcript_id
             )
 
-            primary_introns = gtf_handler.derive_introns_from_exons(exons=primary_exons)
+            primary_transcript_partial = primary_transcript_model.partial
+            primary_exons = primary_transcript_model.exons
+            primary_introns = primary_transcript_model.introns
 
-            fix_exons = gtf_handler.get_exons_by_transcript(
+            fix_transcript_model = gtf_handler.get_transcript_model(
                 chromosome=fix_chromosome,
                 start=fix_start,
                 end=fix_end,
                 transcript_id=primary_transcript.transcript_id
             )
+            fix_exons = fix_transcript_model.exons
 
             # If no exons are found in the fix region, we log a warning and set the fix transcript to None.
             # This is to ensure that we do not proceed with an empty list of exons,
@@ -228,37 +497,75 @@ class FeatureComparator:
                 fix_introns = []
             else:
                 fix_transcript = primary_transcript
-                fix_introns = gtf_handler.derive_introns_from_exons(exons=fix_exons)
-                fix_transcript_partial = gtf_handler.is_transcript_partial(
-                    chromosome=fix_chromosome,
-                    start=fix_start,
-                    end=fix_end,
-                    transcript_id=fix_transcript.transcript_id # type: ignore
-                )
+                fix_introns = fix_transcript_model.introns
+                fix_transcript_partial = fix_transcript_model.partial
 
             n_exons_equal = len(primary_exons) == len(fix_exons)
             n_introns_equal = len(primary_introns) == len(fix_introns)
 
             logger.debug(f"Exons equal: {n_exons_equal}, Introns equal: {n_introns_equal}")
 
-            feature_sequence_helper = FeatureSequenceHelper(self.fasta_file_path)
-            primary_exons = feature_sequence_helper.get_seq_for_feature(primary_exons)
-            primary_introns = feature_sequence_helper.get_seq_for_feature(primary_introns)
-
-            fix_exons = feature_sequence_helper.get_seq_for_feature(fix_exons)
-            fix_introns = feature_sequence_helper.get_seq_for_feature(fix_introns)
-
-            primary_exons_lengths = FeatureSequenceHelper.get_feature_seq_lengths(primary_exons)
-            primary_introns_lengths = FeatureSequenceHelper.get_feature_seq_lengths(primary_introns)
-            fix_exons_lengths = FeatureSequenceHelper.get_feature_seq_lengths(fix_exons)
-            fix_introns_lengths = FeatureSequenceHelper.get_feature_seq_lengths(fix_introns)
-
-            sequences_unequal_n_exons = FeatureComparator.compare_sequences(primary_exons, fix_exons)
-            sequences_unequal_n_introns = FeatureComparator.compare_sequences(primary_introns, fix_introns)
-            splice_sites_unequal_n = FeatureComparator.compare_splice_site_motifs(primary_introns, fix_introns)
-
             discordant_exon_numbering = FeatureComparator.flag_discordant_exon_numbering(primary_exons, fix_exons)
 
+            # Stages run in the order FeatureComparisonResult decides comparison_status: availability, completeness,
+            # structure and exon numbering need no sequences, then splice site motifs, exon and intron sequences.
+            # Without full_detail a stage only runs while the status is still undecided, and skipped columns stay None.
+            primary_exons_lengths = primary_introns_lengths = fix_exons_lengths = fix_introns_lengths = None
+            sequences_unequal_n_exons = sequences_unequal_n_introns = splice_sites_unequal_n = None
+
+            if self.full_detail or (fix_transcript.transcript_id is not None and fix_transcript_partial is False and
+                                    n_exons_equal and n_introns_equal and discordant_exon_numbering is False):
+                # Exons and introns of a transcript together cover its span, which coalesce_fetches reads once
+                feature_sequence_helper = FeatureSequenceHelper(self.fasta_file_path,
+                                                                handle_pool=self.handle_pool,
+                                                                coalesce=self.coalesce_fetches,
+                                                                max_gap=self.intron_chunk_size if self.intron_chunk_size is not None else 100_000,
+                                                                digests=self.sequence_digests,
+                                                                digest_cache=self._get_digest_cache())
+
+                streaming_comparator = StreamingSequenceComparator(self.fasta_file_path,
+                                                                   handle_pool=self.handle_pool,
+                                                                   chunk_size=self.intron_chunk_size if self.intron_chunk_size is not None else 1 << 16)
+
+                if self.intron_chunk_size is None:
+                    primary_held, fix_held = primary_exons + primary_introns, fix_exons + fix_introns
+
+                    get_intron_seq_lengths = FeatureSequenceHelper.get_feature_seq_lengths
+                    compare_intron_sequences = FeatureComparator.compare_sequences
+                    compare_intron_splice_site_motifs = FeatureComparator.compare_splice_site_motifs
+                else:
+                    primary_held, fix_held = primary_exons, fix_exons
+
+                    get_intron_seq_lengths = streaming_comparator.get_feature_seq_lengths
+                    compare_intron_sequences = streaming_comparator.compare_sequences
+                    compare_intron_splice_site_motifs = streaming_comparator.compare_splice_site_motifs
+
+                # Splice site motifs need only the two bases at each end of the introns, so without full_detail
+                # the sequences are only read once the motifs match
+                if self.full_detail:
+                    feature_sequence_helper.get_seq_for_feature(primary_held)
+                    feature_sequence_helper.get_seq_for_feature(fix_held)
+                    splice_sites_unequal_n = compare_intron_splice_site_motifs(primary_introns, fix_introns)
+                else:
+                    splice_sites_unequal_n = streaming_comparator.compare_splice_site_motifs(primary_introns, fix_introns)
+                    if splice_sites_unequal_n == 0:
+                        feature_sequence_helper.get_seq_for_feature(primary_held)
+                        feature_sequence_helper.get_seq_for_feature(fix_held)
+
+                if self.full_detail or splice_sites_unequal_n == 0:
+                    sequences_unequal_n_exons = FeatureComparator.compare_sequences(primary_exons, fix_exons)
+
+                if self.full_detail or sequences_unequal_n_exons == 0:
+                    sequences_unequal_n_introns = compare_intron_sequences(primary_introns, fix_introns)
+
+                if self.full_detail:
+                    primary_exons_lengths = FeatureSequenceHelper.get_feature_seq_lengths(primary_exons)
+                    primary_introns_lengths = get_intron_seq_lengths(primary_introns)
+                    fix_exons_lengths = FeatureSequenceHelper.get_feature_seq_lengths(fix_exons)
+                    fix_introns_lengths = get_intron_seq_lengths(fix_introns)
+
+                self.fasta_fetches += feature_sequence_helper.fetches + streaming_comparator.fetches
+
             logger.debug(f"No. of exons with unequal sequences: {sequences_unequal_n_exons}")
             logger.debug(f"No. of introns with unequal sequences: {sequences_unequal_n_introns}")
 
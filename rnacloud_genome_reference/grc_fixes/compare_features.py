@@ -1,36 +1,175 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import dataclasses
+import hashlib
+from itertools import repeat
 import logging
+import os
+import shutil
 
 import pandas as pd
 
-from rnacloud_genome_reference.grc_fixes.comparator import FeatureComparator
+from rnacloud_genome_reference.common.resumable_tsv import ResumableTSVWriter
+from rnacloud_genome_reference.common.utils import file_digest, file_stamp
+from rnacloud_genome_reference.grc_fixes.comparator import FeatureComparator, FeatureComparisonResult
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
+def _compare_mappings(comparator: FeatureComparator,
+                      mappings: pd.DataFrame,
+                      input_digests: bool = False,
+                      previous: dict[str, dict] | None = None) -> tuple[list[dict], Counter]:
+    """
+    Compare a chunk of mappings, in order. Also returns the handle pool hits and misses and the FASTA fetches it took.
+
+    With input_digests, each result also gets the input_digest of its mapping, and the result in previous for that
+    digest, if any, is carried forward rather than compared again.
+    """
+    hits, misses, fasta_fetches = comparator.handle_pool.hits, comparator.handle_pool.misses, comparator.fasta_fetches
+    reused = 0
+
+    comparisons = []
+    for _, x in mappings.iterrows():
+        arguments = (x['chr_refseq'], x['start'], x['end'], x['alt_chr_refseq'], x['alt_scaf_start'], x['alt_scaf_stop'], x['entrez_gene_id'])
+
+        if not input_digests:
+            comparisons.append(comparator.compare_features(*arguments))
+            continue
+
+        input_digest = comparator.input_digest(*arguments)
+        if previous is not None and input_digest in previous:
+            comparison = previous[input_digest]
+            reused += 1
+        else:
+            comparison = comparator.compare_features(*arguments)
+        comparisons.append(comparison | {'input_digest': input_digest})
+
+    return comparisons, Counter(hits=comparator.handle_pool.hits - hits,
+                                misses=comparator.handle_pool.misses - misses,
+                                fasta_fetches=comparator.fasta_fetches - fasta_fetches,
+                                reused=reused)
+
+def _load_previous_assessment(previous_assessment_path: str) -> dict[str, dict]:
+    """
+    Comparison results of a previous assessment written with input digests, by input_digest. Values are
+    kept as written, so that carried forward results are written back unchanged.
+    """
+    logger.info(f"Loading previous assessment from {previous_assessment_path}")
+    previous = pd.read_csv(previous_assessment_path, sep="\t", dtype=str, keep_default_na=False)
+
+    result_columns = [field.name for field in dataclasses.fields(FeatureComparisonResult)]
+    missing_columns = [column for column in result_columns + ['input_digest'] if column not in previous.columns]
+    if len(missing_columns) > 0:
+        logger.warning(f"Previous assessment {previous_assessment_path} has no {', '.join(missing_columns)} column(s), all mappings will be compared")
+        return {}
+
+    return {record.pop('input_digest'): {column: value if value != '' else None for column, value in record.items()}
+            for record in previous[result_columns + ['input_digest']].to_dict('records')}
+
+def _comparison_rows(mappings: pd.DataFrame, comparisons: list[dict]) -> pd.DataFrame:
+    """
+    Mappings joined with their comparison results, as written to the output TSV.
+    """
+    comparisons_by_row = dict(zip(mappings.index, comparisons))
+    comparison_rows = mappings.apply(lambda x: pd.Series(comparisons_by_row[x.name]), axis=1)
+
+    # Counts of stages skipped without full_detail are None, and carried forward counts are strings; keep them all integers
+    for column in ['sequences_unequal_n_exons', 'sequences_unequal_n_introns', 'splice_sites_unequal_n']:
+        if column in comparison_rows:
+            comparison_rows[column] = pd.to_numeric(comparison_rows[column]).astype('Int64')
+
+    return mappings.join(comparison_rows)
+
 def compare_features(gtf_file_path: str,
                      fasta_file_path: str,
                      gene_alt_contigs_mapping_file: str,
-                     output_file: str) -> None:
+                     output_file: str,
+                     gtf_model_index_path: str | None = None,
+                     workers: int = 1,
+                     sequence_digests: bool = False,
+                     digest_cache_path: str | None = None,
+                     intron_chunk_size: int | None = None,
+                     full_detail: bool = True,
+                     input_digests: bool = False,
+                     previous_assessment_path: str | None = None,
+                     checkpoint_dir: str | None = None) -> None:
+    """
+    :param input_digests: Add an input_digest column, see FeatureComparator.input_digest.
+    :param previous_assessment_path: Assessment of an earlier run with input digests, e.g. for the previous patch release.
+                                     Results of mappings whose input digest is unchanged are carried forward rather than
+                                     compared again. Implies input_digests.
+    :param checkpoint_dir: Directory to write the results and their checkpoint to until the run is complete, rather than
+                           beside output_file, so that a rerun from another working directory (e.g. a Nextflow retry)
+                           resumes a killed run. The finished output is then moved to output_file. Partial results
+                           of runs that are never rerun are left in the directory.
+    """
     logger.info(f"Comparing features using GTF file: {gtf_file_path} and FASTA file: {fasta_file_path}")
     
     logger.info(f"Loading gene-alt contigs mapping from {gene_alt_contigs_mapping_file}")
     mappings = pd.read_csv(gene_alt_contigs_mapping_file, sep="\t", low_memory=False)
 
     comparator = FeatureComparator(gtf_file_path=gtf_file_path,
-                                   fasta_file_path=fasta_file_path)
-
-    logger.info(f"Comparing features for {len(mappings)} mappings.")
-    mappings.join(
-        mappings.apply(lambda x: pd.Series(comparator.compare_features(x['chr_refseq'],
-                                                                       x['start'],
-                                                                       x['end'],
-                                                                       x['alt_chr_refseq'],
-                                                                       x['alt_scaf_start'],
-                                                                       x['alt_scaf_stop'],
-                                                                       x['entrez_gene_id'])), axis=1)
-    ).to_csv(output_file, sep="\t", index=False)
+                                   fasta_file_path=fasta_file_path,
+                                   gtf_model_index_path=gtf_model_index_path,
+                                   sequence_digests=sequence_digests,
+                                   digest_cache_path=digest_cache_path,
+                                   intron_chunk_size=intron_chunk_size,
+                                   full_detail=full_detail)
+
+    input_digests = input_digests or previous_assessment_path is not None
+    previous = _load_previous_assessment(previous_assessment_path) if previous_assessment_path is not None else None
+
+    # Rows already in the output from a run that was killed are not compared again. Inputs are fingerprinted rather
+    # than named, as a rerun may see them at other paths, or changed at the same ones. The GTF and FASTA are too large
+    # to hash on every run, so they are fingerprinted by size and modification time (of the file behind any symlink)
+    fingerprint = (f"{file_digest(gene_alt_contigs_mapping_file)};gtf={file_stamp(gtf_file_path)};fasta={file_stamp(fasta_file_path)};"
+                   f"full_detail={full_detail};input_digests={input_digests}")
+    if previous_assessment_path is not None:
+        fingerprint += f";previous={file_digest(previous_assessment_path)}"
+
+    partial_output_file = output_file
+    if checkpoint_dir is not None:
+        # Named by fingerprint, so that runs on other inputs sharing the directory keep to their own files
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        name, extension = os.path.splitext(os.path.basename(output_file))
+        partial_output_file = os.path.join(checkpoint_dir, f"{name}.{hashlib.blake2b(fingerprint.encode(), digest_size=8).hexdigest()}{extension}")
+    writer = ResumableTSVWriter(partial_output_file, fingerprint=fingerprint)
+    remaining = mappings[[not writer.is_done(key) for key in mappings.index]]
+
+    logger.info(f"Comparing features for {len(remaining)} of {len(mappings)} mappings with {workers} workers.")
+    stats = Counter()
+    if workers > 1 and len(remaining) > 0:
+        if gtf_model_index_path is not None:
+            # Build the model index, if it is missing or stale, once here rather than in every worker
+            comparator._get_gtf_handler()
+
+        # Rows are independent; chunks are small enough to balance the workers and results come back in order
+        chunk_size = -(-len(remaining) // (workers * 4))
+        chunks = [remaining.iloc[start:start + chunk_size] for start in range(0, len(remaining), chunk_size)]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk, (chunk_comparisons, chunk_stats) in zip(chunks, executor.map(_compare_mappings, repeat(comparator), chunks, repeat(input_digests), repeat(previous))):
+                writer.write(_comparison_rows(chunk, chunk_comparisons))
+                stats.update(chunk_stats)
+    else:
+        for start in range(len(remaining)):
+            row = remaining.iloc[start:start + 1]
+            row_comparisons, row_stats = _compare_mappings(comparator, row, input_digests, previous)
+            writer.write(_comparison_rows(row, row_comparisons))
+            stats.update(row_stats)
+
+    if writer.output.tell() == 0:
+        writer.write(pd.DataFrame(columns=list(mappings.columns) + [field.name for field in dataclasses.fields(FeatureComparisonResult)] +
+                                          (['input_digest'] if input_digests else [])))
+    writer.close()
+    if partial_output_file != output_file:
+        shutil.move(partial_output_file, output_file)
 
     logger.info(f"Feature comparison results saved to {output_file}")
+    logger.info(f"Handle pool: {stats['hits']} hits, {stats['misses']} misses. FASTA fetches: {stats['fasta_fetches']}")
+    if previous is not None:
+        logger.info(f"Carried forward {stats['reused']} results from {previous_assessment_path}, compared {len(remaining) - stats['reused']} mappings with changed or new inputs")
 
 if __name__ == "__main__":
     import argparse
@@ -40,7 +179,22 @@ if __name__ == "__main__":
     parser.add_argument("fasta_file", help="Path to the FASTA file.")
     parser.add_argument("gene_alt_contigs_mapping_file", help="Path to the gene-alt contigs mapping file.")
     parser.add_argument("output_file", help="Path to save the comparison results.")
+    parser.add_argument("--gtf-model-index", default=None, help="Path to a persistent GTF model index directory, see common.build_gtf_model_index.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes to compare mappings with.")
+    parser.add_argument("--sequence-digests", action="store_true", help="Compare exon and intron sequences by digest rather than holding them in memory.")
+    parser.add_argument("--digest-cache", default=None, help="SQLite database of sequence digests reused across runs against the same FASTA. Implies --sequence-digests.")
+
+    parser.add_argument("--intron-chunk-size", type=int, default=None, help="Compare introns in chunks of this many bases straight from the FASTA, stopping at the first difference, rather than holding their sequences.")
+
+    parser.add_argument("--full-detail", action=argparse.BooleanOptionalAction, default=True, help="Fill in every length and sequence column (default), or with --no-full-detail only compare as far as needed to decide comparison_status.")
+
+    parser.add_argument("--input-digests", action="store_true", help="Add an input_digest column: a digest of the GTF records, FASTA sequence and settings each comparison depends on.")
+    parser.add_argument("--previous-assessment", default=None, help="GRC fixes assessment of an earlier run with input digests. Results whose inputs are unchanged are carried forward rather than recomputed. Implies --input-digests.")
+
+    parser.add_argument("--checkpoint-dir", default=None, help="Directory to keep results and their checkpoint in until the run completes, so that a rerun from another working directory resumes a killed run.")
 
     args = parser.parse_args()
 
-    compare_features(args.gtf_file, args.fasta_file, args.gene_alt_contigs_mapping_file, args.output_file)
\ No newline at end of file
+    compare_features(args.gtf_file, args.fasta_file, args.gene_alt_contigs_mapping_file, args.output_file, args.gtf_model_index, args.workers,
+                     args.sequence_digests, args.digest_cache, args.intron_chunk_size, args.full_detail,
+                     args.input_digests, args.previous_assessment, args.checkpoint_dir)
\ No newline at end of file
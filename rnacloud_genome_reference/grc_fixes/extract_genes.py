@@ -1,49 +1,64 @@
 import logging
-import re
-import gzip
+
+from rnacloud_genome_reference.common.gtf import GTFConsumer, GTFRecord, GTFScanner
+from rnacloud_genome_reference.genome_build.common import write_bed_file
+from rnacloud_genome_reference.genome_build.redundant_5s_regions import Redundant5SRegionCollector
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-def extract_genes(gtf_file_path: str, output_file_path: str) -> None:
+class GeneTableWriter(GTFConsumer):
+    def __init__(self, output_file_path: str):
+        self.out_file = open(output_file_path, 'w')
+        # Write output file header
+        self.out_file.write("chr\tstart\tend\tstrand\tgene_name\tentrez_gene_id\tgene_biotype\n")
+
+    def consume(self, record: GTFRecord) -> None:
+        if record.feature != 'gene':
+            return
+
+        attributes = record.attributes
+        gene_biotype = attributes.get('gene_biotype')
+        gene_name = attributes.get('gene')
+        entrez_gene_id = attributes.xref('GeneID')
+
+        if not gene_biotype or not gene_name or not entrez_gene_id:
+            logger.error(f"Missing required fields in record: {record.chromosome}:{record.start}-{record.end} {record.raw_attributes}")
+            raise ValueError("Missing required fields in GTF line")
+
+        self.out_file.write("{chr}\t{start}\t{end}\t{strand}\t{gene_name}\t{entrez_gene_id}\t{gene_biotype}\n".format(chr=record.chromosome,
+                                                                                          start=record.start,
+                                                                                          end=record.end,
+                                                                                          strand=record.strand,
+                                                                                          gene_name=gene_name,
+                                                                                          entrez_gene_id=entrez_gene_id,
+                                                                                          gene_biotype=gene_biotype))
+
+    def close(self) -> None:
+        self.out_file.close()
+
+def extract_genes(gtf_file_path: str, output_file_path: str, redundant_5s_bed_path: str | None = None) -> None:
     logger.info(f"Extracting genes from {gtf_file_path} to {output_file_path}")
 
-    with gzip.open(gtf_file_path, 'rt') as f:
-        with open(output_file_path, 'w') as out_file:
-            # Write output file header
-            out_file.write("chr\tstart\tend\tstrand\tgene_name\tentrez_gene_id\tgene_biotype\n")
-
-            for line in f:
-                if line.startswith('#'):
-                    continue
-
-                fields = line.strip().split('\t')
-                
-                if fields[2] == 'gene':
-                    gene_biotype = re.search(r'gene_biotype \"(.+?)\";', fields[8]) # Extract gene biotype
-                    gene_name = re.search(r'gene \"(.+?)\";', fields[8]) # Extract gene name
-                    entrez_gene_id = re.search(r'\"GeneID:(.+?)\";', fields[8])
-
-                    if not gene_biotype or not gene_name or not entrez_gene_id:
-                        logger.error(f"Missing required fields in line: {line.strip()}")
-                        raise ValueError("Missing required fields in GTF line")
-
-                    out_file.write("{chr}\t{start}\t{end}\t{strand}\t{gene_name}\t{entrez_gene_id}\t{gene_biotype}\n".format(chr=fields[0],
-                                                                                                      start=fields[3],
-                                                                                                      end=fields[4],
-                                                                                                      strand=fields[6],
-                                                                                                      gene_name=gene_name.group(1),
-                                                                                                      entrez_gene_id=entrez_gene_id.group(1),
-                                                                                                      gene_biotype=gene_biotype.group(1)))
+    scanner = GTFScanner(gtf_file_path)
+    scanner.register(GeneTableWriter(output_file_path))
+    redundant_5s = scanner.register(Redundant5SRegionCollector()) if redundant_5s_bed_path else None
+    scanner.scan()
+
     logger.info(f"Genes extracted to {output_file_path}")
 
+    if redundant_5s is not None and redundant_5s_bed_path:
+        write_bed_file(redundant_5s.regions, output_file=redundant_5s_bed_path)
+        logger.info(f"{len(redundant_5s.regions)} redundant 5S regions written to {redundant_5s_bed_path}")
+
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description='Extract genes from a GTF file.')
     parser.add_argument('gtf_file', type=str, help='Path to the input GTF file (gzipped)')
     parser.add_argument('output_file', type=str, help='Path to the output file for genes')
+    parser.add_argument('--redundant-5s-bed', type=str, default=None, help='Also write the redundant 5S regions to this BED file, from the same pass over the GTF file')
 
     args = parser.parse_args()
 
-    extract_genes(args.gtf_file, args.output_file)
\ No newline at end of file
+    extract_genes(args.gtf_file, args.output_file, args.redundant_5s_bed)
@@ -7,24 +7,20 @@ from rnacloud_genome_reference.common.gtf import GTFHandler
 
 logger = logging.getLogger(__name__)
 
-def extract_sj_positions_from_clinically_significant_genes(clinical_genes_path: str, gtf_file_path: str, output_path: str) -> None:
+def extract_sj_positions_from_clinically_significant_genes(clinical_genes_path: str, gtf_file_path: str, output_path: str, gtf_model_index_path: str | None = None) -> None:
     logger.info("Extracting splice junction positions from clinically significant genes...")
     
     clinical_genes = pd.read_csv(clinical_genes_path, sep='\t', low_memory=False)
     
-    gtf_file = GTFHandler(gtf_file_path=gtf_file_path)
+    gtf_file = GTFHandler(gtf_file_path=gtf_file_path, model_index_path=gtf_model_index_path)
 
     with open(output_path, 'w') as f:
         f.write("chrom\tchrom_refseq\tpos\tentrez_gene_id\tgene_name\ttranscript\ttranscript_is_mane_select\texon_no\tdist_from_annot\tcategory\n")
 
-        for _, row in clinical_genes.iterrows():
-            sj_positions = gtf_file.obtain_sj_positions(
-                chrom=row['chrom_refseq'],
-                start=row['start'],
-                end=row['end'],
-                entrez_gene_id=row['entrez_gene_id']
-            )
+        # Resolved for all genes in one sweep per contig rather than several fetches per gene
+        sj_positions_by_gene = gtf_file.obtain_sj_positions_bulk(clinical_genes, chrom_column='chrom_refseq')
 
+        for (_, row), sj_positions in zip(clinical_genes.iterrows(), sj_positions_by_gene):
             for sj_pos in sj_positions:
                 f.write("{chrom}\t{chrom_refseq}\t{pos}\t{entrez_gene_id}\t{gene_name}\t{transcript}\t{transcript_is_mane_select}\t{exon_no}\t{dist_from_annot}\t{category}\n".format(
                     chrom=row['chrom'],
@@ -41,14 +37,32 @@ def extract_sj_positions_from_clinically_significant_genes(clinical_genes_path:
     
     logger.info("Splice junction positions extraction completed. Output saved to %s", output_path)
 
+def extract_all_sj_positions(gtf_file_path: str, output_path: str, all_transcripts: bool = False, gtf_model_index_path: str | None = None) -> None:
+    logger.info("Extracting splice junction positions of %s transcripts genome-wide...", "all" if all_transcripts else "MANE Select")
+
+    gtf_file = GTFHandler(gtf_file_path=gtf_file_path, model_index_path=gtf_model_index_path)
+
+    sj_positions = gtf_file.get_splice_junction_table(mane_only=not all_transcripts).to_dataframe()
+    sj_positions = sj_positions.rename(columns={'chrom': 'chrom_refseq', 'dist_from_exon': 'dist_from_annot'})
+    sj_positions = sj_positions[['chrom_refseq', 'pos', 'transcript', 'transcript_is_mane_select', 'exon_no', 'dist_from_annot', 'category']]
+
+    sj_positions.to_csv(output_path, sep='\t', index=False)
+
+    logger.info("Splice junction positions extraction completed. Output saved to %s", output_path)
+
 if __name__ == "__main__":
     import argparse
 
-    parser = argparse.ArgumentParser(description="Extract splice junction positions from clinically significant genes.")
-    parser.add_argument("--clinical_genes_path", required=True, help="Path to the clinically significant genes file.")
+    parser = argparse.ArgumentParser(description="Extract splice junction positions from clinically significant genes, or genome-wide.")
+    parser.add_argument("--clinical_genes_path", required=False, default=None, help="Path to the clinically significant genes file. If omitted, positions are extracted genome-wide.")
     parser.add_argument("--gtf_file_path", required=True, help="Path to the GTF file.")
     parser.add_argument("--output_path", required=True, help="Path to save the output file.")
+    parser.add_argument("--gtf_model_index_path", required=False, default=None, help="Path to a persistent GTF model index directory.")
+    parser.add_argument("--all_transcripts", action="store_true", help="Genome-wide only: include every transcript rather than MANE Select transcripts.")
 
     args = parser.parse_args()
 
-    extract_sj_positions_from_clinically_significant_genes(args.clinical_genes_path, args.gtf_file_path, args.output_path)
\ No newline at end of file
+    if args.clinical_genes_path is None:
+        extract_all_sj_positions(args.gtf_file_path, args.output_path, args.all_transcripts, args.gtf_model_index_path)
+    else:
+        extract_sj_positions_from_clinically_significant_genes(args.clinical_genes_path, args.gtf_file_path, args.output_path, args.gtf_model_index_path)
\ No newline at end of file
@@ -9,7 +9,7 @@ import numpy as np
 import pandas as pd
 import pysam
 
-from rnacloud_genome_reference.common.gtf import GTFHandler
+from rnacloud_genome_reference.common.gtf import FeatureCounter, GeneBiotypeCounter, GTFScanner
 from rnacloud_genome_reference.common.utils import AssemblyReportParser
 from rnacloud_genome_reference.genome_build.common import GRC_FIXES_QUERY
 
@@ -176,6 +176,7 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--grc-fixes-summary", required=False, default="output/grc_fixes_assessment.tsv")
     parser.add_argument("--config", required=False, default="conf/sources.json", help="Path to sources.json")
     parser.add_argument("--version", required=False, default="0.0.0", help="Version of the genome and annotation build")
+    parser.add_argument("--workers", required=False, type=int, default=1, help="Number of processes used to count GTF features, sharded by contig")
     # Output
     parser.add_argument("--out", required=True, help="Output Markdown filename (e.g., report.md)")
     return parser.parse_args(argv)
@@ -250,16 +251,21 @@ def main(argv: list[str] | None = None):
         print(contigs_report.fillna('').to_markdown(index=False, tablefmt="github"))
         print()
 
+        # Both counts come from a single pass over the GTF file
+        scanner = GTFScanner(gtf, workers=args.workers)
+        feature_counter = scanner.register(FeatureCounter())
+        gene_biotype_counter = scanner.register(GeneBiotypeCounter())
+        scanner.scan()
+
         print("# Feature count")
-        gtf_handler = GTFHandler(gtf)
-        feature_counts = gtf_handler.get_feature_counts()
+        feature_counts = feature_counter.counts
         print(pd.DataFrame(feature_counts.items(), columns=['feature', 'count'])
               .sort_values(by='count', ascending=False)
               .to_markdown(index=False, tablefmt="github"))
         print()
 
         print("# Gene biotypes count")
-        gene_biotype_counts = gtf_handler.get_gene_biotype_counts()
+        gene_biotype_counts = gene_biotype_counter.counts
         print(pd.DataFrame(gene_biotype_counts.items(), columns=['gene_biotype', 'count'])
               .sort_values(by='count', ascending=False)
               .to_markdown(index=False, tablefmt="github"))
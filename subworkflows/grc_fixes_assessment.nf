@@ -17,6 +17,7 @@ workflow GRC_FIXES_ASSESSMENT {
     assembly_report
     genes
     clinically_relevant
+    gtf_model_index
 
     main:
     SIMPLIFY_AND_ANNOTATE_GRC_FIXES(
@@ -35,7 +36,9 @@ workflow GRC_FIXES_ASSESSMENT {
         COMBINE_GRC_FIXES_AND_GENES.out.combined_grc_fixes,
         gtf_index,
         fasta_fai_index,
-        fasta_gzi_index
+        fasta_gzi_index,
+        gtf_model_index,
+        params.previous_grc_fixes_assessment ? file(params.previous_grc_fixes_assessment) : []
     )
 
     FLAG_CLINICALLY_RELEVANT_GENES(
@@ -11,6 +11,7 @@ workflow SPLICE_SITE_GNOMAD_FREQ {
     genes_path
     clinically_significant_genes_path
     genome_regions_report_path
+    gtf_model_index
 
     main:
     GET_CLINICALLY_SIGNIFICANT_PROTEIN_CODING_GENES(
@@ -22,7 +23,8 @@ workflow SPLICE_SITE_GNOMAD_FREQ {
     EXTRACT_SJ_POSITIONS_FROM_CLINICALLY_SIGNIFICANT_GENES(
         GET_CLINICALLY_SIGNIFICANT_PROTEIN_CODING_GENES.out.clinically_significant_protein_coding_genes,
         gtf,
-        gtf_index
+        gtf_index,
+        gtf_model_index
     )
 
     OET_SPLICE_SITE_GNOMAD_FREQ(
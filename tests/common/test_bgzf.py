@@ -0,0 +1,108 @@
+from rnacloud_genome_reference.common.bgzf import BGZF_BLOCK_SIZE, BGZFWriter, TabixIndex, reg2bin
+import filecmp
+import gzip
+import struct
+
+import pysam
+import pytest
+
+def write_in_pieces(writer: BGZFWriter, data: bytes, piece_size: int) -> None:
+    for start in range(0, len(data), piece_size):
+        writer.write(data[start:start + piece_size])
+
+def read_tbi(path: str) -> dict:
+    """
+    Contents of a .tbi, with the bins of each contig in a dict since htslib writes them in hash table order.
+    """
+    with gzip.open(path, 'rb') as f:
+        data = f.read()
+    header = struct.unpack_from('<8i', data, 4)
+    pos = 36 + header[7]
+    bins, linear = [], []
+    for _ in range(header[0]):
+        (n_bins,), pos = struct.unpack_from('<i', data, pos), pos + 4
+        contig_bins = {}
+        for _ in range(n_bins):
+            (bin_number, n_chunks), pos = struct.unpack_from('<Ii', data, pos), pos + 8
+            contig_bins[bin_number], pos = struct.unpack_from(f'<{2 * n_chunks}Q', data, pos), pos + 16 * n_chunks
+        (n_windows,), pos = struct.unpack_from('<i', data, pos), pos + 4
+        offsets, pos = struct.unpack_from(f'<{n_windows}Q', data, pos), pos + 8 * n_windows
+        bins.append(contig_bins)
+        linear.append(list(offsets))
+    return {'header': header, 'names': data[36:36 + header[7]], 'bins': bins, 'linear': linear, 'rest': data[pos:]}
+
+class TestBGZFWriter:
+    @pytest.fixture
+    def gtf(self) -> bytes:
+        lines = ['#!genome-build test\n']
+        for contig in ['chr1', 'chr2', 'chr10']:
+            for i in range(2000):
+                start = 1 + i * 1500
+                end = start + (2_000_000 if i % 500 == 0 else 300)
+                lines.append(f'{contig}\tBestRefSeq\texon\t{start}\t{end}\t.\t+\t.\tgene_id "G{i}"; transcript_id "T{i}";\n')
+        return ''.join(lines).encode()
+
+    @pytest.mark.parametrize("threads", [1, 4])
+    def test_blocks_and_gzi_match_htslib(self, gtf: bytes, threads: int, tmp_path):
+        with BGZFWriter(str(tmp_path / 'written.gz'), threads=threads, index='gzi') as writer:
+            write_in_pieces(writer, gtf, 100_000)
+        with pysam.libcbgzf.BGZFile(str(tmp_path / 'htslib.gz'), 'wb', index=str(tmp_path / 'htslib.gz.gzi')) as htslib:
+            htslib.write(gtf)
+
+        assert len(gtf) > 2 * BGZF_BLOCK_SIZE
+        assert filecmp.cmp(str(tmp_path / 'written.gz'), str(tmp_path / 'htslib.gz'), shallow=False)
+        assert filecmp.cmp(str(tmp_path / 'written.gz.gzi'), str(tmp_path / 'htslib.gz.gzi'), shallow=False)
+
+    @pytest.mark.parametrize("trailing_newline", [True, False])
+    def test_tbi_matches_tabix(self, gtf: bytes, trailing_newline: bool, tmp_path):
+        data = gtf if trailing_newline else gtf[:-1]
+        with BGZFWriter(str(tmp_path / 'written.gtf.gz'), threads=2, index='tbi') as writer:
+            write_in_pieces(writer, data, 7777)
+
+        with open(tmp_path / 'tabix.gtf', 'wb') as f:
+            f.write(data)
+        pysam.tabix_index(str(tmp_path / 'tabix.gtf'), preset='gff')
+
+        # The bins are the same but htslib writes them in hash table order, so compare what the indexes return
+        with pysam.TabixFile(str(tmp_path / 'written.gtf.gz')) as written, pysam.TabixFile(str(tmp_path / 'tabix.gtf.gz')) as tabix:
+            assert list(written.contigs) == list(tabix.contigs) == ['chr1', 'chr2', 'chr10']
+            for contig in written.contigs:
+                for start in range(0, 3_100_000, 97_000):
+                    assert list(written.fetch(contig, start, start + 20_000)) == list(tabix.fetch(contig, start, start + 20_000))
+            assert len(list(written.fetch('chr2', 1_000_000, 1_001_000))) == 3
+        assert read_tbi(str(tmp_path / 'written.gtf.gz.tbi')) == read_tbi(str(tmp_path / 'tabix.gtf.gz.tbi'))
+
+    def test_tbi_linear_index_matches_tabix(self, tmp_path):
+        # Records of chr2 start past its first windows, which htslib fills with the offset of its first record
+        lines = [f'{contig}\tBestRefSeq\texon\t{first + i * 1500}\t{first + i * 1500 + 300}\t.\t+\t.\tgene_id "G{i}";\n'
+                 for contig, first in [('chr1', 1), ('chr2', 200_001)] for i in range(500)]
+        data = ''.join(lines).encode()
+        with BGZFWriter(str(tmp_path / 'written.gtf.gz'), index='tbi') as writer:
+            writer.write(data)
+
+        with open(tmp_path / 'tabix.gtf', 'wb') as f:
+            f.write(data)
+        pysam.tabix_index(str(tmp_path / 'tabix.gtf'), preset='gff')
+
+        written, tabix = read_tbi(str(tmp_path / 'written.gtf.gz.tbi')), read_tbi(str(tmp_path / 'tabix.gtf.gz.tbi'))
+        assert written['linear'][1][0] != 0
+        assert written == tabix
+
+    def test_tbi_unsorted_raises(self, tmp_path):
+        writer = BGZFWriter(str(tmp_path / 'written.gtf.gz'), index='tbi')
+        writer.write(b'chr1\t.\texon\t200\t300\t.\t+\t.\t\n')
+        with pytest.raises(ValueError):
+            writer.write(b'chr1\t.\texon\t100\t300\t.\t+\t.\t\n')
+
+@pytest.mark.parametrize("beg, end, expected", [
+    (0, 1, 4681),
+    (0, 1 << 14, 4681),
+    (0, (1 << 14) + 1, 585),
+    ((1 << 26) - 1, (1 << 26) + 1, 0)
+])
+def test_reg2bin(beg, end, expected):
+    assert reg2bin(beg, end) == expected
+
+def test_tabix_index_rejects_unknown_preset():
+    with pytest.raises(ValueError):
+        TabixIndex('vcf')
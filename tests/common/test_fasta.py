@@ -0,0 +1,37 @@
+from rnacloud_genome_reference.common.fasta import IndexedFastaWriter
+import filecmp
+import gzip
+import os
+import pysam
+import pytest
+
+class TestIndexedFastaWriter:
+    @pytest.fixture
+    def sequences(self) -> dict[str, str]:
+        return {'chr1': 'ACGTNacgtn' * 10000, 'empty': '', 'full_line': 'A' * 60, 'short': 'ACG'}
+
+    def test_indexes_match_samtools(self, sequences: dict[str, str], tmp_path):
+        path = str(tmp_path / 'out.fasta.gz')
+
+        with IndexedFastaWriter(path) as writer:
+            for name, sequence in sequences.items():
+                writer.write_sequence(name, sequence.encode())
+
+        os.rename(path + '.fai', str(tmp_path / 'written.fai'))
+        os.rename(path + '.gzi', str(tmp_path / 'written.gzi'))
+        pysam.faidx(path)
+
+        assert filecmp.cmp(str(tmp_path / 'written.fai'), path + '.fai', shallow=False)
+        assert filecmp.cmp(str(tmp_path / 'written.gzi'), path + '.gzi', shallow=False)
+
+        with gzip.open(path, 'rt') as f:
+            assert f.read() == ''.join(f">{name}\n" + ''.join(sequence[i:i + 60] + '\n' for i in range(0, len(sequence), 60))
+                                       for name, sequence in sequences.items())
+        with pysam.FastaFile(path) as fasta:
+            assert fasta.fetch('chr1', 59995, 60005) == sequences['chr1'][59995:60005]
+
+    def test_duplicate_name_raises(self, tmp_path):
+        with IndexedFastaWriter(str(tmp_path / 'out.fasta.gz')) as writer:
+            writer.write_sequence('chr1', b'ACGT')
+            with pytest.raises(ValueError):
+                writer.write_sequence('chr1', b'ACGT')
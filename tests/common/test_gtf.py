@@ -1,12 +1,239 @@
 from collections import Counter
-from rnacloud_genome_reference.common.gtf import GTFHandler, SpliceJunctionPosition
-from rnacloud_genome_reference.common.gtf import Exon, Intron
+from rnacloud_genome_reference.common.gtf import FeatureCounter, GeneBiotypeCounter, GTFAttributes, GTFConsumer, GTFHandler, GTFModel, GTFScanner, SpliceJunctionPosition
+from rnacloud_genome_reference.common.gtf import Exon, ExonTable, Feature, Intron, SpliceJunctionTable, splice_junction_table
+import gzip
+import numpy as np
+import pandas as pd
+import pysam
 import pytest
 
-class TestGTFHandler:
+class TestGTFAttributes:
+    @pytest.mark.parametrize("attributes, key, expected", [
+        ('gene_id "OR4F5"; transcript_id "NM_001005484.2"; exon_number "1"; ', 'exon_number', '1'),
+        ('gene_id "OR4F5"; transcript_id ""; ', 'transcript_id', ''),
+        ('gene_id "OR4F5"; description "olfactory receptor; family 4"; gene_biotype "protein_coding"; ', 'gene_biotype', 'protein_coding'),
+        ('gene_id "OR4F5"; description "olfactory receptor; family 4"; ', 'description', 'olfactory receptor; family 4'),
+        ('gene_id "ENSG00000186092"; exon_number 1; level 2;', 'exon_number', '1'),
+        ('gene_id "OR4F5"; ', 'gene_biotype', None),
+    ])
+    def test_get(self, attributes: str, key: str, expected: str | None):
+        assert GTFAttributes.parse(attributes).get(key) == expected
+
+    def test_repeated_keys(self):
+        attributes = GTFAttributes.parse('gene_id "OR4F5"; db_xref "GeneID:79501"; db_xref "GenBank:NM_001005484.2"; '
+                                         'db_xref "HGNC:HGNC:14825"; tag "MANE Select"; tag "RefSeq Select"; ')
+
+        assert attributes.get_all('tag') == ('MANE Select', 'RefSeq Select')
+        assert attributes.has_tag('MANE Select')
+        assert not attributes.has_tag('MANE Plus Clinical')
+        assert attributes.xref('GenBank') == 'NM_001005484.2'
+        assert attributes.xrefs('HGNC') == ('HGNC:14825',)
+        assert attributes.has_xref('GeneID', 79501)
+        assert not attributes.has_xref('GeneID', 7950)
+
+class TestGTFScanner:
+    GTF_LINES = [
+        '#gtf-version 2.2',
+        'NC_000001.11\tBestRefSeq\tgene\t100\t500\t.\t+\t.\tgene_id "A"; transcript_id ""; db_xref "GeneID:1"; gene_biotype "protein_coding"; ',
+        'NC_000001.11\tBestRefSeq\ttranscript\t100\t500\t.\t+\t.\tgene_id "A"; transcript_id "NM_1.1"; db_xref "GeneID:1"; ',
+        'NC_000001.11\tBestRefSeq\texon\t100\t200\t.\t+\t.\tgene_id "A"; transcript_id "NM_1.1"; exon_number "1"; ',
+        'NC_000001.11\tBestRefSeq\texon\t400\t500\t.\t+\t.\tgene_id "A"; transcript_id "NM_1.1"; exon_number "2"; ',
+        'NC_000002.12\tBestRefSeq\tgene\t100\t500\t.\t-\t.\tgene_id "B"; transcript_id ""; db_xref "GeneID:2"; gene_biotype "lncRNA"; ',
+    ]
+
+    @pytest.fixture
+    def gtf_file(self, tmp_path) -> str:
+        gtf_file_path = str(tmp_path / 'test.gtf.gz')
+        with gzip.open(gtf_file_path, 'wt') as f:
+            f.write('\n'.join(self.GTF_LINES) + '\n')
+        return gtf_file_path
+
+    def test_scan_feeds_all_consumers(self, gtf_file: str):
+        scanner = GTFScanner(gtf_file)
+        feature_counter = scanner.register(FeatureCounter())
+        gene_biotype_counter = scanner.register(GeneBiotypeCounter())
+
+        assert scanner.scan() == 5
+        assert feature_counter.counts == Counter({'gene': 2, 'transcript': 1, 'exon': 2})
+        assert gene_biotype_counter.counts == Counter({'protein_coding': 1, 'lncRNA': 1})
+
+    def test_parallel_scan_matches_serial_scan(self, tmp_path):
+        gtf_file_path = str(tmp_path / 'test.gtf')
+        with open(gtf_file_path, 'w') as f:
+            f.write('\n'.join(self.GTF_LINES) + '\n')
+        gtf_file_path = pysam.tabix_index(gtf_file_path, preset='gff')
+
+        counters = {}
+        for workers in [1, 2]:
+            scanner = GTFScanner(gtf_file_path, workers=workers)
+            counters[workers] = (scanner.register(FeatureCounter()), scanner.register(GeneBiotypeCounter()))
+            assert scanner.scan() == 5
+
+        for serial, parallel in zip(counters[1], counters[2]):
+            assert list(serial.counts.items()) == list(parallel.counts.items())
+
+    def test_parallel_scan_rejects_unmergeable_consumer(self, tmp_path):
+        class Collector(GTFConsumer):
+            def consume(self, record):
+                pass
+
+        scanner = GTFScanner(str(tmp_path / 'test.gtf.gz'), workers=2)
+        scanner.register(Collector())
+
+        with pytest.raises(ValueError):
+            scanner.scan()
+
+    def test_missing_gene_biotype(self, tmp_path):
+        gtf_file_path = str(tmp_path / 'test.gtf.gz')
+        with gzip.open(gtf_file_path, 'wt') as f:
+            f.write('NC_000001.11\tBestRefSeq\tgene\t100\t500\t.\t+\t.\tgene_id "A"; db_xref "GeneID:1"; \n')
+
+        scanner = GTFScanner(gtf_file_path)
+        scanner.register(GeneBiotypeCounter())
+
+        with pytest.raises(ValueError):
+            scanner.scan()
+
+class TestGTFModelIndex:
     @pytest.fixture
-    def gtf_hander(self):
-        return GTFHandler('tests/fixtures/GCF_000001405.40_GRCh38.p14_genomic.sorted.gtf.gz')
+    def gtf_file(self, tmp_path) -> str:
+        gtf_file_path = str(tmp_path / 'test.gtf')
+        with open(gtf_file_path, 'w') as f:
+            f.write('\n'.join(TestGTFScanner.GTF_LINES) + '\n')
+        return pysam.tabix_index(gtf_file_path, preset='gff')
+
+    def test_index_is_memory_mapped_once_built(self, gtf_file: str, tmp_path):
+        index_path = str(tmp_path / 'test.gtf.gz.model')
+
+        built = GTFHandler(gtf_file, model_index_path=index_path)
+        loaded = GTFHandler(gtf_file, model_index_path=index_path)
+
+        assert isinstance(loaded.model.exons, np.memmap)
+        assert loaded.get_exons_by_transcript('NC_000001.11', 0, 1000, 'NM_1.1') == built.get_exons_by_transcript('NC_000001.11', 0, 1000, 'NM_1.1')
+        assert loaded.get_gene_by_entrez_id('NC_000002.12', 2) == built.get_gene_by_entrez_id('NC_000002.12', 2)
+
+    def test_stale_index_is_rebuilt(self, gtf_file: str, tmp_path):
+        index_path = str(tmp_path / 'test.gtf.gz.model')
+        GTFHandler(gtf_file, model_index_path=index_path)
+
+        with open(gtf_file.removesuffix('.gz'), 'w') as f:
+            f.write('\n'.join(TestGTFScanner.GTF_LINES).replace('\tgene\t100\t500\t.\t-', '\tgene\t150\t500\t.\t-') + '\n')
+        gtf_file = pysam.tabix_index(gtf_file.removesuffix('.gz'), preset='gff', force=True)
+
+        assert GTFModel.load(index_path, gtf_file) is None
+        assert GTFHandler(gtf_file, model_index_path=index_path).get_gene_by_entrez_id('NC_000002.12', 2).start == 150
+        assert GTFModel.load(index_path, gtf_file) is not None
+
+    @pytest.mark.parametrize("model_index", [False, True])
+    def test_get_genes_by_entrez_id_matches_single_lookups(self, gtf_file: str, tmp_path, model_index: bool):
+        gtf_handler = GTFHandler(gtf_file, model_index_path=str(tmp_path / 'test.gtf.gz.model') if model_index else None)
+        chromosomes, entrez_gene_ids = ['NC_000002.12', 'NC_000001.11', 'NC_000001.11', 'NC_000002.12'], [2, 1, 2, 3]
+
+        genes = gtf_handler.get_genes_by_entrez_id(chromosomes, entrez_gene_ids)
+
+        assert genes['found'].tolist() == [True, True, False, False]
+        for (_, gene), chromosome, entrez_gene_id in zip(genes.iterrows(), chromosomes, entrez_gene_ids):
+            expected = gtf_handler.get_gene_by_entrez_id(chromosome, entrez_gene_id)
+            if expected is not None:
+                assert (gene['start'], gene['end'], gene['strand']) == (expected.start, expected.end, expected.strand)
+
+        with pytest.raises(ValueError):
+            gtf_handler.get_genes_by_entrez_id(['NC_000003.12'], [1])
+
+    @pytest.mark.parametrize("model_index", [False, True])
+    def test_exons_before_one_without_exon_number_are_kept(self, tmp_path, model_index: bool):
+        gtf_file_path = str(tmp_path / 'numbering.gtf')
+        with open(gtf_file_path, 'w') as f:
+            for start, exon_number in [(100, 'exon_number "1"; '), (400, ''), (700, 'exon_number "3"; ')]:
+                f.write(f'NC_000001.11\tBestRefSeq\texon\t{start}\t{start + 100}\t.\t+\t.\tgene_id "A"; transcript_id "NM_1.1"; db_xref "GenBank:NM_1.1"; {exon_number}\n')
+        gtf_file = pysam.tabix_index(gtf_file_path, preset='gff')
+        gtf_handler = GTFHandler(gtf_file, model_index_path=str(tmp_path / 'numbering.gtf.gz.model') if model_index else None)
+
+        assert gtf_handler.get_exons_by_transcript('NC_000001.11', 0, 1000, 'NM_1.1') == [Exon('NC_000001.11', 100, 200, '+', None, 1)]
+        assert gtf_handler.get_transcript_model('NC_000001.11', 0, 1000, 'NM_1.1').exons == [Exon('NC_000001.11', 100, 200, '+', None, 1)]
+
+    @pytest.mark.parametrize("model_index", [False, True])
+    def test_transcript_model_is_mane_select(self, tmp_path, model_index: bool):
+        gtf_file_path = str(tmp_path / 'mane.gtf')
+        with open(gtf_file_path, 'w') as f:
+            for start, transcript_id, tag in [(100, 'NM_1.1', 'tag "MANE Select"; '), (100, 'NM_2.1', ''), (5000, 'NM_1.1', '')]:
+                f.write(f'NC_000001.11\tBestRefSeq\ttranscript\t{start}\t{start + 500}\t.\t+\t.\tgene_id "A"; transcript_id "{transcript_id}"; db_xref "GenBank:{transcript_id}"; {tag}\n')
+        gtf_file = pysam.tabix_index(gtf_file_path, preset='gff')
+        gtf_handler = GTFHandler(gtf_file, model_index_path=str(tmp_path / 'mane.gtf.gz.model') if model_index else None)
+
+        assert gtf_handler.get_transcript_model('NC_000001.11', 0, 1000, 'NM_1.1').is_mane_select
+        assert not gtf_handler.get_transcript_model('NC_000001.11', 0, 1000, 'NM_2.1').is_mane_select
+        assert not gtf_handler.get_transcript_model('NC_000001.11', 4000, 6000, 'NM_1.1').is_mane_select
+        assert not gtf_handler.get_transcript_model('NC_000001.11', 0, 1000, 'NM_3.1').is_mane_select
+
+class TestFeatureTables:
+    def test_exon_table_round_trip(self):
+        exons = [
+            Exon('NC_000001.11', 100, 200, '+', None, 1),
+            Exon('NC_000001.11', 400, 500, '+', None, 2),
+            Exon('NC_000002.12', 100, 500, '-', None, 1)
+        ]
+
+        table = ExonTable.from_exons(exons)
+
+        assert len(table) == 3
+        assert table[2] == exons[2]
+        assert table.to_exons() == exons
+
+    def test_splice_junction_table_round_trip(self):
+        positions = [
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 1, 'Donor', 201, 1),
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 2, 'Acceptor', 398, -2),
+            SpliceJunctionPosition('NC_000002.12', 'NM_2.1', False, 1, 'Donor', 98, 2)
+        ]
+
+        table = SpliceJunctionTable.from_positions(positions)
+
+        assert table.transcripts == ['NM_1.1', 'NM_2.1']
+        assert table.to_positions() == positions
+
+    def test_splice_junction_table(self):
+        exons = ExonTable.from_exons([
+            Exon('NC_000001.11', 100, 200, '+', None, 1),
+            Exon('NC_000001.11', 400, 500, '+', None, 2),
+            Exon('NC_000001.11', 700, 800, '+', None, 3),
+            Exon('NC_000001.11', 1000, 1100, '-', None, 2),
+            Exon('NC_000001.11', 1300, 1400, '-', None, 1),
+            Exon('NC_000001.11', 2000, 2100, '+', None, 1)
+        ])
+
+        table = splice_junction_table(exons,
+                                      transcript=np.array([0, 0, 0, 1, 1, 2]),
+                                      transcripts=['NM_1.1', 'NM_2.1', 'NR_3.1'],
+                                      mane=np.array([True, True, True, False, False, False]))
+
+        assert table.to_positions() == [
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 1, 'Donor', 201, 1),
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 1, 'Donor', 202, 2),
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 2, 'Acceptor', 398, -2),
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 2, 'Acceptor', 399, -1),
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 2, 'Donor', 501, 1),
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 2, 'Donor', 502, 2),
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 3, 'Acceptor', 698, -2),
+            SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 3, 'Acceptor', 699, -1),
+            SpliceJunctionPosition('NC_000001.11', 'NM_2.1', False, 2, 'Acceptor', 1101, -1),
+            SpliceJunctionPosition('NC_000001.11', 'NM_2.1', False, 2, 'Acceptor', 1102, -2),
+            SpliceJunctionPosition('NC_000001.11', 'NM_2.1', False, 1, 'Donor', 1298, 2),
+            SpliceJunctionPosition('NC_000001.11', 'NM_2.1', False, 1, 'Donor', 1299, 1)
+        ]
+
+        df = table.to_dataframe()
+        assert df['pos'].tolist() == [p.pos for p in table]
+        assert df['category'].tolist() == [p.category for p in table]
+
+    def test_features_have_no_instance_dict(self):
+        assert not hasattr(Exon('NC_000001.11', 100, 200, '+', None, 1), '__dict__')
+        assert not hasattr(SpliceJunctionPosition('NC_000001.11', 'NM_1.1', True, 1, 'Donor', 201, 1), '__dict__')
+
+class TestGTFHandler:
+    @pytest.fixture(scope="class", params=[False, True], ids=["tabix", "in_memory"])
+    def gtf_hander(self, request):
+        return GTFHandler('tests/fixtures/GCF_000001405.40_GRCh38.p14_genomic.sorted.gtf.gz', in_memory=request.param)
     
     @pytest.fixture
     def gtf_hander_rna_cloud(self):
@@ -131,6 +358,25 @@ class TestGTFHandler:
         response = gtf_hander.is_transcript_partial(chromosome, start, end, transcript_id)
         assert response == expected, f"Expected {expected} but got {response} for transcript {transcript_id} in {chromosome}:{start}-{end}"
 
+    @pytest.mark.parametrize("chromosome, start, end, transcript_id, partial", [
+        ('NW_012132919.1', 23863, 144565, 'NM_130797.4', True),
+        ('NC_000007.14', 153748133, 154894285, 'NM_130797.4', False)
+    ])
+    def test_get_transcript_model(self, gtf_hander: GTFHandler, chromosome: str, start: int, end: int, transcript_id: str, partial: bool):
+        response = gtf_hander.get_transcript_model(chromosome, start, end, transcript_id)
+
+        assert response.partial == partial
+        assert response.exons == gtf_hander.get_exons_by_transcript(chromosome, start, end, transcript_id)
+        assert response.introns == GTFHandler.derive_introns_from_exons(response.exons)
+
+    def test_get_transcript_model_returns_copies(self, gtf_hander: GTFHandler):
+        first = gtf_hander.get_transcript_model('NC_000007.14', 153748133, 154894285, 'NM_130797.4')
+        first.exons[0].sequence = 'ACGT'
+
+        second = gtf_hander.get_transcript_model('NC_000007.14', 153748133, 154894285, 'NM_130797.4')
+
+        assert second.exons[0].sequence is None
+
     @pytest.mark.parametrize("chrom, start, end, entrez_gene_id, expected", [
         ('NC_000001.11', 65419, 71585, 79501, [
             SpliceJunctionPosition('NC_000001.11', 'NM_001005484.2', True, 1, 'Donor', 65434, 1),
@@ -185,6 +431,29 @@ class TestGTFHandler:
             assert item[0].category == item[1].category, f"Category mismatch: {item[0].category} != {item[1].category}"
             assert item[0].pos == item[1].pos, f"Position mismatch: {item[0].pos} != {item[1].pos}"
 
+    def test_obtain_sj_positions_bulk(self, gtf_hander: GTFHandler):
+        genes = pd.DataFrame([
+            ('NC_000011.10', 5225464, 5227071, 3043),
+            ('NC_000001.11', 65419, 71585, 79501),
+            ('NC_000010.11', 103389050, 103396475, 84833),
+            ('NC_000007.14', 73680918, 73683453, 84277),
+            ('NC_000001.11', 65419, 65419, 79501)
+        ], columns=['chrom', 'start', 'end', 'entrez_gene_id'])
+
+        response = gtf_hander.obtain_sj_positions_bulk(genes)
+
+        assert response == [gtf_hander.obtain_sj_positions(row.chrom, row.start, row.end, row.entrez_gene_id)
+                            for row in genes.itertuples()]
+
+    def test_get_splice_junction_table(self, gtf_hander: GTFHandler):
+        mane = gtf_hander.get_splice_junction_table().to_positions()
+        all_transcripts = gtf_hander.get_splice_junction_table(mane_only=False).to_positions()
+
+        expected = gtf_hander.obtain_sj_positions('NC_000001.11', 65419, 71585, 79501)
+        assert [p for p in mane if p.transcript == 'NM_001005484.2'] == expected
+        assert all(p in all_transcripts for p in expected)
+        assert any(not p.transcript_is_mane_select for p in all_transcripts)
+
     @pytest.mark.parametrize("chromosome, entrez_gene_id, start, end, strand", [
         ('NW_012132914.1', 65122, 38599, 43422, '+'),
         ('NC_000001.11', 65122, 12857086, 12861909, '+')
@@ -207,4 +476,17 @@ class TestGTFHandler:
         # Test for a valid Entrez Gene ID
         gene = gtf_hander.get_gene_by_entrez_id(chromosome, entrez_gene_id)
 
-        assert gene is None
\ No newline at end of file
+        assert gene is None
+
+    @pytest.mark.parametrize("chromosome, entrez_gene_id, start, end, strand", [
+        ('NW_012132914.1', 65122, 38599, 43422, '+'),
+        ('NC_000001.11', 65122, 12857086, 12861909, '+')
+    ])
+    def test_get_gene_by_entrez_id_from_gene_index(self, tmp_path, chromosome: str, entrez_gene_id: int, start: int, end: int, strand: str):
+        gtf_file_path = 'tests/fixtures/GCF_000001405.40_GRCh38.p14_genomic.sorted.gtf.gz'
+        gene_index_path = str(tmp_path / 'genes.idx')
+
+        built = GTFHandler(gtf_file_path, gene_index_path=gene_index_path).get_gene_by_entrez_id(chromosome, entrez_gene_id)
+        loaded = GTFHandler(gtf_file_path, gene_index_path=gene_index_path).get_gene_by_entrez_id(chromosome, entrez_gene_id)
+
+        assert built == loaded == Feature(chromosome=chromosome, start=start, end=end, strand=strand, sequence=None)
@@ -0,0 +1,57 @@
+from rnacloud_genome_reference.common.handles import HandlePool
+import os
+import pickle
+import pytest
+
+class TestHandlePool:
+    @pytest.fixture
+    def fasta_file(self, write_fasta) -> str:
+        return write_fasta({'chr1': 'ACGTACGTAC'})
+
+    def test_handles_are_reused(self, fasta_file: str):
+        pool = HandlePool()
+
+        first = pool.fasta(fasta_file)
+        second = pool.fasta(fasta_file)
+
+        assert first is second
+        assert first.fetch('chr1', 0, 4) == 'ACGT'
+        assert (pool.hits, pool.misses) == (1, 1)
+
+    def test_get_opens_once_per_key(self):
+        pool = HandlePool()
+        opened = []
+
+        for key in ['a', 'b', 'a', 'a']:
+            pool.get(key, lambda: opened.append(key) or key)
+
+        assert opened == ['a', 'b']
+        assert (pool.hits, pool.misses) == (2, 2)
+
+    def test_pickled_pool_starts_empty(self, fasta_file: str):
+        pool = HandlePool()
+        pool.fasta(fasta_file)
+
+        unpickled = pickle.loads(pickle.dumps(pool))
+
+        assert len(unpickled) == 0
+        assert (unpickled.hits, unpickled.misses) == (0, 0)
+
+    def test_handles_are_not_shared_after_fork(self, monkeypatch):
+        pool = HandlePool()
+        parent_handle = pool.get('a', object)
+
+        monkeypatch.setattr(os, 'getpid', lambda: -1)
+
+        assert len(pool) == 0
+        assert pool.get('a', object) is not parent_handle
+        assert (pool.hits, pool.misses) == (0, 1)
+
+    def test_close(self, fasta_file: str):
+        pool = HandlePool()
+        handle = pool.fasta(fasta_file)
+
+        pool.close()
+
+        assert handle.closed
+        assert len(pool) == 0
@@ -0,0 +1,59 @@
+from rnacloud_genome_reference.common.resumable_tsv import ResumableTSVWriter
+import os
+import pandas as pd
+import pytest
+
+class TestResumableTSVWriter:
+    @pytest.fixture
+    def rows(self) -> pd.DataFrame:
+        return pd.DataFrame({'gene': ['A', 'B', 'C'], 'status': ['Equal', 'Different', 'Equal']})
+
+    def test_round_trip(self, rows: pd.DataFrame, tmp_path):
+        path = str(tmp_path / 'out.tsv')
+
+        writer = ResumableTSVWriter(path, fingerprint='inputs')
+        for i in range(len(rows)):
+            writer.write(rows.iloc[i:i + 1])
+        writer.close()
+
+        pd.testing.assert_frame_equal(pd.read_csv(path, sep="\t"), rows)
+        assert not os.path.exists(path + '.checkpoint')
+
+    def test_resume_drops_partial_row(self, rows: pd.DataFrame, tmp_path):
+        path = str(tmp_path / 'out.tsv')
+
+        writer = ResumableTSVWriter(path, fingerprint='inputs')
+        writer.write(rows.iloc[0:2])
+        writer.output.write('C\tEq')
+        writer.close(complete=False)
+
+        writer = ResumableTSVWriter(path, fingerprint='inputs')
+        assert [writer.is_done(key) for key in rows.index] == [True, True, False]
+        writer.write(rows.iloc[2:3])
+        writer.close()
+
+        pd.testing.assert_frame_equal(pd.read_csv(path, sep="\t"), rows)
+
+    def test_different_fingerprint_starts_afresh(self, rows: pd.DataFrame, tmp_path):
+        path = str(tmp_path / 'out.tsv')
+
+        writer = ResumableTSVWriter(path, fingerprint='inputs')
+        writer.write(rows.iloc[0:2])
+        writer.close(complete=False)
+
+        writer = ResumableTSVWriter(path, fingerprint='other inputs')
+        assert not any(writer.is_done(key) for key in rows.index)
+        writer.write(rows)
+        writer.close()
+
+        pd.testing.assert_frame_equal(pd.read_csv(path, sep="\t"), rows)
+
+    def test_second_writer_on_same_path_raises(self, tmp_path):
+        path = str(tmp_path / 'out.tsv')
+
+        writer = ResumableTSVWriter(path, fingerprint='inputs')
+        with pytest.raises(RuntimeError):
+            ResumableTSVWriter(path, fingerprint='inputs')
+        writer.close()
+
+        assert os.listdir(tmp_path) == ['out.tsv']
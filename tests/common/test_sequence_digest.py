@@ -0,0 +1,65 @@
+from rnacloud_genome_reference.common import sequence_digest
+from rnacloud_genome_reference.common.sequence_digest import SequenceDigest, SequenceDigestCache
+import os
+import pytest
+
+class TestSequenceDigest:
+    @pytest.mark.parametrize("sequence, head, tail", [
+        ('GTAAGTCCAG', 'GT', 'AG'),
+        ('G', 'G', 'G'),
+        ('', '', '')
+    ])
+    def test_of(self, sequence: str, head: str, tail: str):
+        digest = SequenceDigest.of(sequence)
+
+        assert len(digest) == len(sequence)
+        assert (digest.head, digest.tail) == (head, tail)
+
+    def test_equal_exactly_when_sequences_are(self):
+        assert SequenceDigest.of('ACGTACGT') == SequenceDigest.of('ACGTACGT')
+        assert SequenceDigest.of('ACGTACGT') != SequenceDigest.of('ACGTTCGT')
+
+class TestSequenceDigestCache:
+    @pytest.fixture
+    def fasta_file(self, write_fasta) -> str:
+        return write_fasta({'chr1': 'ACGTACGTAC'})
+
+    def test_round_trip(self, fasta_file: str, tmp_path):
+        digests = {('chr1', 1, 4): SequenceDigest.of('ACGT'), ('chr1', 5, 8): SequenceDigest.of('ACGT')}
+
+        cache = SequenceDigestCache(str(tmp_path / 'digests.sqlite'), fasta_file)
+        cache.put_many(digests)
+        cache.close()
+
+        cache = SequenceDigestCache(str(tmp_path / 'digests.sqlite'), fasta_file)
+        assert cache.get_many([('chr1', 1, 4), ('chr1', 5, 8), ('chr1', 9, 10)]) == digests
+
+    def test_get_many_in_batches(self, fasta_file: str, tmp_path):
+        digests = {('chr1', start, start + 3): SequenceDigest.of('ACGT'[start % 4:]) for start in range(1, 1000, 2)}
+
+        cache = SequenceDigestCache(str(tmp_path / 'digests.sqlite'), fasta_file)
+        cache.put_many(digests)
+
+        keys = [('chr1', start, start + 3) for start in range(1, 1001)]
+        assert len(keys) > 3 * sequence_digest.SEQUENCE_DIGEST_CACHE_BATCH_SIZE
+        assert cache.get_many(keys) == digests
+
+    def test_changed_fasta_does_not_reuse_digests(self, fasta_file: str, tmp_path):
+        cache = SequenceDigestCache(str(tmp_path / 'digests.sqlite'), fasta_file)
+        cache.put_many({('chr1', 1, 4): SequenceDigest.of('ACGT')})
+        cache.close()
+
+        with open(fasta_file, 'w') as f:
+            f.write('>chr1\nTTTTACGTAC\n')
+
+        cache = SequenceDigestCache(str(tmp_path / 'digests.sqlite'), fasta_file)
+        assert cache.get_many([('chr1', 1, 4)]) == {}
+
+    def test_checksum_is_computed_once(self, fasta_file: str, tmp_path, monkeypatch):
+        calls = []
+        monkeypatch.setattr(sequence_digest, 'file_digest', lambda path: calls.append(path) or 'checksum')
+
+        SequenceDigestCache(str(tmp_path / 'digests.sqlite'), fasta_file).close()
+        SequenceDigestCache(str(tmp_path / 'digests.sqlite'), fasta_file).close()
+
+        assert calls == [os.path.abspath(fasta_file)]
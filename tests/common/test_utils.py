@@ -1,6 +1,8 @@
+import os
+
 import pytest
 
-from rnacloud_genome_reference.common.utils import AssemblyReportParser
+from rnacloud_genome_reference.common.utils import AssemblyReportParser, file_stamp
 
 @pytest.fixture
 def chromosome_converter():
@@ -48,4 +50,14 @@ def test_get_contig_range(chromosome_converter):
 def test_get_contig_range_invalid(chromosome_converter):
     # Test getting contig range for an invalid UCSC contig name
     with pytest.raises(ValueError, match="UCSC contig name invalid_chr not found in assembly report"):
-        chromosome_converter.get_contig_range('invalid_chr')  # Replace with an actual invalid UCSC contig name
\ No newline at end of file
+        chromosome_converter.get_contig_range('invalid_chr')  # Replace with an actual invalid UCSC contig name
+
+def test_file_stamp_follows_symlinks_and_changes_with_contents(tmp_path):
+    path = tmp_path / 'a.txt'
+    path.write_text('abc')
+    os.symlink(path, tmp_path / 'link.txt')
+    stamp = file_stamp(str(path))
+    assert file_stamp(str(tmp_path / 'link.txt')) == stamp
+
+    path.write_text('abcd')
+    assert file_stamp(str(path)) != stamp
@@ -0,0 +1,17 @@
+from typing import Callable
+
+import pysam
+import pytest
+
+@pytest.fixture
+def write_fasta(tmp_path) -> Callable[[dict[str, str]], str]:
+    """
+    Writes the given sequences, by name, to a FASTA file in tmp_path with its .fai and returns its path.
+    """
+    def write(sequences: dict[str, str]) -> str:
+        fasta_file_path = str(tmp_path / 'test.fa')
+        with open(fasta_file_path, 'w') as f:
+            f.write(''.join(f'>{name}\n{sequence}\n' for name, sequence in sequences.items()))
+        pysam.faidx(fasta_file_path)
+        return fasta_file_path
+    return write
@@ -0,0 +1,101 @@
+import gzip
+import os
+
+import numpy as np
+import pysam
+import pytest
+
+from rnacloud_genome_reference.genome_build.build_genome_fasta import build_genome_fasta, mask_sequence, natural_sort_key
+from rnacloud_genome_reference.genome_build.common import ASSEMBLY_REPORT_QUERY
+from rnacloud_genome_reference.genome_build.get_target_contigs import get_assembly_report_contigs
+
+@pytest.mark.parametrize("names, expected", [
+    (['chr10', 'chr2', 'chr1'], ['chr1', 'chr2', 'chr10']),
+    (['chrM', 'chrUn_KI270302v1', 'chrX', 'chr1_KI270706v1_random', 'chr10', 'chr1', 'chrEBV'], ['chr1', 'chr1_KI270706v1_random', 'chr10', 'chrUn_KI270302v1', 'chrM', 'chrX', 'chrEBV']),
+    (['chr19_MU273386v1_fix', 'chr19_KI270866v1_alt', 'chr9_KN196479v1_fix'], ['chr9_KN196479v1_fix', 'chr19_KI270866v1_alt', 'chr19_MU273386v1_fix'])
+])
+def test_natural_sort_key(names, expected):
+    assert sorted(names, key=natural_sort_key) == expected
+
+def test_natural_sort_key_keeps_previous_assembly_order():
+    # Target contigs as get_target_contigs gives them, sorted by name, then chrEBV as build_genome_fasta adds it
+    targets = get_assembly_report_contigs('tests/fixtures/GCF_000001405.40_GRCh38.p14_assembly_report.txt', ASSEMBLY_REPORT_QUERY)
+
+    # Order of the sequences in the assembly.fasta.fai of the build before build_genome_fasta
+    expected = [f'chr{i}' for i in range(1, 23)] + ['chr22_KI270733v1_random', 'chr22_KI270879v1_alt', 'chrUn_GL000220v1', 'chrM', 'chrX', 'chrY', 'chrEBV']
+
+    assert sorted(targets + ['chrEBV'], key=natural_sort_key) == expected
+
+@pytest.mark.parametrize("starts, ends, expected", [
+    ([], [], 'ACGTACGTAC'),
+    ([0, 4], [2, 10], 'NNGTNNNNNN'),
+    ([3], [4], 'ACGNACGTAC'),
+    # Clipped to the sequence, as bedtools maskfasta does
+    ([8, 12], [12, 20], 'ACGTACGTNN')
+])
+def test_mask_sequence(starts, ends, expected):
+    sequence = bytearray(b'ACGTACGTAC')
+    masked = mask_sequence(sequence, np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64))
+
+    assert sequence.decode() == expected
+    assert masked == expected.count('N')
+
+@pytest.fixture
+def inputs(tmp_path) -> dict[str, str]:
+    with open(tmp_path / 'assembly_report.txt', 'w') as f:
+        f.write('# Assembly name: test\n')
+        f.write('1\tassembled-molecule\t1\tChromosome\tCM000663.2\t=\tNC_000001.11\tPrimary Assembly\t100\tchr1\n')
+        f.write('2\tassembled-molecule\t2\tChromosome\tCM000664.2\t=\tNC_000002.12\tPrimary Assembly\t100\tchr2\n')
+        f.write('10\tassembled-molecule\t10\tChromosome\tCM000672.2\t=\tNC_000010.11\tPrimary Assembly\t80\tchr10\n')
+
+    with open(tmp_path / 'source.fasta', 'w') as f:
+        f.write('>NC_000010.11 Homo sapiens chromosome 10\n' + 'C' * 80 + '\n')
+        f.write('>NC_000002.12 Homo sapiens chromosome 2\n' + 'G' * 80 + '\n' + 'g' * 20 + '\n')
+        f.write('>NC_000001.11 Homo sapiens chromosome 1\n' + 'A' * 80 + '\n' + 'a' * 20 + '\n')
+    pysam.tabix_compress(str(tmp_path / 'source.fasta'), str(tmp_path / 'source.fasta.gz'))
+    pysam.faidx(str(tmp_path / 'source.fasta.gz'))
+
+    with open(tmp_path / 'chrEBV.fasta', 'w') as f:
+        f.write('>chrEBV\n' + 'T' * 30 + '\n')
+
+    with open(tmp_path / 'mask.bed', 'w') as f:
+        f.write('chr1\t90\t100\tA-FIX\t0\t.\n')
+        f.write('chr10\t0\t10\tB-PRIMARY\t0\t.\n')
+
+    return {'fasta': str(tmp_path / 'source.fasta.gz'),
+            'assembly_report': str(tmp_path / 'assembly_report.txt'),
+            'ebv_fasta': str(tmp_path / 'chrEBV.fasta'),
+            'mask_beds': [str(tmp_path / 'mask.bed')]}
+
+def test_build_genome_fasta(inputs: dict[str, str], tmp_path):
+    output = str(tmp_path / 'assembly.fasta.gz')
+    stats = build_genome_fasta(target_contigs=['chr10', 'chr1'],
+                               output_fasta=output,
+                               uncompressed_output_fasta=str(tmp_path / 'assembly.fasta'),
+                               masked_regions_bed=str(tmp_path / 'masked_regions.bed'),
+                               **inputs)
+
+    chr1 = 'A' * 80 + 'a' * 10 + 'N' * 10
+    chr10 = 'N' * 10 + 'C' * 70
+    expected = f">chr1\n{chr1[:60]}\n{chr1[60:]}\n>chr10\n{chr10[:60]}\n{chr10[60:]}\n>chrEBV\n{'T' * 30}\n"
+
+    with gzip.open(output, 'rt') as f:
+        assert f.read() == expected
+    with open(tmp_path / 'assembly.fasta') as f:
+        assert f.read() == expected
+    with pysam.FastaFile(output) as fasta:
+        assert list(fasta.references) == ['chr1', 'chr10', 'chrEBV']
+        assert fasta.fetch('chr10') == chr10
+    with open(tmp_path / 'masked_regions.bed') as f:
+        assert f.read() == "chr1\t90\t100\nchr10\t0\t10\n"
+
+    # chr1 and chr10 take 102 and 81 bytes in the source, chr2 is not read
+    assert stats['subset'] == {'read': 183, 'written': 0}
+    assert stats['add_ebv'] == {'read': os.path.getsize(inputs['ebv_fasta']), 'written': 0}
+    assert stats['mask'] == {'read': os.path.getsize(inputs['mask_beds'][0]), 'written': os.path.getsize(tmp_path / 'masked_regions.bed')}
+    assert stats['compress'] == {'read': 0, 'written': os.path.getsize(output) + os.path.getsize(tmp_path / 'assembly.fasta')}
+    assert set(stats) == {'subset', 'add_ebv', 'mask', 'compress'}
+
+def test_build_genome_fasta_missing_target_raises(inputs: dict[str, str], tmp_path):
+    with pytest.raises(ValueError):
+        build_genome_fasta(target_contigs=['chr1', 'chr3'], output_fasta=str(tmp_path / 'assembly.fasta.gz'), **inputs)
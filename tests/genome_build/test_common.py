@@ -1,6 +1,6 @@
 import pytest
 
-from rnacloud_genome_reference.genome_build.common import subtract_ranges
+from rnacloud_genome_reference.genome_build.common import Region, from_regions, subtract_ranges, to_regions
 
 def test_ideal_case_simple():
     contig = (1, 10)
@@ -42,4 +42,12 @@ def test_gene_fully_outside_contig():
     contig = (10, 20)
     genes = [(21, 22)]
     with pytest.raises(ValueError, match="out of contig bounds"):
-        subtract_ranges(contig, genes)
\ No newline at end of file
+        subtract_ranges(contig, genes)
+
+def test_regions_round_trip():
+    regions = [Region(chrom='chr1', start=1, end=10, name='MASK'), Region(chrom='chr1', start=21, end=30, name='MASK')]
+
+    interval_set = from_regions(regions)
+
+    assert list(interval_set) == [('chr1', 0, 10), ('chr1', 20, 30)]
+    assert to_regions(interval_set, name='MASK') == regions
@@ -0,0 +1,48 @@
+import pandas as pd
+import pysam
+
+from rnacloud_genome_reference.genome_build.common import GRC_FIXES_QUERY, from_regions
+from rnacloud_genome_reference.genome_build.generate_mask_and_unmask_bed import get_grc_mask_and_unmask_regions
+from rnacloud_genome_reference.genome_build.generate_mask_bed import get_grc_mask_regions
+from rnacloud_genome_reference.genome_build.generate_unmask_bed import get_fix_unmasked_regions
+from rnacloud_genome_reference.genome_build.intervals import IntervalSet
+
+def test_get_grc_mask_and_unmask_regions(tmp_path):
+    gtf_file_path = str(tmp_path / 'test.gtf')
+    with open(gtf_file_path, 'w') as f:
+        f.write('NW_000001.1\tBestRefSeq\tgene\t101\t200\t.\t+\t.\tgene_id "A"; transcript_id ""; db_xref "GeneID:1"; \n')
+        f.write('NW_000001.1\tBestRefSeq\tgene\t151\t300\t.\t-\t.\tgene_id "B"; transcript_id ""; db_xref "GeneID:2"; \n')
+        f.write('NW_000002.1\tBestRefSeq\tgene\t11\t50\t.\t+\t.\tgene_id "D"; transcript_id ""; db_xref "GeneID:4"; \n')
+    gtf_file_path = pysam.tabix_index(gtf_file_path, preset='gff')
+
+    with open(tmp_path / 'assembly_report.txt', 'w') as f:
+        f.write('# Assembly name: test\n')
+        f.write('HG1_PATCH\tfix-patch\t1\tChromosome\tKN000001.1\t=\tNW_000001.1\tPATCHES\t1000\tchr1_KN000001v1_fix\n')
+        f.write('HG2_PATCH\tfix-patch\t2\tChromosome\tKN000002.1\t=\tNW_000002.1\tPATCHES\t100\tchr2_KN000002v1_fix\n')
+
+    pd.DataFrame([
+        ('chr1', 1001, 2000, '+', 'A', 1, 'NW_000001.1', 'chr1_KN000001v1_fix', 'Different - Splice sites differ'),
+        ('chr1', 3001, 4000, '-', 'B', 2, 'NW_000001.1', 'chr1_KN000001v1_fix', 'Different - Exons or introns sequences differ'),
+        # Not annotated on its fix contig, which is then masked whole
+        ('chr2', 5001, 6000, '+', 'C', 3, 'NW_000002.1', 'chr2_KN000002v1_fix', 'Different - Splice sites differ'),
+        ('chr2', 7001, 8000, '+', 'D', 4, 'NW_000002.1', 'chr2_KN000002v1_fix', 'Identical')
+    ], columns=['chr_ucsc', 'start', 'end', 'strand', 'gene_name', 'entrez_gene_id', 'alt_chr_refseq', 'alt_chr_ucsc', 'comparison_status']
+    ).to_csv(tmp_path / 'grc_fixes_assessment.tsv', sep='\t', index=False)
+
+    args = dict(assembly_report=str(tmp_path / 'assembly_report.txt'),
+                grc_fixes_assessment=str(tmp_path / 'grc_fixes_assessment.tsv'),
+                gtf=gtf_file_path,
+                query=GRC_FIXES_QUERY)
+
+    mask_regions, unmask_regions = get_grc_mask_and_unmask_regions(**args)
+
+    assert [(r.chrom, r.start, r.end, r.name) for r in unmask_regions] == [
+        ('chr1_KN000001v1_fix', 101, 200, 'A-FIX'),
+        ('chr1_KN000001v1_fix', 151, 300, 'B-FIX')
+    ]
+    assert mask_regions == get_grc_mask_regions(**args)
+    assert unmask_regions == get_fix_unmasked_regions(**{k: v for k, v in args.items() if k != 'assembly_report'})
+
+    fix_mask = from_regions(r for r in mask_regions if r.name.endswith('-FIX'))
+    assert len(fix_mask.intersect(from_regions(unmask_regions))) == 0
+    assert fix_mask.union(from_regions(unmask_regions)) == IntervalSet.from_contig_lengths({'chr1_KN000001v1_fix': 1000, 'chr2_KN000002v1_fix': 100})
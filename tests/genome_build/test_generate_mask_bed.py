@@ -1,3 +1,5 @@
+import pandas as pd
+import pysam
 import pytest
 
 from rnacloud_genome_reference.genome_build.get_target_contigs import GRC_FIXES_QUERY
@@ -70,4 +72,36 @@ def test_get_cen_par_regions():
     assert result[0].chrom == 'chr5'
     assert result[0].start == 47309185
     assert result[0].end == 49591369
-    assert result[0].name == 'GJ212203.1-CEN_PAR'
\ No newline at end of file
+    assert result[0].name == 'GJ212203.1-CEN_PAR'
+
+
+def test_get_grc_mask_regions_masks_fix_contig_outside_genes(tmp_path):
+    gtf_file_path = str(tmp_path / 'test.gtf')
+    with open(gtf_file_path, 'w') as f:
+        f.write('NW_000001.1\tBestRefSeq\tgene\t101\t200\t.\t+\t.\tgene_id "A"; transcript_id ""; db_xref "GeneID:1"; \n')
+        f.write('NW_000001.1\tBestRefSeq\tgene\t151\t300\t.\t-\t.\tgene_id "B"; transcript_id ""; db_xref "GeneID:2"; \n')
+        f.write('NW_000001.1\tBestRefSeq\tgene\t401\t1000\t.\t+\t.\tgene_id "C"; transcript_id ""; db_xref "GeneID:3"; \n')
+    gtf_file_path = pysam.tabix_index(gtf_file_path, preset='gff')
+
+    with open(tmp_path / 'assembly_report.txt', 'w') as f:
+        f.write('# Assembly name: test\n')
+        f.write('HG1_PATCH\tfix-patch\t1\tChromosome\tKN000001.1\t=\tNW_000001.1\tPATCHES\t1000\tchr1_KN000001v1_fix\n')
+
+    pd.DataFrame([
+        ('chr1', 1001, 2000, '+', 'A', 1, 'NW_000001.1', 'chr1_KN000001v1_fix', 'Different - Splice sites differ'),
+        ('chr1', 3001, 4000, '-', 'B', 2, 'NW_000001.1', 'chr1_KN000001v1_fix', 'Different - Exons or introns sequences differ'),
+        ('chr1', 5001, 6000, '+', 'C', 3, 'NW_000001.1', 'chr1_KN000001v1_fix', 'Identical')
+    ], columns=['chr_ucsc', 'start', 'end', 'strand', 'gene_name', 'entrez_gene_id', 'alt_chr_refseq', 'alt_chr_ucsc', 'comparison_status']
+    ).to_csv(tmp_path / 'grc_fixes_assessment.tsv', sep='\t', index=False)
+
+    result = get_grc_mask_regions(assembly_report=str(tmp_path / 'assembly_report.txt'),
+                                  grc_fixes_assessment=str(tmp_path / 'grc_fixes_assessment.tsv'),
+                                  gtf=gtf_file_path,
+                                  query=GRC_FIXES_QUERY)
+
+    assert [(r.chrom, r.start, r.end, r.name) for r in result] == [
+        ('chr1', 1001, 2000, 'A-PRIMARY'),
+        ('chr1', 3001, 4000, 'B-PRIMARY'),
+        ('chr1_KN000001v1_fix', 1, 100, 'A-B-FIX'),
+        ('chr1_KN000001v1_fix', 301, 1000, 'A-B-FIX')
+    ]
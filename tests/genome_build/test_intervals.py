@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from rnacloud_genome_reference.genome_build.intervals import IntervalSet
+
+def intervals(*triples: tuple[str, int, int]) -> IntervalSet:
+    return IntervalSet.from_arrays([t[0] for t in triples], [t[1] for t in triples], [t[2] for t in triples])
+
+@pytest.mark.parametrize("given, expected", [
+    # Overlapping and adjacent intervals merge, empty ones are dropped
+    ([('chr1', 10, 20), ('chr1', 15, 30), ('chr1', 30, 35), ('chr1', 40, 40)], [('chr1', 10, 35)]),
+    # Contained intervals, in any order
+    ([('chr1', 50, 60), ('chr1', 0, 100), ('chr2', 5, 6)], [('chr1', 0, 100), ('chr2', 5, 6)]),
+    # Gaps are kept
+    ([('chr1', 0, 10), ('chr1', 11, 20)], [('chr1', 0, 10), ('chr1', 11, 20)]),
+    ([], [])
+])
+def test_from_arrays_merges(given, expected):
+    assert list(intervals(*given)) == expected
+
+def test_union():
+    result = intervals(('chr1', 0, 10), ('chr2', 0, 10)).union(intervals(('chr1', 5, 20), ('chr3', 1, 2)))
+    assert list(result) == [('chr1', 0, 20), ('chr2', 0, 10), ('chr3', 1, 2)]
+
+def test_intersect():
+    result = intervals(('chr1', 0, 10), ('chr1', 20, 30), ('chr2', 0, 10)).intersect(intervals(('chr1', 5, 25), ('chr3', 0, 10)))
+    assert list(result) == [('chr1', 5, 10), ('chr1', 20, 25)]
+
+def test_subtract():
+    result = intervals(('chr1', 0, 100), ('chr2', 0, 10)).subtract(intervals(('chr1', 10, 20), ('chr1', 50, 150)))
+    assert list(result) == [('chr1', 0, 10), ('chr1', 20, 50), ('chr2', 0, 10)]
+
+def test_complement():
+    result = intervals(('chr1', 0, 10), ('chr1', 90, 100)).complement({'chr1': 100, 'chr2': 50})
+    assert list(result) == [('chr1', 10, 90), ('chr2', 0, 50)]
+
+@pytest.mark.parametrize("given, contig_lengths", [
+    ([('chr1', 0, 101)], {'chr1': 100}),
+    ([('chr3', 0, 10)], {'chr1': 100})
+])
+def test_complement_out_of_bounds_raises(given, contig_lengths):
+    with pytest.raises(ValueError):
+        intervals(*given).complement(contig_lengths)
+
+def test_coverage():
+    assert intervals(('chr1', 0, 10), ('chr1', 5, 20), ('chr2', 3, 4)).coverage() == {'chr1': 20, 'chr2': 1}
+
+def test_from_bed(tmp_path):
+    with open(tmp_path / 'a.bed', 'w') as f:
+        f.write("chr1\t0\t10\tGENE-FIX\t0\t.\n")
+    with open(tmp_path / 'b.bed', 'w') as f:
+        f.write("chr1\t5\t15\n")
+    open(tmp_path / 'empty.bed', 'w').close()
+
+    assert list(IntervalSet.from_bed(str(tmp_path / 'a.bed'), str(tmp_path / 'b.bed'), str(tmp_path / 'empty.bed'))) == [('chr1', 0, 15)]
+
+def test_to_bed(tmp_path):
+    intervals(('chr2', 3, 4), ('chr1', 5, 20), ('chr1', 0, 10), ('chr1', 30, 40)).to_bed(str(tmp_path / 'out.bed'))
+
+    with open(tmp_path / 'out.bed') as f:
+        assert f.read() == "chr1\t0\t20\nchr1\t30\t40\nchr2\t3\t4\n"
+
+def test_intervals_of_missing_contig_are_empty():
+    starts, ends = intervals(('chr1', 0, 10)).intervals('chr2')
+    np.testing.assert_array_equal(starts, [])
+    np.testing.assert_array_equal(ends, [])
@@ -0,0 +1,19 @@
+import gzip
+
+from rnacloud_genome_reference.genome_build.common import Region
+from rnacloud_genome_reference.genome_build.redundant_5s_regions import get_redundant_5s_regions
+
+def test_get_redundant_5s_regions(tmp_path):
+    gtf_file_path = str(tmp_path / 'test.gtf.gz')
+    with gzip.open(gtf_file_path, 'wt') as f:
+        for contig, gene_id, start in [('NC_000001.11', 'RNA5S1', 1000),
+                                       ('NC_000001.11', 'RNA5S2', 2000),
+                                       ('NC_000001.11', 'RNA5S17', 3000),
+                                       ('NC_000001.11', 'RNA5S18', 4000),
+                                       ('NT_187388.1', 'RNA5S3', 5000)]:
+            f.write(f'{contig}\tBestRefSeq\tgene\t{start}\t{start + 120}\t.\t+\t.\tgene_id "{gene_id}"; gene_biotype "rRNA"; \n')
+
+    assert get_redundant_5s_regions(gtf_file_path) == [
+        Region(chrom='chr1', start=2000, end=2120, name='RNA5S2-Redundant5S', score=0, strand='.'),
+        Region(chrom='chr1', start=3000, end=3120, name='RNA5S17-Redundant5S', score=0, strand='.'),
+    ]
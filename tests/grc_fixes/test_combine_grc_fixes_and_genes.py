@@ -0,0 +1,43 @@
+from rnacloud_genome_reference.grc_fixes.combine_grc_fixes_and_genes import combine_grc_fixes_and_genes, overlap_join
+import numpy as np
+import pandas as pd
+import pytest
+
+class TestCombineGRCFixesAndGenes:
+    @pytest.fixture
+    def genes(self) -> pd.DataFrame:
+        return pd.DataFrame([
+            ('NC_000001.11', 100, 200, '+', 'ENDS_AT_FIX', 1, 'protein_coding'),
+            ('NC_000001.11', 201, 299, '-', 'INSIDE_FIX', 2, 'protein_coding'),
+            ('NC_000001.11', 50, 1000, '+', 'SPANS_FIX', 3, 'lncRNA'),
+            ('NC_000001.11', 301, 400, '+', 'AFTER_FIX', 4, 'protein_coding'),
+            ('NC_000002.12', 200, 300, '+', 'OTHER_CHROMOSOME', 5, 'protein_coding'),
+            ('NC_000001.11', 300, 350, '+', 'STARTS_AT_FIX_END', 6, 'protein_coding')
+        ], columns=['chr', 'start', 'end', 'strand', 'gene_name', 'entrez_gene_id', 'gene_biotype'])
+
+    @pytest.fixture
+    def grc_fixes(self) -> pd.DataFrame:
+        return pd.DataFrame([
+            (200, 300, 'NC_000001.11', 'chr1', 'HG-1', 'Clone Problem', 'Summary', 'Description', 'NW_000001.1', 'chr1_fix', 1, 1000),
+            (1, 10, 'NC_000003.12', 'chr3', 'HG-2', 'Gap', 'Summary', 'Description', 'NW_000002.1', 'chr3_fix', 1, 1000)
+        ], columns=['parent_start', 'parent_stop', 'chr_refseq', 'chr_ucsc', 'issue_id', 'type', 'summary', 'description',
+                    'alt_chr_refseq', 'alt_chr_ucsc', 'alt_scaf_start', 'alt_scaf_stop'])
+
+    def test_overlap_join(self, genes: pd.DataFrame, grc_fixes: pd.DataFrame):
+        gene_positions, fix_positions = overlap_join(genes, grc_fixes)
+
+        np.testing.assert_array_equal(gene_positions, [0, 1, 2, 5])
+        np.testing.assert_array_equal(fix_positions, [0, 0, 0, 0])
+
+    def test_engines_write_identical_rows(self, genes: pd.DataFrame, grc_fixes: pd.DataFrame, tmp_path):
+        genes.to_csv(tmp_path / 'genes.tsv', sep='\t', index=False)
+        grc_fixes.to_csv(tmp_path / 'grc_fixes.tsv', sep='\t', index=False)
+
+        combine_grc_fixes_and_genes(str(tmp_path / 'grc_fixes.tsv'), str(tmp_path / 'genes.tsv'), str(tmp_path / 'sweep.tsv'), engine='sweep')
+        combine_grc_fixes_and_genes(str(tmp_path / 'grc_fixes.tsv'), str(tmp_path / 'genes.tsv'), str(tmp_path / 'sqlite.tsv'), engine='sqlite')
+
+        with open(tmp_path / 'sweep.tsv') as sweep, open(tmp_path / 'sqlite.tsv') as sqlite:
+            assert sweep.read() == sqlite.read()
+
+        combined = pd.read_csv(tmp_path / 'sweep.tsv', sep='\t')
+        assert combined['gene_name'].tolist() == ['SPANS_FIX', 'ENDS_AT_FIX', 'INSIDE_FIX', 'STARTS_AT_FIX_END']
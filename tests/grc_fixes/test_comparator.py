@@ -1,8 +1,10 @@
 from typing import List
+import copy
 
 from pytest_bdd import scenario, given, scenarios, then, parsers
-from rnacloud_genome_reference.grc_fixes.comparator import FeatureComparisonResult, FeatureSequenceHelper, FeatureComparator
+from rnacloud_genome_reference.grc_fixes.comparator import FeatureComparisonResult, FeatureSequenceHelper, FeatureComparator, StreamingSequenceComparator
 from rnacloud_genome_reference.common.gtf import Exon, Feature, Intron
+from rnacloud_genome_reference.common.sequence_digest import SequenceDigest, SequenceDigestCache
 import pytest
 
 scenarios("features/test_comparator.feature")
@@ -35,6 +37,88 @@ class TestFeatureSequenceHelper:
 
         assert response == expected, f"Expected {expected}, but got {response}"
 
+    @pytest.fixture
+    def fasta_file(self, write_fasta) -> str:
+        return write_fasta({'chr1': 'ACGTACGTACggttaaccGGTTAACCAAAA', 'chr2': 'TTTTCCCCGGGG'})
+
+    def test_coalesced_fetch_matches_fetch_per_feature(self, fasta_file: str):
+        features = [
+            Exon("chr1", 1, 4, '+', None, 1),
+            Exon("chr1", 9, 12, '+', None, 2),
+            Exon("chr1", 28, 40, '+', None, 3),
+            Intron("chr1", 5, 8, '+', None, 1),
+            Intron("chr1", 13, 12, '+', None, 2),
+            Exon("chr2", 5, 8, '-', None, 1)
+        ]
+
+        helper = FeatureSequenceHelper(fasta_file, coalesce=True)
+        response = helper.get_seq_for_feature(copy.deepcopy(features))
+
+        assert response == FeatureSequenceHelper(fasta_file).get_seq_for_feature(copy.deepcopy(features))
+        assert [feature.sequence for feature in response] == ['ACGT', 'ACGG', 'AAA', 'ACGT', '', 'CCCC']
+        assert helper.fetches == 2
+
+    def test_coalesced_fetch_splits_spans_on_gap(self, fasta_file: str):
+        helper = FeatureSequenceHelper(fasta_file, coalesce=True, max_gap=4)
+        helper.get_seq_for_feature([Exon("chr1", 1, 4, '+', None, 1), Exon("chr1", 9, 12, '+', None, 2), Exon("chr1", 20, 24, '+', None, 3)])
+
+        assert helper.fetches == 2
+
+    def test_coalesced_fetch_raises_like_fetch_per_feature(self, fasta_file: str):
+        features = [Exon("chr1", 1, 4, '+', None, 1), Exon("chr1", 10, 5, '+', None, 2)]
+
+        with pytest.raises(ValueError, match="invalid coordinates"):
+            FeatureSequenceHelper(fasta_file, coalesce=True).get_seq_for_feature(features)
+        assert features[0].sequence == 'ACGT'
+
+    def test_digests_are_cached(self, fasta_file: str, tmp_path):
+        features = [Exon("chr1", 1, 4, '+', None, 1), Intron("chr1", 5, 12, '+', None, 1)]
+        digest_cache = SequenceDigestCache(str(tmp_path / 'digests.sqlite'), fasta_file)
+
+        first = FeatureSequenceHelper(fasta_file, digest_cache=digest_cache)
+        response = first.get_seq_for_feature(copy.deepcopy(features))
+
+        second = FeatureSequenceHelper(fasta_file, digest_cache=digest_cache)
+        assert second.get_seq_for_feature(copy.deepcopy(features)) == response
+        assert [feature.sequence for feature in response] == [SequenceDigest.of('ACGT'), SequenceDigest.of('ACGTACGG')]
+        assert (first.fetches, second.fetches) == (2, 0)
+        assert FeatureSequenceHelper.get_feature_seq_lengths(response) == '4;8'
+
+    def test_compare_splice_site_motifs_of_digests(self):
+        primary = [make_intron(SequenceDigest.of("GTAAAG"))]
+        fix = [make_intron(SequenceDigest.of("GCAAAG"))]
+
+        assert FeatureComparator.compare_splice_site_motifs(primary, fix) == 1 # type: ignore
+
+class TestStreamingSequenceComparator:
+    @pytest.fixture
+    def fasta_file(self, write_fasta) -> str:
+        return write_fasta({'chr1': 'GTAAGTCCCCAGGTAAGTCCCCAG', 'chr2': 'GTAAGTCCttAGGTAAGTCCCCAGGT'})
+
+    @pytest.mark.parametrize("primary, fix", [
+        ([make_intron(None)], [Intron("chr2", 20, 40, '+', None, 1)]),
+        ([Intron("chr1", 1, 12, '+', None, 1), Intron("chr1", 13, 24, '+', None, 2)], [Intron("chr2", 1, 12, '+', None, 1), Intron("chr2", 13, 24, '+', None, 2)]),
+        ([Intron("chr1", 1, 12, '+', None, 1)], [Intron("chr2", 13, 26, '+', None, 1)]),
+        ([Intron("chr1", 20, 30, '+', None, 1)], [Intron("chr2", 22, 32, '+', None, 1)]),
+        ([Intron("chr1", 5, 4, '+', None, 1)], [])
+    ])
+    def test_matches_comparison_of_sequences(self, fasta_file: str, primary: list[Intron], fix: list[Intron]):
+        streaming_comparator = StreamingSequenceComparator(fasta_file, chunk_size=5)
+        helper = FeatureSequenceHelper(fasta_file)
+        primary_sequences = helper.get_seq_for_feature(copy.deepcopy(primary))
+        fix_sequences = helper.get_seq_for_feature(copy.deepcopy(fix))
+
+        assert streaming_comparator.get_feature_seq_lengths(primary) == FeatureSequenceHelper.get_feature_seq_lengths(primary_sequences)
+        assert streaming_comparator.get_feature_seq_lengths(fix) == FeatureSequenceHelper.get_feature_seq_lengths(fix_sequences)
+        assert streaming_comparator.compare_sequences(primary, fix) == FeatureComparator.compare_sequences(primary_sequences, fix_sequences) # type: ignore
+        assert streaming_comparator.compare_splice_site_motifs(primary, fix) == FeatureComparator.compare_splice_site_motifs(primary_sequences, fix_sequences) # type: ignore
+
+    def test_stops_at_first_unequal_chunk(self, fasta_file: str):
+        streaming_comparator = StreamingSequenceComparator(fasta_file, chunk_size=4)
+
+        assert not streaming_comparator.sequences_equal(Intron("chr1", 1, 24, '+', None, 1), Intron("chr2", 1, 24, '+', None, 1))
+        assert streaming_comparator.fetches == 6
+
 class TestFeatureComparator:
     @pytest.mark.parametrize("primary_features,fix_features,expected", [
         (
@@ -111,6 +195,22 @@ class TestFeatureComparator:
         assert response['sequences_unequal_n_introns'] == -1
         assert response['splice_sites_unequal_n'] == -1
 
+    @pytest.mark.parametrize("primary_chromosome, primary_start, primary_end, fix_chromosome, fix_start, fix_end, entrez_gene_id", [
+        ("NC_000021.9", 45405165, 45513720, "NW_025791815.1", 1, 189707, 80781),
+        ("NC_000009.12", 134178925, 134206688, "NW_021159999.1", 1, 25408, 124902298)
+    ])
+    def test_compare_features_without_full_detail(self, primary_chromosome, primary_start, primary_end, fix_chromosome, fix_start, fix_end, entrez_gene_id):
+        args = (primary_chromosome, primary_start, primary_end, fix_chromosome, fix_start, fix_end, entrez_gene_id)
+        full = FeatureComparator("tests/fixtures/GCF_000001405.40_GRCh38.p14_genomic.sorted.gtf.gz",
+                                 "tests/fixtures/GCF_000001405.40_GRCh38.p14_genomic.subset.fna.gz").compare_features(*args)
+        staged = FeatureComparator("tests/fixtures/GCF_000001405.40_GRCh38.p14_genomic.sorted.gtf.gz",
+                                   "tests/fixtures/GCF_000001405.40_GRCh38.p14_genomic.subset.fna.gz",
+                                   full_detail=False).compare_features(*args)
+
+        assert staged['comparison_status'] == full['comparison_status']
+        assert staged['primary_exon_lengths'] is None
+        assert all(value is None or value == full[key] for key, value in staged.items())
+
     
     @pytest.mark.parametrize("primary_seqs, fix_seqs, expected",
         [
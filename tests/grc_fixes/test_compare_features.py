@@ -0,0 +1,76 @@
+from rnacloud_genome_reference.grc_fixes import comparator as comparator_module
+from rnacloud_genome_reference.grc_fixes import compare_features as compare_features_module
+from rnacloud_genome_reference.grc_fixes.comparator import FeatureComparator
+from rnacloud_genome_reference.grc_fixes.compare_features import _load_previous_assessment, compare_features
+import pandas as pd
+import pytest
+
+class TestCompareFeatures:
+    GTF = "tests/fixtures/GCF_000001405.40_GRCh38.p14_genomic.sorted.gtf.gz"
+    FASTA = "tests/fixtures/GCF_000001405.40_GRCh38.p14_genomic.subset.fna.gz"
+
+    @pytest.fixture
+    def mappings_file(self, tmp_path) -> str:
+        mappings_file_path = str(tmp_path / 'mappings.tsv')
+        pd.DataFrame([
+            ('NC_000021.9', 45405165, 45513720, 'NW_025791815.1', 1, 189707, 80781),
+            ('NC_000009.12', 134178925, 134206688, 'NW_021159999.1', 1, 25408, 124902298),
+            ('NC_000021.9', 45405165, 45513720, 'NW_025791815.1', 1, 189707, 80781)
+        ], columns=['chr_refseq', 'start', 'end', 'alt_chr_refseq', 'alt_scaf_start', 'alt_scaf_stop', 'entrez_gene_id']).to_csv(mappings_file_path, sep='\t', index=False)
+        return mappings_file_path
+
+    def test_workers_match_serial_run(self, mappings_file: str, tmp_path):
+        compare_features(self.GTF, self.FASTA, mappings_file, str(tmp_path / 'serial.tsv'))
+        compare_features(self.GTF, self.FASTA, mappings_file, str(tmp_path / 'parallel.tsv'), workers=2)
+
+        with open(tmp_path / 'serial.tsv') as serial, open(tmp_path / 'parallel.tsv') as parallel:
+            assert serial.read() == parallel.read()
+
+    def test_previous_assessment_is_carried_forward(self, mappings_file: str, tmp_path, monkeypatch):
+        compare_features(self.GTF, self.FASTA, mappings_file, str(tmp_path / 'previous.tsv'), input_digests=True)
+
+        def compare_features_again(*args, **kwargs):
+            raise AssertionError("Unchanged mapping compared again")
+        monkeypatch.setattr(FeatureComparator, 'compare_features', compare_features_again)
+        compare_features(self.GTF, self.FASTA, mappings_file, str(tmp_path / 'incremental.tsv'), previous_assessment_path=str(tmp_path / 'previous.tsv'))
+
+        with open(tmp_path / 'previous.tsv') as previous, open(tmp_path / 'incremental.tsv') as incremental:
+            assert previous.read() == incremental.read()
+
+    def test_previous_assessment_of_another_comparison_version_is_not_carried_forward(self, mappings_file: str, tmp_path, monkeypatch):
+        compare_features(self.GTF, self.FASTA, mappings_file, str(tmp_path / 'previous.tsv'), input_digests=True)
+
+        monkeypatch.setattr(comparator_module, 'COMPARISON_VERSION', comparator_module.COMPARISON_VERSION + 1)
+        compare_features(self.GTF, self.FASTA, mappings_file, str(tmp_path / 'incremental.tsv'), previous_assessment_path=str(tmp_path / 'previous.tsv'))
+
+        previous = pd.read_csv(tmp_path / 'previous.tsv', sep='\t')
+        incremental = pd.read_csv(tmp_path / 'incremental.tsv', sep='\t')
+        assert previous.drop(columns='input_digest').equals(incremental.drop(columns='input_digest'))
+        assert not previous['input_digest'].isin(incremental['input_digest']).any()
+
+    def test_previous_assessment_without_input_digests_is_not_used(self, tmp_path):
+        pd.DataFrame({'comparison_status': ['Identical']}).to_csv(tmp_path / 'previous.tsv', sep='\t', index=False)
+
+        assert _load_previous_assessment(str(tmp_path / 'previous.tsv')) == {}
+
+    def test_checkpoint_dir_resumes_from_another_directory(self, mappings_file: str, tmp_path, monkeypatch):
+        compare_features(self.GTF, self.FASTA, mappings_file, str(tmp_path / 'complete.tsv'))
+
+        compare_mappings = compare_features_module._compare_mappings
+        def killed_after_first_row(comparator, mappings, *args):
+            if mappings.index[0] > 0:
+                raise KeyboardInterrupt
+            return compare_mappings(comparator, mappings, *args)
+        monkeypatch.setattr(compare_features_module, '_compare_mappings', killed_after_first_row)
+        # As Nextflow reruns a task: the same output name, in a fresh work directory
+        (tmp_path / 'killed').mkdir()
+        with pytest.raises(KeyboardInterrupt):
+            compare_features(self.GTF, self.FASTA, mappings_file, str(tmp_path / 'killed' / 'comparison_results.tsv'), checkpoint_dir=str(tmp_path / 'checkpoint'))
+
+        monkeypatch.setattr(compare_features_module, '_compare_mappings', compare_mappings)
+        (tmp_path / 'resumed').mkdir()
+        compare_features(self.GTF, self.FASTA, mappings_file, str(tmp_path / 'resumed' / 'comparison_results.tsv'), checkpoint_dir=str(tmp_path / 'checkpoint'))
+
+        with open(tmp_path / 'complete.tsv') as complete, open(tmp_path / 'resumed' / 'comparison_results.tsv') as resumed:
+            assert complete.read() == resumed.read()
+        assert list((tmp_path / 'checkpoint').iterdir()) == []